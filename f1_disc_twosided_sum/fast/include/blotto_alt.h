@@ -1,3 +1,4 @@
+#include <chrono>
 #include <iostream>
 #include <stdio.h>
 
@@ -21,7 +22,7 @@ public:
     BlottoAlt(int num_battlefields, int max_soldiers_p1, int max_soldiers_p2, BattlefieldLevelGame *battlefield_games, RegretMinimizerEfceFlattenedBase *rm_p1, RegretMinimizerEfceFlattenedBase *rm_p2);
     double get_payoffs(int battlefield_id, int soldiers_p1, int soldiers_p2, int action_p1, int action_p2) const;
     double evaluate(double *strat_p1, double *strat_p2);
-    void solve(unsigned int num_iterations, bool verbose = false);
+    void solve(unsigned int num_iterations, bool verbose = true, double target_gap = 0.002);
     void get_loss_vector_pl1(double *strat_pl2, double *storage);
     void get_loss_vector_pl2(double *strat_pl1, double *storage);
 
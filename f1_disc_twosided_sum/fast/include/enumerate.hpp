@@ -27,8 +27,9 @@ constexpr auto enumerate(T &&iterable, int init_idx = 0)
     struct iterable_wrapper
     {
         T iterable;
+        int init_idx;
         auto begin() { return iterator{init_idx, std::begin(iterable)}; }
         auto end() { return iterator{init_idx, std::end(iterable)}; }
     };
-    return iterable_wrapper{std::forward<T>(iterable)};
+    return iterable_wrapper{std::forward<T>(iterable), init_idx};
 }
@@ -78,10 +78,9 @@ void BlottoAlt::get_loss_vector_pl2(double *strat_pl1, double *storage)
     }
 }
 
-void BlottoAlt::solve(unsigned int num_iterations, bool verbose)
+void BlottoAlt::solve(unsigned int num_iterations, bool verbose, double target_gap)
 {
-    double SADDLE_POINT_GAP_TERMINATE = 0.002;
-    // TODO: fix memory leak.
+    double SADDLE_POINT_GAP_TERMINATE = target_gap;
     int num_seqs_p1 = rm_p1->size();
     int num_seqs_p2 = rm_p2->size();
 
@@ -108,10 +107,13 @@ void BlottoAlt::solve(unsigned int num_iterations, bool verbose)
         // to terminate, and to log saddle point gaps.
         if (i % 100 == 0 && i > 0)
         {
-            std::cout << "Iteration: " << i << "\n";
             auto cur = std::chrono::high_resolution_clock::now();
             std::chrono::duration<double> elapsed = cur - start;
-            std::cout << "Elapsed time: " << elapsed.count() << " seconds\n";
+            if (verbose)
+            {
+                std::cout << "Iteration: " << i << "\n";
+                std::cout << "Elapsed time: " << elapsed.count() << " seconds\n";
+            }
 
             // Compute loss
             get_loss_vector_pl1(accum_strategy_p2, loss_vector_p1);
@@ -126,12 +128,14 @@ void BlottoAlt::solve(unsigned int num_iterations, bool verbose)
 
             assertm(br_p1_to_p2 > br_p2_to_p1, "Best response to player 1's strategy should be greater than player 2's strategy.");
             double gap = br_p1_to_p2 - br_p2_to_p1;
-            std::cout
-                << "gap: " << gap << " " << br_p1_to_p2 << " " << br_p2_to_p1 << "\n";
+            if (verbose)
+                std::cout
+                    << "gap: " << gap << " " << br_p1_to_p2 << " " << br_p2_to_p1 << "\n";
 
             if (gap < SADDLE_POINT_GAP_TERMINATE)
             {
-                std::cout << "Converged!\n";
+                if (verbose)
+                    std::cout << "Converged!\n";
                 break;
             }
         }
@@ -168,6 +172,11 @@ void BlottoAlt::solve(unsigned int num_iterations, bool verbose)
 
     ret_strat_p1 = accum_strategy_p1;
     ret_strat_p2 = accum_strategy_p2;
+
+    delete[] sketchpad_p1;
+    delete[] sketchpad_p2;
+    delete[] loss_vector_p1;
+    delete[] loss_vector_p2;
 }
 
 void BlottoAlt::construct_xi_polytope(int player_id, // 0 or 1
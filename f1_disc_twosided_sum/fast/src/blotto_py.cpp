@@ -0,0 +1,142 @@
+// Python bindings for BlottoAlt. Build with `make python`, which places the extension
+// module next to the Python game definitions (game_defs/blotto_fast*.so).
+#include <memory>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include "blotto_alt.h"
+#include "battlefield_level_game.h"
+#include "rm_efce_flattened.h"
+#include "rmplus_efce_flattened.h"
+#include "prm_efce_flattened.h"
+#include "prmplus_efce_flattened.h"
+
+namespace py = pybind11;
+
+using PayoffArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+// Owns the arrays allocated by the constructor of BattlefieldLevelGame, which has no destructor, so that
+// they are freed however solve() exits. Battlefields are constructed in place and owned from then on.
+struct BattlefieldGames
+{
+    std::vector<BattlefieldLevelGame> battlefields;
+
+    BattlefieldGames() = default;
+    BattlefieldGames(const BattlefieldGames &) = delete;
+    BattlefieldGames &operator=(const BattlefieldGames &) = delete;
+
+    ~BattlefieldGames()
+    {
+        for (auto &battlefield : battlefields)
+        {
+            delete[] battlefield.num_actions_p1;
+            delete[] battlefield.num_actions_p2;
+            delete[] battlefield.payoff_matrices;
+        }
+    }
+};
+
+std::unique_ptr<RegretMinimizerEfceFlattenedBase> make_regret_minimizer(const std::string &name)
+{
+    if (name == "rm")
+        return std::make_unique<RmEfceFlattened>();
+    if (name == "rm+")
+        return std::make_unique<RmPlusEfceFlattened>();
+    if (name == "prm")
+        return std::make_unique<PrmEfceFlattened>();
+    if (name == "prm+")
+        return std::make_unique<PrmPlusEfceFlattened>();
+    throw std::invalid_argument("Unknown regret minimizer " + name + ", expected one of rm, rm+, prm, prm+.");
+}
+
+// payoff_matrices[battlefield_id][soldiers_p1][soldiers_p2] is the (num_actions_p1, num_actions_p2)
+// payoff matrix of player 1, as in BayesianBattlefieldGame.dense_payoff_matrices(). Matrices which are already
+// C-contiguous float64 arrays are used in place, other ones are converted once.
+py::tuple solve(int max_soldiers_p1,
+                int max_soldiers_p2,
+                const py::list &payoff_matrices,
+                const std::string &regret_minimizer,
+                unsigned int num_iterations,
+                double target_gap,
+                bool verbose)
+{
+    int num_battlefields = (int)payoff_matrices.size();
+
+    // Validated before anything is allocated.
+    auto rm_p1 = make_regret_minimizer(regret_minimizer);
+    auto rm_p2 = make_regret_minimizer(regret_minimizer);
+
+    // Keeps the payoff buffers alive while BlottoAlt points into them.
+    std::vector<PayoffArray> payoff_buffers;
+    BattlefieldGames battlefield_games;
+    battlefield_games.battlefields.reserve(num_battlefields);
+    for (int i = 0; i < num_battlefields; i++)
+    {
+        py::list matrices_p1 = payoff_matrices[i].cast<py::list>();
+        if ((int)matrices_p1.size() != max_soldiers_p1 + 1)
+            throw std::invalid_argument("Expected max_soldiers_p1 + 1 rows of payoff matrices.");
+
+        battlefield_games.battlefields.emplace_back(max_soldiers_p1, max_soldiers_p2);
+        BattlefieldLevelGame &battlefield = battlefield_games.battlefields.back();
+        for (int soldiers_p1 = 0; soldiers_p1 <= max_soldiers_p1; soldiers_p1++)
+        {
+            py::list matrices_p2 = matrices_p1[soldiers_p1].cast<py::list>();
+            if ((int)matrices_p2.size() != max_soldiers_p2 + 1)
+                throw std::invalid_argument("Expected max_soldiers_p2 + 1 columns of payoff matrices.");
+
+            for (int soldiers_p2 = 0; soldiers_p2 <= max_soldiers_p2; soldiers_p2++)
+            {
+                PayoffArray matrix = PayoffArray::ensure(matrices_p2[soldiers_p2]);
+                if (!matrix || matrix.ndim() != 2)
+                    throw std::invalid_argument("Payoff matrices must be 2-dimensional arrays.");
+                int num_actions_p1 = (int)matrix.shape(0);
+                int num_actions_p2 = (int)matrix.shape(1);
+                if ((soldiers_p2 > 0 && battlefield.num_actions_p1[soldiers_p1] != num_actions_p1) ||
+                    (soldiers_p1 > 0 && battlefield.num_actions_p2[soldiers_p2] != num_actions_p2))
+                    throw std::invalid_argument("Inconsistent number of actions across payoff matrices.");
+
+                battlefield.set_payoff_matrix(soldiers_p1, soldiers_p2, num_actions_p1, num_actions_p2,
+                                              matrix.mutable_data());
+                payoff_buffers.push_back(std::move(matrix));
+            }
+        }
+    }
+
+    py::array_t<double> solution_p1;
+    py::array_t<double> solution_p2;
+    double value;
+    {
+        BlottoAlt blotto(num_battlefields, max_soldiers_p1, max_soldiers_p2, battlefield_games.battlefields.data(), rm_p1.get(), rm_p2.get());
+        {
+            py::gil_scoped_release release;
+            blotto.solve(num_iterations, verbose, target_gap);
+            value = blotto.evaluate(blotto.get_solution_p1(), blotto.get_solution_p2());
+        }
+
+        // The average strategies are allocated by solve() and owned by the caller.
+        std::unique_ptr<double[]> average_p1(blotto.get_solution_p1());
+        std::unique_ptr<double[]> average_p2(blotto.get_solution_p2());
+        solution_p1 = py::array_t<double>(blotto.rm_p1->size(), average_p1.get());
+        solution_p2 = py::array_t<double>(blotto.rm_p2->size(), average_p2.get());
+    }
+
+    return py::make_tuple(solution_p1, solution_p2, value);
+}
+
+PYBIND11_MODULE(blotto_fast, m)
+{
+    m.doc() = "Alternating (predictive) regret matching for Blotto-family games, see BlottoAlt::solve.";
+    m.def("solve", &solve,
+          "Solves the game and returns the average sequence form strategies of both players and the game value.",
+          py::arg("max_soldiers_p1"),
+          py::arg("max_soldiers_p2"),
+          py::arg("payoff_matrices"),
+          py::arg("regret_minimizer") = "prm+",
+          py::arg("num_iterations") = 10000,
+          py::arg("target_gap") = 0.002,
+          py::arg("verbose") = false);
+}
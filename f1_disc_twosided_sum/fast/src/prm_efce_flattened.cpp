@@ -4,12 +4,12 @@
 #include <cstdlib>
 
 PrmEfceFlattened::PrmEfceFlattened(unsigned int size)
-    : RegretMinimizerEfceFlattenedBase(size)
+    : RegretMinimizerEfceFlattenedBase(size), regret_(NULL), scratchpad(NULL)
 {
 }
 
 PrmEfceFlattened::PrmEfceFlattened()
-    : RegretMinimizerEfceFlattenedBase(1), regret_(NULL)
+    : RegretMinimizerEfceFlattenedBase(1), regret_(NULL), scratchpad(NULL)
 {
 }
 
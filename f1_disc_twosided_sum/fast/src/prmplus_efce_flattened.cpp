@@ -4,12 +4,12 @@
 #include <cstdlib>
 
 PrmPlusEfceFlattened::PrmPlusEfceFlattened(unsigned int size)
-    : RegretMinimizerEfceFlattenedBase(size)
+    : RegretMinimizerEfceFlattenedBase(size), regret_(NULL), scratchpad(NULL)
 {
 }
 
 PrmPlusEfceFlattened::PrmPlusEfceFlattened()
-    : RegretMinimizerEfceFlattenedBase(1), regret_(NULL)
+    : RegretMinimizerEfceFlattenedBase(1), regret_(NULL), scratchpad(NULL)
 {
 }
 
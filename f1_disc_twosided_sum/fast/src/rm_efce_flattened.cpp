@@ -4,7 +4,7 @@
 #include <cstdlib>
 
 RmEfceFlattened::RmEfceFlattened(unsigned int size)
-    : RegretMinimizerEfceFlattenedBase(size)
+    : RegretMinimizerEfceFlattenedBase(size), regret_(NULL)
 {
 }
 
@@ -4,7 +4,7 @@
 #include <cstdlib>
 
 RmPlusEfceFlattened::RmPlusEfceFlattened(unsigned int size)
-    : RegretMinimizerEfceFlattenedBase(size)
+    : RegretMinimizerEfceFlattenedBase(size), regret_(NULL)
 {
 }
 
@@ -3,6 +3,8 @@ from online_learning.dag_structure import DagStructure
 from online_learning.regret_matching import RegretMatching
 from online_learning.dag_treeplex import DagTreeplex
 from online_learning.dag_regret_minimizer import DagGame
+from game_defs.blotto_dag import BlottoDagStructure
+from game_defs.battlefield_payoff import BattlefieldPayoffOperator, share_proportional_blocks
 import numpy as np 
 import copy
 
@@ -30,15 +32,16 @@ class BlottoGame(DagGame):
         dag_p1 = BlottoGame.generate_dag(num_battles, num_soldiers_p1)
         dag_p2 = BlottoGame.generate_dag(num_battles, num_soldiers_p2)
 
-        # Generate payoffs for each player. 
-        leaves = BlottoGame.generate_sparse_payoffs(dag_p1, 
-                                                    dag_p2, 
-                                                    num_battles, 
-                                                    num_soldiers_p1, 
-                                                    num_soldiers_p2,
-                                                    battlefield_worth)
+        # Generate payoffs for each player, one dense block per battlefield.
+        battlefield_blocks = BlottoGame.generate_battlefield_blocks(num_battles, 
+                                                                    num_soldiers_p1, 
+                                                                    num_soldiers_p2,
+                                                                    battlefield_worth)
+        # Battlefields which only differ by their worth share one block.
+        battlefield_blocks, battlefield_scales = share_proportional_blocks(battlefield_blocks)
+        payoff_operator = BattlefieldPayoffOperator(dag_p1, dag_p2, battlefield_blocks, battlefield_scales=battlefield_scales)
 
-        super().__init__(dag_p1, dag_p2, leaves)       
+        super().__init__(dag_p1, dag_p2, payoff_operator=payoff_operator)
 
 
     def generate_dag(num_battles: int, num_soldiers: int):
@@ -48,97 +51,34 @@ class BlottoGame(DagGame):
         --------
         We add in one dummy infoset for each battle for each number of soldiers used. 
         This is used to "fake" payoffs and make the payoff matrix a lot sparser.
+
+        The DAG shape only depends on the sizes, so it is emitted directly in (frozen) CSR form
+        by BlottoDagStructure; infoset names are only generated if someone asks for them.
         """
 
-        dag = DagStructure()
-
-        # First battlefield is special.
-        dag.add_infoset([0], num_soldiers+1, (0, num_soldiers))
-
-        # Add in main infosets
-        for battle_id in range(1, num_battles):
-            for num_soldiers_left in range(num_soldiers+1):
-                # Get parent sequences.
-                par_seq_ids = []
-                for prev_num_soldiers in range(num_soldiers_left, num_soldiers+1):
-                    num_soldiers_used = prev_num_soldiers - num_soldiers_left
-                    assert num_soldiers_used >= 0
-
-                    par_infoset_name = (battle_id-1, prev_num_soldiers)
-                    if par_infoset_name not in dag.infoset_name_to_id:
-                        assert battle_id == 1
-                    else:
-                        par_infoset_id = dag.infoset_name_to_id[par_infoset_name]
-                        par_seq_id = dag.infoset_start_seq_id[par_infoset_id] + num_soldiers_used
-                        par_seq_ids.append(par_seq_id)
-                        
-
-                dag.add_infoset(par_seq_ids, num_soldiers_left+1, (battle_id, num_soldiers_left))
-
-        # Add in dummy infosets
-        for battle_id in range(num_battles):
-            for num_soldiers_used in range(num_soldiers+1):
-                par_seq_ids = []
-                
-                # Infoset name is ('d', battle_id, num_soldiers_used)
-                # Special 'd' marker to distinguish this name from the regular infoset.
-                new_infoset_name = ('d', battle_id, num_soldiers_used)
-
-                # Iterate over all possible parent sequences
-                for initial_infoset in range(num_soldiers_used, num_soldiers+1):
-                    par_infoset_name = (battle_id, initial_infoset)
-                    if par_infoset_name not in dag.infoset_name_to_id:
-                        assert battle_id == 0
-                    else:
-                        infoset_id = dag.infoset_name_to_id[par_infoset_name]
-                        seq_id = dag.infoset_start_seq_id[infoset_id] + num_soldiers_used
-                        par_seq_ids.append(seq_id)
-                
-                # Create new dummy infoset
-                dag.add_infoset(par_seq_ids, 1, new_infoset_name)
-                
-        # print('----------------------------------------------')
-        return dag
-
-    def generate_sparse_payoffs(dag_p1: DagStructure, 
-                                dag_p2: DagStructure,
-                                num_battles: int, 
-                                num_soldiers_p1: int,
-                                num_soldiers_p2: int,
-                                battlefield_worth: List[float]):
+        return BlottoDagStructure(num_battles, num_soldiers)
+
+    def generate_battlefield_blocks(num_battles: int, 
+                                    num_soldiers_p1: int,
+                                    num_soldiers_p2: int,
+                                    battlefield_worth: List[float]):
         """
-        Generates sparse payoffs for the Blotto game.
+        Generates the payoffs for the Blotto game, one dense block per battlefield.
 
         Args:
-            dag_p1 (DagStructure): DAG structure for player 1.
-            dag_p2 (DagStructure): DAG structure for player 2.
             num_battles (int): Number of battles in the game.
             num_soldiers_p1 (int): Number of soldiers for player 1.
             num_soldiers_p2 (int): Number of soldiers for player 2.
+            battlefield_worth (List[float]): Worth of each battlefield.
 
         Returns:
-            Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray]]: Payoffs for both players.
+            List[np.ndarray]: For each battlefield, the (num_soldiers_p1+1, num_soldiers_p2+1) payoffs of
+                player 1 indexed by the number of soldiers each player sends to that battlefield.
         """
 
-        leaves = dict()
-
-         # Iterate through all dummy infosets in the DAG
-        for battle_id in range(num_battles):
-            for num_soldiers_used_p1 in range(num_soldiers_p1+1):
-                for num_soldiers_used_p2 in range(num_soldiers_p2+1):
-                    p1_dummy_infoset = dag_p1.infoset_name_to_id[('d', battle_id, num_soldiers_used_p1)]
-                    p2_dummy_infoset = dag_p2.infoset_name_to_id[('d', battle_id, num_soldiers_used_p2)]
-                    p1_seq_id = dag_p1.infoset_start_seq_id[p1_dummy_infoset]
-                    p2_seq_id = dag_p2.infoset_start_seq_id[p2_dummy_infoset]
-
-                    if num_soldiers_used_p1 > num_soldiers_used_p2:
-                        leaves[(p1_seq_id, p2_seq_id)] = battlefield_worth[battle_id]
-                    elif num_soldiers_used_p1 < num_soldiers_used_p2:
-                        leaves[(p1_seq_id, p2_seq_id)] = -battlefield_worth[battle_id]
-                    else:
-                        leaves[(p1_seq_id, p2_seq_id)] = 0.0
-        
-        return leaves
+        # Each battlefield is won by whoever sends more soldiers to it (ties are worth 0).
+        outcome = np.sign(np.arange(num_soldiers_p1+1)[:, None] - np.arange(num_soldiers_p2+1)[None, :])
+        return [battlefield_worth[battle_id] * outcome for battle_id in range(num_battles)]
 
 def unit_test():
     BlottoGame(3, (5, 3), [1.0, 1.0, 1.0])
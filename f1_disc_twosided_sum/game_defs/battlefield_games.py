@@ -44,50 +44,33 @@ class BlottoWithRaise(GeneralizedBBBlottoGame):
                                   raise_multiplier: float):
         """
         Action 1 is to keep and action 2 is to raise.
-        """
-        payoff_matrices = []
-        for soldiers_p1 in range(max_soldiers_p1+1):
-            payoff_matrices.append([])
-            for soldiers_p2 in range(max_soldiers_p2+1):
 
-                if soft_victory:
-                    total_soldiers = soldiers_p1 + soldiers_p2
-                    if total_soldiers == 0:
-                        base_val = 0.0
-                    else:
-                        prob_p1_win = soldiers_p1 / total_soldiers
-                        prob_p2_win = soldiers_p2 / total_soldiers
-                        base_val = battlefield_worth * (prob_p1_win - prob_p2_win)
-                else:
-                    if soldiers_p1 > soldiers_p2:
-                        base_val = battlefield_worth
-                    elif soldiers_p1 < soldiers_p2:
-                        base_val = -battlefield_worth
-                    else:
-                        base_val = 0.0
-
-                # Fill in payoff matrix
-                payoff_matrix = np.zeros((2, 2))
-
-                # If neither player raises
-                payoff_matrix[0, 0] = base_val * 1.0
-                
-                # If both players raise
-                payoff_matrix[1, 1] = base_val * raise_multiplier * raise_multiplier
-
-                # If player 1 raises and player 2 does not 
-                payoff_matrix[1, 0] = base_val * raise_multiplier
-
-                # If player 2 raises and player 1 does not
-                payoff_matrix[0, 1] = base_val * raise_multiplier
+        The payoff of every pair of types is base_val(soldiers_p1, soldiers_p2) times the raise multiplier
+        of every player who raises, i.e., the Kronecker product of base_val and a 2x2 multiplier matrix,
+        which is how the payoffs are stored.
+        """
+        soldiers_p1 = np.arange(max_soldiers_p1 + 1, dtype=np.float64)[:, None]
+        soldiers_p2 = np.arange(max_soldiers_p2 + 1, dtype=np.float64)[None, :]
+
+        if soft_victory:
+            total_soldiers = soldiers_p1 + soldiers_p2
+            # Both players send no soldiers: base_val is 0.
+            safe_total_soldiers = np.where(total_soldiers == 0, 1.0, total_soldiers)
+            prob_p1_win = soldiers_p1 / safe_total_soldiers
+            prob_p2_win = soldiers_p2 / safe_total_soldiers
+            base_val = battlefield_worth * (prob_p1_win - prob_p2_win)
+        else:
+            base_val = battlefield_worth * np.sign(soldiers_p1 - soldiers_p2)
 
-                payoff_matrices[-1].append(payoff_matrix)
+        # Rows: player 1 keeps or raises, columns: player 2 keeps or raises.
+        raise_multipliers = np.array([[1.0, raise_multiplier],
+                                      [raise_multiplier, raise_multiplier * raise_multiplier]])
 
         return BayesianBattlefieldGame(max_soldiers_p1, 
                                        max_soldiers_p2,
                                        [2] * (max_soldiers_p1 + 1),
                                        [2] * (max_soldiers_p2 + 1),
-                                       payoff_matrices)
+                                       payoff_factors=[(base_val, raise_multipliers)])
 ''' 
 # TODO: placeholder for now.
 class BlottoWithSignalAndRaise(GeneralizedBBBlottoGame):
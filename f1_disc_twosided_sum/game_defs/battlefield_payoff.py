@@ -0,0 +1,368 @@
+from typing import List, Tuple
+import numpy as np
+import scipy.sparse as sp
+from game_defs.blotto_dag import BlottoDagStructure
+
+class KroneckerBlock(object):
+    """
+    Battlefield block in factored form, sum_k kron(type_payoffs[k], action_payoffs[k]): type_payoffs[k] is indexed
+    by the soldiers both players send and action_payoffs[k] by their actions in the battlefield game, so that
+    rows (resp. columns) are ordered by (soldiers used, action) as in a dense block. Every type of a player has
+    the same number of actions.
+
+    Only the factors are stored, and products with the block are two small GEMMs per term, e.g. for
+    BlottoWithRaise a single (num_soldiers_p1+1, num_soldiers_p2+1) matrix times the 2x2 raise multipliers.
+    """
+    def __init__(self, type_payoffs: List[np.ndarray], action_payoffs: List[np.ndarray], dtype = np.float64):
+        assert len(type_payoffs) == len(action_payoffs) > 0, "Expected one action payoff matrix per type payoff matrix."
+        self.type_payoffs = [np.ascontiguousarray(factor, dtype=dtype) for factor in type_payoffs]
+        self.action_payoffs = [np.ascontiguousarray(factor, dtype=dtype) for factor in action_payoffs]
+        self.dtype = np.dtype(dtype)
+        self.type_shape = self.type_payoffs[0].shape
+        self.action_shape = self.action_payoffs[0].shape
+        assert all(factor.shape == self.type_shape for factor in self.type_payoffs)
+        assert all(factor.shape == self.action_shape for factor in self.action_payoffs)
+        self.shape = (self.type_shape[0] * self.action_shape[0], self.type_shape[1] * self.action_shape[1])
+
+    @property
+    def nbytes(self):
+        return sum(factor.nbytes for factor in self.type_payoffs + self.action_payoffs)
+
+    def astype(self, dtype):
+        return KroneckerBlock(self.type_payoffs, self.action_payoffs, dtype)
+
+    def to_dense(self):
+        return sum(np.kron(type_payoffs, action_payoffs) for type_payoffs, action_payoffs in zip(self.type_payoffs, self.action_payoffs))
+
+    def dot(self, y: np.ndarray, out: np.ndarray = None):
+        """
+        Returns block @ y, i.e., sum_k T_k Y M_k^T with y reshaped to Y[soldiers_p2, action_p2].
+        y may also hold several vectors back to back, which are then multiplied in one batched product.
+        """
+        y = y.reshape(-1, self.type_shape[1], self.action_shape[1])
+        if out is None:
+            out = np.empty(y.shape[0] * self.shape[0], dtype=np.result_type(self.dtype, y))
+        out_matrix = out.reshape(-1, self.type_shape[0], self.action_shape[0])
+        for term, (type_payoffs, action_payoffs) in enumerate(zip(self.type_payoffs, self.action_payoffs)):
+            if term == 0:
+                np.matmul(type_payoffs @ y, action_payoffs.T, out=out_matrix)
+            else:
+                out_matrix += (type_payoffs @ y) @ action_payoffs.T
+        return out
+
+    def dot_transpose(self, x: np.ndarray, out: np.ndarray = None):
+        """
+        Returns block^T @ x, i.e., sum_k T_k^T X M_k with x reshaped to X[soldiers_p1, action_p1].
+        x may also hold several vectors back to back, as in dot().
+        """
+        x = x.reshape(-1, self.type_shape[0], self.action_shape[0])
+        if out is None:
+            out = np.empty(x.shape[0] * self.shape[1], dtype=np.result_type(self.dtype, x))
+        out_matrix = out.reshape(-1, self.type_shape[1], self.action_shape[1])
+        for term, (type_payoffs, action_payoffs) in enumerate(zip(self.type_payoffs, self.action_payoffs)):
+            if term == 0:
+                np.matmul(type_payoffs.T @ x, action_payoffs, out=out_matrix)
+            else:
+                out_matrix += (type_payoffs.T @ x) @ action_payoffs
+        return out
+
+def dense_block(block):
+    """
+    Returns a battlefield block (dense or KroneckerBlock) as a dense matrix.
+    """
+    return block.to_dense() if isinstance(block, KroneckerBlock) else block
+
+def proportional_scale(reference, block, rtol: float = 1e-12):
+    """
+    Returns c such that block = c * reference (up to rtol), or None if there is no such c. Dense blocks
+    are compared entrywise; KroneckerBlocks must have the same action payoffs and proportional type payoffs.
+    """
+    if isinstance(reference, KroneckerBlock) != isinstance(block, KroneckerBlock) or reference.shape != block.shape:
+        return None
+    if isinstance(reference, KroneckerBlock):
+        if len(reference.type_payoffs) != len(block.type_payoffs) or \
+           not all(np.array_equal(ref_factor, factor) for ref_factor, factor in zip(reference.action_payoffs, block.action_payoffs)):
+            return None
+        reference_values = np.stack(reference.type_payoffs)
+        values = np.stack(block.type_payoffs)
+    else:
+        reference_values, values = np.asarray(reference), np.asarray(block)
+
+    pivot = np.unravel_index(np.argmax(np.abs(reference_values)), reference_values.shape)
+    if reference_values[pivot] == 0:
+        return 1.0 if not np.any(values) else None
+    scale = values[pivot] / reference_values[pivot]
+    if not np.allclose(values, scale * reference_values, rtol=rtol, atol=0.0):
+        return None
+    return float(scale)
+
+def share_proportional_blocks(battlefield_blocks: List, rtol: float = 1e-12) -> Tuple[List, np.ndarray]:
+    """
+    Finds battlefields whose payoff blocks are scalar multiples of each other, e.g. the same battlefield game
+    with different battlefield worths.
+
+    Returns:
+        Tuple[List, np.ndarray]: The blocks, where every block proportional to an earlier one is replaced by
+            that (same) block object, and the scale of every battlefield, so that battlefield b has payoffs
+            scales[b] * blocks[b]. Pass both to BattlefieldPayoffOperator.
+    """
+    shared_blocks = []
+    scales = np.ones(len(battlefield_blocks))
+    references = []
+    for battle_id, block in enumerate(battlefield_blocks):
+        for reference in references:
+            scale = proportional_scale(reference, block, rtol)
+            if scale is not None:
+                block, scales[battle_id] = reference, scale
+                break
+        else:
+            references.append(block)
+        shared_blocks.append(block)
+    return shared_blocks, scales
+
+class BattlefieldPayoffOperator(object):
+    """
+    Payoff operator of a Blotto-family game, stored as one dense block per battlefield.
+
+    All payoffs of battlefield b are between the dummy sequences ('d', b, *) of the two players,
+    which are contiguous in both DAGs. Hence the payoff matrix is block diagonal over the dummy
+    sequences (and zero on the regular allocation sequences), and reward vectors are computed
+    as num_battles small dense GEMVs. Blocks may also be given in factored form (KroneckerBlock).
+
+    Battlefields may share a block, scaled by battlefield_scales (see share_proportional_blocks()): the
+    block is then stored once, and a run of consecutive battlefields sharing it is multiplied in one GEMM,
+    as their dummy sequences are laid out back to back.
+    """
+    def __init__(self,
+                 dag_p1: BlottoDagStructure,
+                 dag_p2: BlottoDagStructure,
+                 battlefield_blocks: List[np.ndarray],
+                 dtype = np.float64,
+                 battlefield_scales: np.ndarray = None):
+        """
+        Args:
+            dag_p1 (BlottoDagStructure): DAG structure for player 1.
+            dag_p2 (BlottoDagStructure): DAG structure for player 2.
+            battlefield_blocks (List[np.ndarray]): One dense block (or KroneckerBlock) per battlefield, with rows 
+                (resp. columns) indexed by the dummy sequences of player 1 (resp. player 2) in that battlefield, i.e.,
+                ordered by (soldiers used, action). Battlefields may share the same block object.
+            dtype: Floating point type of the stored blocks.
+            battlefield_scales (np.ndarray): Optional scale of every battlefield, whose payoffs are then
+                battlefield_scales[b] * battlefield_blocks[b].
+        """
+        assert len(battlefield_blocks) == dag_p1.num_battles == dag_p2.num_battles
+        self.dag_p1 = dag_p1
+        self.dag_p2 = dag_p2
+        self.dtype = np.dtype(dtype)
+        self.shape = (dag_p1.num_sequences, dag_p2.num_sequences)
+        self.num_battles = dag_p1.num_battles
+
+        # Contiguous offsets of the dummy sequences of each battlefield.
+        self.row_offsets = dag_p1.dummy_seq_offsets.copy()
+        self.col_offsets = dag_p2.dummy_seq_offsets.copy()
+
+        if battlefield_scales is None:
+            battlefield_scales = np.ones(self.num_battles)
+        self.battlefield_scales = np.array(battlefield_scales, dtype=np.float64)
+        assert self.battlefield_scales.shape == (self.num_battles,)
+
+        # Shared blocks are converted once, so they stay shared.
+        converted_blocks = {}
+        self.battlefield_blocks = []
+        for battle_id, block in enumerate(battlefield_blocks):
+            if id(block) not in converted_blocks:
+                if isinstance(block, KroneckerBlock):
+                    converted = block.astype(dtype) if block.dtype != dtype else block
+                else:
+                    converted = np.ascontiguousarray(block, dtype=dtype)
+                converted_blocks[id(block)] = (block, converted)
+            block = converted_blocks[id(block)][1]
+            assert block.shape == (self.row_offsets[battle_id + 1] - self.row_offsets[battle_id],
+                                   self.col_offsets[battle_id + 1] - self.col_offsets[battle_id]), \
+                f"Payoff block of battlefield {battle_id} does not match the dummy sequences."
+            self.battlefield_blocks.append(block)
+
+        # Runs of consecutive battlefields sharing a block: (first battle, last battle + 1, block, scales),
+        # where scales is a (num_battles_in_run, 1) column, or None if all scales are 1.
+        self.block_runs = []
+        battle_start = 0
+        for battle_id in range(1, self.num_battles + 1):
+            if battle_id < self.num_battles and self.battlefield_blocks[battle_id] is self.battlefield_blocks[battle_start]:
+                continue
+            scales = self.battlefield_scales[battle_start: battle_id]
+            scales = None if np.all(scales == 1.0) else scales.astype(dtype)[:, None]
+            self.block_runs.append((battle_start, battle_id, self.battlefield_blocks[battle_start], scales))
+            battle_start = battle_id
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the stored (distinct) blocks.
+        """
+        return sum(block.nbytes for block in {id(block): block for block in self.battlefield_blocks}.values())
+
+    def astype(self, dtype):
+        """
+        Returns the operator with blocks stored as dtype, e.g. np.float32 to run a solve in single precision.
+        """
+        if self.dtype == dtype:
+            return self
+        return BattlefieldPayoffOperator(self.dag_p1, self.dag_p2, self.battlefield_blocks, dtype, self.battlefield_scales)
+
+    def reward_vector_p1(self, strategy_p2: np.ndarray, out: np.ndarray = None):
+        """
+        Returns A y, the reward vector of player 1 against player 2's sequence form strategy y.
+        If out is given, the result is written there without allocating; out and strategy_p2 must then
+        have the dtype of the blocks.
+        """
+        if out is None:
+            rewards = np.zeros(self.shape[0], dtype=np.result_type(self.dtype, strategy_p2))
+        else:
+            rewards = out
+            rewards.fill(0.0)
+        for battle_start, battle_end, block, scales in self.block_runs:
+            row_start, row_end = self.row_offsets[battle_start], self.row_offsets[battle_end]
+            col_start, col_end = self.col_offsets[battle_start], self.col_offsets[battle_end]
+            run_rewards = rewards[row_start: row_end]
+            if isinstance(block, KroneckerBlock):
+                block.dot(strategy_p2[col_start: col_end], out=run_rewards)
+            else:
+                # One row of run_strategies (resp. run_rewards) per battlefield of the run.
+                run_strategies = strategy_p2[col_start: col_end].reshape(battle_end - battle_start, block.shape[1])
+                np.matmul(run_strategies, block.T, out=run_rewards.reshape(battle_end - battle_start, block.shape[0]))
+            if scales is not None:
+                run_rewards.reshape(battle_end - battle_start, block.shape[0])[:] *= scales
+        return rewards
+
+    def reward_vector_p2(self, strategy_p1: np.ndarray, out: np.ndarray = None):
+        """
+        Returns -A^T x, the reward vector of player 2 against player 1's sequence form strategy x.
+        If out is given, the result is written there without allocating, as in reward_vector_p1.
+        """
+        if out is None:
+            rewards = np.zeros(self.shape[1], dtype=np.result_type(self.dtype, strategy_p1))
+        else:
+            rewards = out
+            rewards.fill(0.0)
+        for battle_start, battle_end, block, scales in self.block_runs:
+            row_start, row_end = self.row_offsets[battle_start], self.row_offsets[battle_end]
+            col_start, col_end = self.col_offsets[battle_start], self.col_offsets[battle_end]
+            run_rewards = rewards[col_start: col_end]
+            if isinstance(block, KroneckerBlock):
+                block.dot_transpose(strategy_p1[row_start: row_end], out=run_rewards)
+            else:
+                run_strategies = strategy_p1[row_start: row_end].reshape(battle_end - battle_start, block.shape[0])
+                np.matmul(run_strategies, block, out=run_rewards.reshape(battle_end - battle_start, block.shape[1]))
+            if scales is not None:
+                run_rewards.reshape(battle_end - battle_start, block.shape[1])[:] *= scales
+        np.negative(rewards, out=rewards)
+        return rewards
+
+    def evaluate(self, strategy_p1: np.ndarray, strategy_p2: np.ndarray):
+        """
+        Returns the bilinear form x^T A y, the payoff of player 1.
+        """
+        return float(strategy_p1 @ self.reward_vector_p1(strategy_p2))
+
+    def dense_blocks(self):
+        """
+        Returns the (scaled) battlefield blocks as dense matrices.
+        """
+        return [dense_block(block) if scale == 1.0 else scale * dense_block(block)
+                for block, scale in zip(self.battlefield_blocks, self.battlefield_scales)]
+
+    def to_sparse(self):
+        """
+        Returns A as a scipy.sparse CSR matrix.
+        """
+        rows, cols, payoffs = [], [], []
+        for battle_id, block in enumerate(self.dense_blocks()):
+            row_ids, col_ids = np.indices(block.shape)
+            rows.append(row_ids.ravel() + self.row_offsets[battle_id])
+            cols.append(col_ids.ravel() + self.col_offsets[battle_id])
+            payoffs.append(block.ravel())
+
+        return sp.csr_matrix((np.concatenate(payoffs), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=self.shape)
+
+class BatchedBattlefieldPayoffOperator(object):
+    """
+    A batch of Blotto-family games played over the same pair of DAGs, e.g. the same game with different
+    battlefield worths. Battlefield blocks carry a leading batch dimension, and strategies and reward vectors
+    are (batch_size, num_sequences) arrays, so the reward vectors of all games are num_battles batched GEMVs.
+    """
+    def __init__(self,
+                 dag_p1: BlottoDagStructure,
+                 dag_p2: BlottoDagStructure,
+                 battlefield_blocks: List[np.ndarray]):
+        """
+        Args:
+            dag_p1 (BlottoDagStructure): DAG structure for player 1.
+            dag_p2 (BlottoDagStructure): DAG structure for player 2.
+            battlefield_blocks (List[np.ndarray]): One (batch_size, rows, columns) array per battlefield, laid out
+                as in BattlefieldPayoffOperator.
+        """
+        assert len(battlefield_blocks) == dag_p1.num_battles == dag_p2.num_battles
+        self.dag_p1 = dag_p1
+        self.dag_p2 = dag_p2
+        self.shape = (dag_p1.num_sequences, dag_p2.num_sequences)
+        self.num_battles = dag_p1.num_battles
+        self.row_offsets = dag_p1.dummy_seq_offsets.copy()
+        self.col_offsets = dag_p2.dummy_seq_offsets.copy()
+
+        self.battlefield_blocks = []
+        for battle_id, block in enumerate(battlefield_blocks):
+            block = np.ascontiguousarray(block, dtype=np.float64)
+            assert block.ndim == 3 and block.shape[1:] == (self.row_offsets[battle_id + 1] - self.row_offsets[battle_id],
+                                                           self.col_offsets[battle_id + 1] - self.col_offsets[battle_id]), \
+                f"Payoff block of battlefield {battle_id} does not match the dummy sequences."
+            self.battlefield_blocks.append(block)
+
+        self.batch_size = self.battlefield_blocks[0].shape[0]
+        assert all(block.shape[0] == self.batch_size for block in self.battlefield_blocks)
+
+    def from_games(games: List):
+        """
+        Stacks the BattlefieldPayoffOperators of games sharing the same DAG sizes.
+        """
+        payoff_operators = [game.payoff_operator for game in games]
+        assert all(payoff_operator.shape == payoff_operators[0].shape for payoff_operator in payoff_operators)
+        dense_blocks = [payoff_operator.dense_blocks() for payoff_operator in payoff_operators]
+        battlefield_blocks = [np.stack([blocks[battle_id] for blocks in dense_blocks])
+                              for battle_id in range(payoff_operators[0].num_battles)]
+        return BatchedBattlefieldPayoffOperator(games[0].dag_structure_pl1, games[0].dag_structure_pl2, battlefield_blocks)
+
+    def reward_vector_p1(self, strategy_p2: np.ndarray):
+        """
+        Returns A_k y_k for every game k, as a (batch_size, num_sequences_p1) array.
+        """
+        rewards = np.zeros((self.batch_size, self.shape[0]))
+        for battle_id, block in enumerate(self.battlefield_blocks):
+            row_start, row_end = self.row_offsets[battle_id], self.row_offsets[battle_id + 1]
+            col_start, col_end = self.col_offsets[battle_id], self.col_offsets[battle_id + 1]
+            rewards[:, row_start: row_end] = np.matmul(block, strategy_p2[:, col_start: col_end, None])[:, :, 0]
+        return rewards
+
+    def reward_vector_p2(self, strategy_p1: np.ndarray):
+        """
+        Returns -A_k^T x_k for every game k, as a (batch_size, num_sequences_p2) array.
+        """
+        rewards = np.zeros((self.batch_size, self.shape[1]))
+        for battle_id, block in enumerate(self.battlefield_blocks):
+            row_start, row_end = self.row_offsets[battle_id], self.row_offsets[battle_id + 1]
+            col_start, col_end = self.col_offsets[battle_id], self.col_offsets[battle_id + 1]
+            rewards[:, col_start: col_end] = np.matmul(strategy_p1[:, None, row_start: row_end], block)[:, 0, :]
+        np.negative(rewards, out=rewards)
+        return rewards
+
+    def evaluate(self, strategy_p1: np.ndarray, strategy_p2: np.ndarray):
+        """
+        Returns x_k^T A_k y_k for every game k.
+        """
+        return np.einsum('ki,ki->k', strategy_p1, self.reward_vector_p1(strategy_p2))
+
+    def instance(self, k: int):
+        """
+        Returns the BattlefieldPayoffOperator of game k.
+        """
+        return BattlefieldPayoffOperator(self.dag_p1, self.dag_p2, [block[k] for block in self.battlefield_blocks])
@@ -0,0 +1,237 @@
+"""
+Vectorized construction of the soldier-allocation DAG shared by all Blotto-family games.
+
+The DAG shape is fully determined by (num_battles, num_soldiers, dummy action sizes), so the
+CSR arrays are emitted directly with index arithmetic instead of calling add_infoset() once per
+infoset. The infoset ordering is identical to the one obtained by incremental construction
+(and to the C++ BlottoAlt::construct_xi_polytope):
+
+    (0, num_soldiers)                                   first battlefield, num_soldiers+1 actions
+    (battle_id, soldiers_left)   for battle_id >= 1     soldiers_left+1 actions
+    ('d', battle_id, soldiers_used)                     dummy infosets holding the battlefield game
+"""
+
+import numpy as np
+from online_learning.dag_structure import DagStructure
+
+class BlottoDagStructure(DagStructure):
+    def __init__(self,
+                 num_battles: int,
+                 num_soldiers: int,
+                 dummy_num_actions: np.ndarray = None):
+        """
+        Builds a frozen Blotto DAG.
+
+        Args:
+            num_battles (int): Number of battles in the game.
+            num_soldiers (int): Number of soldiers available to the player.
+            dummy_num_actions (np.ndarray): (num_battles, num_soldiers+1) array with the number of actions
+                in each dummy infoset ('d', battle_id, soldiers_used). Defaults to one action everywhere.
+        """
+        super().__init__()
+        assert num_battles > 0, "Number of battles must be greater than zero."
+        assert num_soldiers >= 0, "Number of soldiers cannot be negative."
+
+        S = num_soldiers + 1
+        if dummy_num_actions is None:
+            dummy_num_actions = np.ones((num_battles, S), dtype=np.int64)
+        dummy_num_actions = np.asarray(dummy_num_actions, dtype=np.int64)
+        assert dummy_num_actions.shape == (num_battles, S), "Dummy action sizes must be (num_battles, num_soldiers+1)."
+        assert np.all(dummy_num_actions > 0), "Number of actions must be greater than zero."
+
+        self.num_battles = num_battles
+        self.num_soldiers = num_soldiers
+        self.dummy_num_actions = dummy_num_actions
+
+        # Names are generated on demand only.
+        self._infoset_name_to_id = None
+        self._infoset_id_to_name = None
+
+        # Index tables of best_response(), built on first use.
+        self._best_response_tables = None
+
+        # ==============================================================================
+        # Infoset ids and starting sequence ids.
+        num_main_infosets = 1 + (num_battles - 1) * S
+        self.main_infoset_id = np.full((num_battles, S), -1, dtype=np.int64)
+        self.main_infoset_id[0, num_soldiers] = 0
+        self.main_infoset_id[1:] = 1 + np.arange((num_battles - 1) * S).reshape(num_battles - 1, S)
+        self.dummy_infoset_id = num_main_infosets + np.arange(num_battles * S).reshape(num_battles, S)
+
+        seqs_per_battle = S * (S + 1) // 2
+        soldiers = np.arange(S)
+        self.main_start_seq_id = np.full((num_battles, S), -1, dtype=np.int64)
+        self.main_start_seq_id[0, num_soldiers] = 1
+        self.main_start_seq_id[1:] = (1 + S + np.arange(num_battles - 1)[:, None] * seqs_per_battle
+                                      + (soldiers * (soldiers + 1) // 2)[None, :])
+        num_main_sequences = 1 + S + (num_battles - 1) * seqs_per_battle
+
+        dummy_num_actions_flat = dummy_num_actions.ravel()
+        self.dummy_start_seq_id = num_main_sequences + (np.cumsum(dummy_num_actions_flat) - dummy_num_actions_flat).reshape(num_battles, S)
+
+        self.num_infosets = num_main_infosets + num_battles * S
+        self.num_sequences = num_main_sequences + int(dummy_num_actions_flat.sum())
+
+        # Dummy sequences of battlefield b are contiguous (ordered by soldiers used, then action)
+        # and span [dummy_seq_offsets[b], dummy_seq_offsets[b+1]).
+        self.dummy_seq_offsets = np.append(self.dummy_start_seq_id[:, 0], self.num_sequences)
+
+        infoset_num_actions = np.concatenate([[S], np.tile(soldiers + 1, num_battles - 1), dummy_num_actions_flat])
+
+        # ==============================================================================
+        # Parent sequences.
+        # (soldiers_left, prev_soldiers) pairs with prev_soldiers >= soldiers_left, grouped by
+        # soldiers_left and in increasing prev_soldiers, matching the incremental construction.
+        left, prev = np.triu_indices(S)
+        first_seq = self.main_start_seq_id[0, num_soldiers]
+
+        parent_counts = np.concatenate([
+            [1],                                            # (0, num_soldiers)
+            np.ones(S if num_battles > 1 else 0),           # (1, soldiers_left): only parent is (0, num_soldiers)
+            np.tile(S - soldiers, max(num_battles - 2, 0)), # (battle_id >= 2, soldiers_left)
+            np.ones(S),                                     # ('d', 0, soldiers_used)
+            np.tile(S - soldiers, num_battles - 1),         # ('d', battle_id >= 1, soldiers_used)
+        ]).astype(np.int64)
+        parent_seq_ids = np.concatenate([
+            [0],
+            (first_seq + num_soldiers - soldiers) if num_battles > 1 else [],
+            (self.main_start_seq_id[1:-1][:, prev] + (prev - left)[None, :]).ravel(),
+            first_seq + soldiers,
+            (self.main_start_seq_id[1:][:, prev] + left[None, :]).ravel(),
+        ]).astype(np.int64)
+
+        parent_offsets = np.zeros(self.num_infosets + 1, dtype=np.int64)
+        np.cumsum(parent_counts, out=parent_offsets[1:])
+
+        self._set_frozen_arrays(infoset_num_actions, parent_offsets, parent_seq_ids)
+
+    def _compute_levels(self):
+        """
+        Levels are the battlefield layers: (battle_id, *) is at level battle_id and ('d', battle_id, *)
+        at level battle_id + 1.
+        """
+        S = self.num_soldiers + 1
+        return np.concatenate([[0],
+                               np.repeat(np.arange(1, self.num_battles), S),
+                               np.repeat(np.arange(1, self.num_battles + 1), S)]).astype(np.int64)
+
+    def best_response(self, rewards: np.ndarray):
+        """
+        Best response to a reward vector by dynamic programming over (battle_id, soldiers_left), with one
+        vectorized max-plus step per battlefield, from the last battlefield to the first:
+
+            V_d[b, u] = max_a rewards[('d', b, u), a]
+            V[b, l] = max_{u <= l} rewards[(b, l), u] + V_d[b, u] + V[b+1, l-u],    V[num_battles, *] = 0
+
+        The allocation is then read off top-down. Values are accumulated in the same order as the generic
+        traversal, and ties go to the first action, so the result is the one of the generic best response.
+
+        Returns:
+            np.ndarray: The pure best response in sequence form. rewards is not modified.
+        """
+        S = self.num_soldiers + 1
+        if self._best_response_tables is None:
+            soldiers_left, soldiers_sent = np.meshgrid(np.arange(S), np.arange(S), indexing='ij')
+            # Offset of the sequence (soldiers_left, soldiers_sent) within its battlefield layer, its validity,
+            # and the soldiers left for the next battlefield.
+            self._best_response_tables = (np.where(soldiers_sent <= soldiers_left, soldiers_left * (soldiers_left + 1) // 2 + soldiers_sent, 0),
+                                          soldiers_sent <= soldiers_left,
+                                          np.maximum(soldiers_left - soldiers_sent, 0))
+        layer_offsets, valid, next_soldiers_left = self._best_response_tables
+
+        dummy_start = self.dummy_seq_offsets[0]
+        dummy_values = np.maximum.reduceat(rewards[dummy_start:], (self.dummy_start_seq_id - dummy_start).ravel()).reshape(self.num_battles, S)
+
+        # choices[b, l]: soldiers sent to battlefield b with l soldiers left. Battlefield 0 only has l = num_soldiers.
+        choices = np.zeros((self.num_battles, S), dtype=np.int64)
+        next_values = np.zeros(S)
+        for battle_id in reversed(range(1, self.num_battles)):
+            action_values = rewards[self.main_start_seq_id[battle_id, 0] + layer_offsets] + dummy_values[battle_id]
+            action_values += next_values[next_soldiers_left]
+            action_values[~valid] = -np.inf
+            choices[battle_id] = np.argmax(action_values, axis=1)
+            next_values = action_values[np.arange(S), choices[battle_id]]
+        action_values = rewards[1: 1 + S] + dummy_values[0] + next_values[self.num_soldiers - np.arange(S)] \
+            if self.num_battles > 1 else rewards[1: 1 + S] + dummy_values[0]
+        choices[0, self.num_soldiers] = np.argmax(action_values)
+
+        ret = np.zeros(self.num_sequences)
+        ret[0] = 1.0
+        soldiers_left = self.num_soldiers
+        for battle_id in range(self.num_battles):
+            soldiers_sent = choices[battle_id, soldiers_left]
+            ret[self.main_start_seq_id[battle_id, soldiers_left] + soldiers_sent] = 1.0
+            dummy_start_seq_id = self.dummy_start_seq_id[battle_id, soldiers_sent]
+            dummy_rewards = rewards[dummy_start_seq_id: dummy_start_seq_id + self.dummy_num_actions[battle_id, soldiers_sent]]
+            ret[dummy_start_seq_id + np.argmax(dummy_rewards)] = 1.0
+            soldiers_left -= soldiers_sent
+        return ret
+
+    def allocation_seq_ids(self, soldiers_sent: np.ndarray):
+        """
+        Returns the sequence ids of the allocation sending soldiers_sent[b] soldiers to battlefield b, one
+        (battle_id, soldiers_left) sequence per battlefield.
+        """
+        soldiers_sent = np.asarray(soldiers_sent, dtype=np.int64)
+        assert soldiers_sent.shape == (self.num_battles,), "Expected the soldiers sent to every battlefield."
+        assert soldiers_sent.min() >= 0 and soldiers_sent.sum() <= self.num_soldiers, "Allocation exceeds the soldiers available."
+        soldiers_left = self.num_soldiers - np.concatenate([[0], np.cumsum(soldiers_sent)[:-1]])
+        return self.main_start_seq_id[np.arange(self.num_battles), soldiers_left] + soldiers_sent
+
+    def read_allocation(self, sequence_form: np.ndarray):
+        """
+        Returns the soldiers a pure strategy (in sequence form, e.g. a best response) sends to every battlefield.
+        """
+        soldiers_sent = np.zeros(self.num_battles, dtype=np.int64)
+        soldiers_left = self.num_soldiers
+        for battle_id in range(self.num_battles):
+            start_seq_id = self.main_start_seq_id[battle_id, soldiers_left]
+            soldiers_sent[battle_id] = np.argmax(sequence_form[start_seq_id: start_seq_id + soldiers_left + 1])
+            soldiers_left -= soldiers_sent[battle_id]
+        return soldiers_sent
+
+    def _generate_infoset_names(self):
+        names = [(0, self.num_soldiers)]
+        names.extend((battle_id, soldiers_left)
+                     for battle_id in range(1, self.num_battles)
+                     for soldiers_left in range(self.num_soldiers + 1))
+        names.extend(('d', battle_id, soldiers_used)
+                     for battle_id in range(self.num_battles)
+                     for soldiers_used in range(self.num_soldiers + 1))
+        return names
+
+    def match_infoset(self, source_dag: DagStructure, infoset_name):
+        """
+        Matches infosets of Blotto DAGs with different numbers of battles or soldiers. The soldier count in
+        the name is clipped to the soldiers of source_dag, so that e.g. (b, soldiers_left) falls back to 
+        (b, source_dag.num_soldiers) when source_dag never has that many soldiers left.
+        """
+        if not isinstance(source_dag, BlottoDagStructure):
+            return super().match_infoset(source_dag, infoset_name)
+
+        if infoset_name[0] == 'd':
+            _, battle_id, soldiers = infoset_name
+        else:
+            battle_id, soldiers = infoset_name
+        if battle_id >= source_dag.num_battles:
+            return None
+
+        soldiers = min(soldiers, source_dag.num_soldiers)
+        if infoset_name[0] == 'd':
+            return int(source_dag.dummy_infoset_id[battle_id, soldiers])
+        if battle_id == 0:
+            return int(source_dag.main_infoset_id[0, source_dag.num_soldiers])
+        return int(source_dag.main_infoset_id[battle_id, soldiers])
+
+def unit_test():
+    dag = BlottoDagStructure(3, 2, np.array([[1, 2, 1], [2, 2, 2], [1, 1, 3]]))
+    print("Number of sequences:", dag.num_sequences)
+    print("Number of infosets:", dag.num_infosets)
+    for infoset_id in range(dag.num_infosets):
+        print(dag.infoset_id_to_name[infoset_id],
+              dag.infoset_start_seq_id[infoset_id],
+              dag.infoset_num_actions[infoset_id],
+              dag.get_parent_seq_ids(infoset_id))
+
+if __name__ == "__main__":
+    unit_test()
@@ -0,0 +1,67 @@
+"""
+Python front end of the C++ BlottoAlt solver (fast/src/blotto_alt.cpp).
+
+The extension module game_defs/blotto_fast is built with
+
+    cd fast && make python
+
+The C++ sequence ordering (BlottoAlt::construct_xi_polytope) is the same as the one of
+BlottoDagStructure, so the solutions are wrapped as DagTreeplex objects over the game's DAGs as is.
+"""
+
+from typing import Tuple
+from online_learning.dag_treeplex import DagTreeplex
+from game_defs.generalized_blotto import GeneralizedBBBlottoGame
+
+# Regret minimizers available in the C++ engine.
+FAST_REGRET_MINIMIZERS = ('rm', 'rm+', 'prm', 'prm+')
+
+def solve_blotto_alt(game: GeneralizedBBBlottoGame,
+                     iterations: int = 10000,
+                     regret_minimizer: str = 'prm+',
+                     target_gap: float = 0.002,
+                     verbose: bool = False) -> Tuple[DagTreeplex, DagTreeplex]:
+    """
+    Solves a Blotto-family game with BlottoAlt::solve, i.e., alternating updates with quadratic averaging.
+
+    Args:
+        game (GeneralizedBBBlottoGame): The game to solve. Payoff matrices of its BayesianBattlefieldGames
+            which are C-contiguous float64 arrays are passed to C++ without copying.
+        iterations (int): Maximum number of iterations.
+        regret_minimizer (str): One of FAST_REGRET_MINIMIZERS.
+        target_gap (float): Stop once the saddle point gap (checked every 100 iterations) is below this.
+        verbose (bool): Print the gap and elapsed time whenever it is checked.
+
+    Returns:
+        Tuple[DagTreeplex, DagTreeplex]: Average sequence form strategies of both players.
+    """
+    try:
+        from game_defs import blotto_fast
+    except ImportError as e:
+        raise ImportError("The blotto_fast extension is not built, run `make python` in fast/.") from e
+
+    assert regret_minimizer in FAST_REGRET_MINIMIZERS, f"Unknown regret minimizer {regret_minimizer}."
+    # The C++ solver takes dense per-type payoff matrices, built once per battlefield.
+    payoff_matrices = [bbg.dense_payoff_matrices() for bbg in game.battlefield_bayesian_games]
+
+    solution_p1, solution_p2, _ = blotto_fast.solve(game.num_soldiers_p1,
+                                                    game.num_soldiers_p2,
+                                                    payoff_matrices,
+                                                    regret_minimizer,
+                                                    iterations,
+                                                    target_gap,
+                                                    verbose)
+
+    assert solution_p1.size == game.dag_structure_pl1.num_sequences
+    assert solution_p2.size == game.dag_structure_pl2.num_sequences
+    return DagTreeplex(game.dag_structure_pl1, solution_p1), DagTreeplex(game.dag_structure_pl2, solution_p2)
+
+def unit_test():
+    from game_defs.battlefield_games import BlottoWithRaise
+
+    game = BlottoWithRaise(3, (5, 3), [1.0, 2.0, 3.0], soft_victory=True, raise_multiplier=2.0)
+    strat_p1, strat_p2 = solve_blotto_alt(game, iterations=10000, target_gap=1e-4)
+    print(game.evaluate(strat_p1, strat_p2), game.saddle_point_gap(strat_p1, strat_p2))
+
+if __name__ == "__main__":
+    unit_test()
@@ -10,19 +10,33 @@ from online_learning.dag_structure import DagStructure
 from online_learning.regret_matching import RegretMatching
 from online_learning.dag_treeplex import DagTreeplex
 from online_learning.dag_regret_minimizer import DagGame
+from game_defs.blotto_dag import BlottoDagStructure
+from game_defs.battlefield_payoff import BattlefieldPayoffOperator, KroneckerBlock, share_proportional_blocks
 import numpy as np 
 import copy
 
 class BayesianBattlefieldGame(object):
     '''
     This is for a single battlefield!
+
+    Payoffs are stored as one padded tensor payoff_tensor[soldiers_p1, soldiers_p2, action_p1, action_p2],
+    where a player sending s soldiers (its type) has num_actions[s] actions. Entries beyond the number of
+    actions of a type (action_mask_p1/p2 is False there) are padding and ignored.
+
+    If every type of a player has the same number of actions, the payoffs may instead be given in factored
+    form, payoff_tensor[s1, s2, a1, a2] = sum_k type_payoffs_k[s1, s2] * action_payoffs_k[a1, a2], which is
+    kept as is (payoff_tensor is then None) and used by the payoff operator without ever building the tensor.
+    Callers needing dense payoffs use dense_payoff_tensor() or dense_payoff_matrices(), which build them on
+    every call for factored payoffs.
     '''
     def __init__(self, 
                  max_soldiers_p1: int,
                  max_soldiers_p2: int,
                  num_actions_p1: List[int], 
                  num_actions_p2: List[int],
-                 payoff_matrices: List[List[np.ndarray]],
+                 payoff_matrices: List[List[np.ndarray]] = None,
+                 payoff_tensor: np.ndarray = None,
+                 payoff_factors: List[Tuple[np.ndarray, np.ndarray]] = None,
                  ):
         """
         Initializes a Bayesian battlefield game.
@@ -33,23 +47,92 @@ class BayesianBattlefieldGame(object):
             num_actions_p1 (List[int]): List of possible actions for player 1 in each type.
             num_actions_p2 (List[int]): List of possible actions for player 2 in each type.
             payoff_matrices (List[List[np.ndarray]]): Payoff matrices for each pairs of types.
+            payoff_tensor (np.ndarray): Padded (max_soldiers_p1+1, max_soldiers_p2+1, max(num_actions_p1), 
+                max(num_actions_p2)) payoff tensor, e.g. built with broadcasting. 
+            payoff_factors (List[Tuple[np.ndarray, np.ndarray]]): Kronecker terms (type_payoffs, action_payoffs)
+                of shapes (max_soldiers_p1+1, max_soldiers_p2+1) and (num_actions_p1, num_actions_p2).
+                Exactly one of payoff_matrices, payoff_tensor and payoff_factors must be given.
         """
         self.max_soldiers_p1 = max_soldiers_p1
         self.max_soldiers_p2 = max_soldiers_p2
-        self.num_actions_p1 = num_actions_p1
-        self.num_actions_p2 = num_actions_p2
-        self.payoff_matrices = payoff_matrices
-
-        # Check that the payoff matrices are of the correct size.
-        print(len(payoff_matrices), max_soldiers_p1 + 1)
-        assert len(payoff_matrices) == max_soldiers_p1 + 1
-        assert all(len(payoff_matrices[i]) == max_soldiers_p2 + 1 for i in range(max_soldiers_p1 + 1))
-        for i in range(max_soldiers_p1 + 1):
-            for j in range(max_soldiers_p2 + 1):
-                assert payoff_matrices[i][j].shape == (num_actions_p1[i], num_actions_p2[j]), \
-                    f"Payoff matrix for ({i}, {j}) does not match the number of actions."
-                
-                
+        self.num_actions_p1 = np.asarray(num_actions_p1, dtype=np.int64)
+        self.num_actions_p2 = np.asarray(num_actions_p2, dtype=np.int64)
+        assert self.num_actions_p1.shape == (max_soldiers_p1 + 1,) and self.num_actions_p2.shape == (max_soldiers_p2 + 1,)
+
+        self.action_mask_p1 = np.arange(self.num_actions_p1.max())[None, :] < self.num_actions_p1[:, None]
+        self.action_mask_p2 = np.arange(self.num_actions_p2.max())[None, :] < self.num_actions_p2[:, None]
+        shape = (max_soldiers_p1 + 1, max_soldiers_p2 + 1, self.action_mask_p1.shape[1], self.action_mask_p2.shape[1])
+
+        assert sum(payoffs is not None for payoffs in (payoff_matrices, payoff_tensor, payoff_factors)) == 1, \
+            "Specify exactly one of payoff_matrices, payoff_tensor and payoff_factors."
+        self.payoff_factors = None
+        self.payoff_tensor = None
+        if payoff_factors is not None:
+            assert self.action_mask_p1.all() and self.action_mask_p2.all(), \
+                "Factored payoffs require the same number of actions in every type."
+            self.payoff_factors = [(np.ascontiguousarray(type_payoffs, dtype=np.float64), np.ascontiguousarray(action_payoffs, dtype=np.float64))
+                                   for type_payoffs, action_payoffs in payoff_factors]
+            assert all(type_payoffs.shape == shape[:2] and action_payoffs.shape == shape[2:]
+                       for type_payoffs, action_payoffs in self.payoff_factors), "Payoff factors do not match the game size."
+            return
+
+        if payoff_tensor is None:
+            # Check that the payoff matrices are of the correct size.
+            assert len(payoff_matrices) == max_soldiers_p1 + 1
+            assert all(len(payoff_matrices[i]) == max_soldiers_p2 + 1 for i in range(max_soldiers_p1 + 1))
+            payoff_tensor = np.zeros(shape)
+            for i in range(max_soldiers_p1 + 1):
+                for j in range(max_soldiers_p2 + 1):
+                    assert payoff_matrices[i][j].shape == (self.num_actions_p1[i], self.num_actions_p2[j]), \
+                        f"Payoff matrix for ({i}, {j}) does not match the number of actions."
+                    payoff_tensor[i, j, :self.num_actions_p1[i], :self.num_actions_p2[j]] = payoff_matrices[i][j]
+
+        self.payoff_tensor = np.ascontiguousarray(payoff_tensor, dtype=np.float64)
+        assert self.payoff_tensor.shape == shape, f"Payoff tensor must be of shape {shape}."
+
+    def dense_payoff_tensor(self):
+        """
+        Returns the padded payoff tensor: payoff_tensor itself, or, for factored payoffs, a new tensor built
+        from the factors on every call.
+        """
+        if self.payoff_factors is None:
+            return self.payoff_tensor
+        return sum(type_payoffs[:, :, None, None] * action_payoffs[None, None, :, :]
+                   for type_payoffs, action_payoffs in self.payoff_factors)
+
+    def dense_payoff_matrices(self):
+        """
+        Returns the payoff matrix of each pair of types, as views into dense_payoff_tensor().
+        """
+        payoff_tensor = self.dense_payoff_tensor()
+        return [[payoff_tensor[i, j, :self.num_actions_p1[i], :self.num_actions_p2[j]]
+                 for j in range(self.max_soldiers_p2 + 1)]
+                for i in range(self.max_soldiers_p1 + 1)]
+
+    def to_block(self):
+        """
+        Returns the payoffs as one dense matrix with rows (resp. columns) indexed by (soldiers used, action)
+        of player 1 (resp. player 2), i.e., the payoff matrices tiled by type with the padding removed.
+        """
+        payoff_tensor = self.dense_payoff_tensor()
+        num_rows = payoff_tensor.shape[0] * payoff_tensor.shape[2]
+        num_cols = payoff_tensor.shape[1] * payoff_tensor.shape[3]
+        block = payoff_tensor.transpose(0, 2, 1, 3).reshape(num_rows, num_cols)
+        if not self.action_mask_p1.all():
+            block = block[self.action_mask_p1.ravel()]
+        if not self.action_mask_p2.all():
+            block = block[:, self.action_mask_p2.ravel()]
+        return block
+
+    def payoff_block(self):
+        """
+        Returns the battlefield block used by the payoff operator: a KroneckerBlock for factored payoffs,
+        and the dense block of to_block() otherwise.
+        """
+        if self.payoff_factors is not None:
+            return KroneckerBlock([type_payoffs for type_payoffs, _ in self.payoff_factors],
+                                  [action_payoffs for _, action_payoffs in self.payoff_factors])
+        return self.to_block()
 
 class GeneralizedBBBlottoGame(DagGame):
     def __init__(self, num_battles: int, 
@@ -73,139 +156,70 @@ class GeneralizedBBBlottoGame(DagGame):
         assert len(battlefield_bayesian_games) == num_battles
         
         # Get action sizes for each player, for each about of soliders played.
-        action_sizes_p1 = []
-        action_sizes_p2 = []
-        for battle_id in range(num_battles):
-            action_sizes_p1.append([])
-            action_sizes_p2.append([])
-            for num_soldiers_used_p1 in range(num_soldiers_p1+1):
-                num_actions = battlefield_bayesian_games[battle_id].num_actions_p1[num_soldiers_used_p1]
-                action_sizes_p1[-1].append(num_actions)
-            for num_soldiers_used_p2 in range(num_soldiers_p2+1):
-                num_actions = battlefield_bayesian_games[battle_id].num_actions_p2[num_soldiers_used_p2]
-                action_sizes_p2[-1].append(num_actions)
+        action_sizes_p1 = np.stack([bbg.num_actions_p1 for bbg in battlefield_bayesian_games])
+        action_sizes_p2 = np.stack([bbg.num_actions_p2 for bbg in battlefield_bayesian_games])
 
 
         # Generate DAGs for each player.
         dag_p1 = GeneralizedBBBlottoGame.generate_dag(num_battles, num_soldiers_p1, action_sizes_p1)
         dag_p2 = GeneralizedBBBlottoGame.generate_dag(num_battles, num_soldiers_p2, action_sizes_p2)
 
-        # Generate payoffs for each player. 
-        leaves = GeneralizedBBBlottoGame.generate_sparse_payoffs(dag_p1, 
-                                                    dag_p2, 
-                                                    num_battles, 
-                                                    num_soldiers_p1, 
-                                                    num_soldiers_p2,
-                                                    battlefield_bayesian_games)
+        # Generate payoffs for each player, one dense block per battlefield.
+        battlefield_blocks = GeneralizedBBBlottoGame.generate_battlefield_blocks(num_battles, 
+                                                                                 num_soldiers_p1, 
+                                                                                 num_soldiers_p2,
+                                                                                 battlefield_bayesian_games)
+        # Battlefields which only differ by their worth share one block.
+        battlefield_blocks, battlefield_scales = share_proportional_blocks(battlefield_blocks)
+        payoff_operator = BattlefieldPayoffOperator(dag_p1, dag_p2, battlefield_blocks, battlefield_scales=battlefield_scales)
 
-        super().__init__(dag_p1, dag_p2, leaves)       
+        super().__init__(dag_p1, dag_p2, payoff_operator=payoff_operator)
 
 
     def generate_dag(num_battles: int, 
                      num_soldiers: int,
-                     num_actions_per_bf_per_soldiers : List[List[int]]):
+                     num_actions_per_bf_per_soldiers : np.ndarray):
         """
 
         Additional speedup:
         --------
         We add in one dummy infoset for each battle for each number of soldiers used. 
         This is used to "fake" payoffs and make the payoff matrix a lot sparser.
-        """
-
-        dag = DagStructure()
 
-        # First battlefield is special.
-        dag.add_infoset([0], num_soldiers+1, (0, num_soldiers))
-
-        # Add in main infosets
-        for battle_id in range(1, num_battles):
-            for num_soldiers_left in range(num_soldiers+1):
-                # Get parent sequences.
-                par_seq_ids = []
-                for prev_num_soldiers in range(num_soldiers_left, num_soldiers+1):
-                    num_soldiers_used = prev_num_soldiers - num_soldiers_left
-                    assert num_soldiers_used >= 0
-
-                    par_infoset_name = (battle_id-1, prev_num_soldiers)
-                    if par_infoset_name not in dag.infoset_name_to_id:
-                        assert battle_id == 1
-                    else:
-                        par_infoset_id = dag.infoset_name_to_id[par_infoset_name]
-                        par_seq_id = dag.infoset_start_seq_id[par_infoset_id] + num_soldiers_used
-                        par_seq_ids.append(par_seq_id)
-                        
+        The DAG shape only depends on the sizes, so it is emitted directly in (frozen) CSR form
+        by BlottoDagStructure; infoset names are only generated if someone asks for them.
+        """
 
-                dag.add_infoset(par_seq_ids, num_soldiers_left+1, (battle_id, num_soldiers_left))
+        return BlottoDagStructure(num_battles, num_soldiers, num_actions_per_bf_per_soldiers)
 
-        # Add in dummy infosets
-        for battle_id in range(num_battles):
-            for num_soldiers_used in range(num_soldiers+1):
-                par_seq_ids = []
-                
-                # Infoset name is ('d', battle_id, num_soldiers_used)
-                # Special 'd' marker to distinguish this name from the regular infoset.
-                new_infoset_name = ('d', battle_id, num_soldiers_used)
-
-                # Iterate over all possible parent sequences
-                for initial_infoset in range(num_soldiers_used, num_soldiers+1):
-                    par_infoset_name = (battle_id, initial_infoset)
-                    if par_infoset_name not in dag.infoset_name_to_id:
-                        assert battle_id == 0
-                    else:
-                        infoset_id = dag.infoset_name_to_id[par_infoset_name]
-                        seq_id = dag.infoset_start_seq_id[infoset_id] + num_soldiers_used
-                        par_seq_ids.append(seq_id)
-                
-                # Create new dummy infoset
-                dag.add_infoset(par_seq_ids, 
-                                num_actions_per_bf_per_soldiers[battle_id][num_soldiers_used], 
-                                new_infoset_name)
-                
-        # print('----------------------------------------------')
-        return dag
-
-    def generate_sparse_payoffs(dag_p1: DagStructure, 
-                                dag_p2: DagStructure,
-                                num_battles: int, 
-                                num_soldiers_p1: int,
-                                num_soldiers_p2: int,
-                                battlefield_bayesian_games: List[BayesianBattlefieldGame]):
-        """
-        Generates sparse payoffs for the Blotto game.
+    def generate_battlefield_blocks(num_battles: int, 
+                                    num_soldiers_p1: int,
+                                    num_soldiers_p2: int,
+                                    battlefield_bayesian_games: List[BayesianBattlefieldGame]):
+        """
+        Generates the payoffs for the Blotto game, one block per battlefield (see BayesianBattlefieldGame.payoff_block()).
 
         Args:
-            dag_p1 (DagStructure): DAG structure for player 1.
-            dag_p2 (DagStructure): DAG structure for player 2.
             num_battles (int): Number of battles in the game.
             num_soldiers_p1 (int): Number of soldiers for player 1.
             num_soldiers_p2 (int): Number of soldiers for player 2.
+            battlefield_bayesian_games (List[BayesianBattlefieldGame]): Battlefield game of each battlefield.
 
         Returns:
-            Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray]]: Payoffs for both players.
+            List[np.ndarray]: For each battlefield, the payoffs of player 1 with rows (resp. columns) 
+                indexed by (soldiers used, action) of player 1 (resp. player 2).
         """
 
-        leaves = dict()
-
-         # Iterate through all dummy infosets in the DAG
+        battlefield_blocks = []
         for battle_id in range(num_battles):
             bbg = battlefield_bayesian_games[battle_id]
-            for num_soldiers_used_p1 in range(num_soldiers_p1+1):
-                for num_soldiers_used_p2 in range(num_soldiers_p2+1):
-                    p1_dummy_infoset = dag_p1.infoset_name_to_id[('d', battle_id, num_soldiers_used_p1)]
-                    p2_dummy_infoset = dag_p2.infoset_name_to_id[('d', battle_id, num_soldiers_used_p2)]
-                    
-                    submatrix_game = bbg.payoff_matrices[num_soldiers_used_p1][num_soldiers_used_p2]
-                    assert submatrix_game.shape == (bbg.num_actions_p1[num_soldiers_used_p1], bbg.num_actions_p2[num_soldiers_used_p2])
-
-                    p1_start_seq_id = dag_p1.infoset_start_seq_id[p1_dummy_infoset]
-                    p2_start_seq_id = dag_p2.infoset_start_seq_id[p2_dummy_infoset]
-
-                    for action_id_p1 in range(bbg.num_actions_p1[num_soldiers_p1]):
-                        for action_id_p2 in range(bbg.num_actions_p2[num_soldiers_p2]):
-                            payoff = submatrix_game[action_id_p1, action_id_p2]
-                            leaves[(p1_start_seq_id + action_id_p1, p2_start_seq_id + action_id_p2)] = payoff
-        
-        return leaves
+            assert bbg.max_soldiers_p1 == num_soldiers_p1 and bbg.max_soldiers_p2 == num_soldiers_p2
+
+            # Dummy sequences of a battlefield are ordered by (soldiers used, action), which is
+            # exactly the layout of the payoff matrices tiled by type.
+            battlefield_blocks.append(bbg.payoff_block())
+
+        return battlefield_blocks
 
 def unit_test():
     BlottoGame(3, (5, 3), [1.0, 1.0, 1.0])
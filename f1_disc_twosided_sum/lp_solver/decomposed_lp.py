@@ -0,0 +1,222 @@
+"""
+Battlefield-decomposed LP for Blotto-family games, solved by column generation.
+
+All payoffs of a Blotto-family game are between the dummy sequences ('d', b, s) of the two players (see
+BattlefieldPayoffOperator), so the game only depends on each player's per-battlefield marginals: the mass
+of every (battlefield, soldiers sent, action) dummy sequence. The soldier budget couples the battlefields
+only through these marginals, whose feasible set is the convex hull of the pure allocations (paths of the
+(battle_id, soldiers_left) flow DAG). Instead of encoding the whole flow DAG as in the sequence-form LP,
+the master LP keeps the dummy marginals and a restricted set of allocations (columns) of each player:
+
+    min   t
+    s.t.  t - sum_b w_{b, s_k[b]} >= 0                    for every allocation s_k of player 1
+          w_{b,s} - (A_b y_b)_{(s,a)} >= 0                 for every dummy sequence (b, s, a) of player 1
+          sum_a y_{b,(s,a)} - sum_j mu_j [s_j[b] = s] = 0  for every battlefield b and soldiers s of player 2
+          sum_j mu_j = 1,   y >= 0, mu >= 0
+
+where w_{b,s} is player 1's best value in battlefield b when sending s soldiers. The duals of the first two
+blocks are player 1's mixture over its allocations and its dummy marginals. New allocations are priced by
+the best response DP of BlottoDagStructure against the master's strategies (double oracle), until neither
+player has an improving allocation.
+"""
+
+from typing import Dict, List, Tuple
+import warnings
+import numpy as np
+import scipy.sparse as sp
+from game_defs.blotto_dag import BlottoDagStructure
+from game_defs.battlefield_payoff import BattlefieldPayoffOperator
+from online_learning.dag_regret_minimizer import DagGame
+from online_learning.dag_treeplex import DagTreeplex
+from lp_solver.sequence_form_lp import SequenceFormLp
+from lp_solver.lp_backends import solve_sparse_lp
+
+class DecomposedLpSolver(object):
+    def __init__(self, game: DagGame):
+        """
+        Args:
+            game (DagGame): A Blotto-family game, i.e., played over BlottoDagStructures with a
+                BattlefieldPayoffOperator (BlottoGame, GeneralizedBBBlottoGame and subclasses).
+        """
+        assert isinstance(game.dag_structure_pl1, BlottoDagStructure) and isinstance(game.dag_structure_pl2, BlottoDagStructure), \
+            "The decomposed LP needs Blotto DAGs."
+        assert isinstance(game.payoff_operator, BattlefieldPayoffOperator), "The decomposed LP needs a battlefield payoff operator."
+        self.game = game
+        self.dag_p1 = game.dag_structure_pl1
+        self.dag_p2 = game.dag_structure_pl2
+        self.num_battles = self.dag_p1.num_battles
+        self.num_types_p1 = self.num_battles * (self.dag_p1.num_soldiers + 1)
+        self.num_types_p2 = self.num_battles * (self.dag_p2.num_soldiers + 1)
+        self.last_result = None
+        self.last_report = None
+
+        # Payoffs between the dummy sequences, normalized by their largest magnitude.
+        dummy_start_p1, dummy_start_p2 = self.dag_p1.dummy_seq_offsets[0], self.dag_p2.dummy_seq_offsets[0]
+        dummy_payoffs = game.payoff_operator.to_sparse()[dummy_start_p1:, dummy_start_p2:]
+        self.payoff_scale = float(abs(dummy_payoffs).max()) if dummy_payoffs.nnz > 0 else 1.0
+        if self.payoff_scale == 0.0:
+            self.payoff_scale = 1.0
+        self.dummy_payoffs = (dummy_payoffs / self.payoff_scale).tocsr()
+
+        # (num_dummy_sequences, num_types) maps from every dummy sequence to its (battlefield, soldiers sent).
+        self.type_matrix_p1 = DecomposedLpSolver.type_matrix(self.dag_p1)
+        self.type_matrix_p2 = DecomposedLpSolver.type_matrix(self.dag_p2)
+
+    def type_matrix(dag: BlottoDagStructure):
+        """
+        Returns the 0/1 matrix mapping every dummy sequence to its dummy infoset ('d', b, s), whose index
+        b * (num_soldiers + 1) + s is the type (battlefield, soldiers sent) of the sequence.
+        """
+        first_dummy_infoset_id = dag.dummy_infoset_id[0, 0]
+        return SequenceFormLp.owner_matrix(dag)[dag.dummy_seq_offsets[0]:, first_dummy_infoset_id:].tocsr()
+
+    def allocation_matrix(dag: BlottoDagStructure, allocations: List[np.ndarray]):
+        """
+        Returns the (num_types, num_allocations) 0/1 matrix of the types (battlefield, soldiers sent) used by every allocation.
+        """
+        rows = np.concatenate([np.arange(dag.num_battles) * (dag.num_soldiers + 1) + soldiers_sent for soldiers_sent in allocations])
+        cols = np.repeat(np.arange(len(allocations)), dag.num_battles)
+        return sp.csr_matrix((np.ones(rows.size), (rows, cols)), shape=(dag.num_battles * (dag.num_soldiers + 1), len(allocations)))
+
+    def even_allocation(dag: BlottoDagStructure):
+        """
+        Returns the allocation spreading all soldiers as evenly as possible, used as the first column.
+        """
+        return dag.num_soldiers // dag.num_battles + (np.arange(dag.num_battles) < dag.num_soldiers % dag.num_battles).astype(np.int64)
+
+    def build_master(self, allocations_p1: List[np.ndarray], allocations_p2: List[np.ndarray]):
+        """
+        Assembles the master LP restricted to the given allocations, with variables [t; w; y; mu].
+
+        Returns:
+            Tuple: objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs and lower_bounds,
+                in the order of lp_backends.solve_sparse_lp.
+        """
+        num_dummy_p1, num_dummy_p2 = self.dummy_payoffs.shape
+        num_allocations_p1, num_allocations_p2 = len(allocations_p1), len(allocations_p2)
+        allocation_matrix_p1 = DecomposedLpSolver.allocation_matrix(self.dag_p1, allocations_p1)
+        allocation_matrix_p2 = DecomposedLpSolver.allocation_matrix(self.dag_p2, allocations_p2)
+
+        allocation_rows = sp.hstack([np.ones((num_allocations_p1, 1)), -allocation_matrix_p1.T,
+                                     sp.csr_matrix((num_allocations_p1, num_dummy_p2 + num_allocations_p2))])
+        battlefield_rows = sp.hstack([sp.csr_matrix((num_dummy_p1, 1)), self.type_matrix_p1, -self.dummy_payoffs,
+                                      sp.csr_matrix((num_dummy_p1, num_allocations_p2))])
+        inequality_matrix = sp.vstack([allocation_rows, battlefield_rows], format="csr")
+
+        marginal_rows = sp.hstack([sp.csr_matrix((self.num_types_p2, 1 + self.num_types_p1)), self.type_matrix_p2.T,
+                                   -allocation_matrix_p2])
+        simplex_row = sp.hstack([sp.csr_matrix((1, 1 + self.num_types_p1 + num_dummy_p2)), np.ones((1, num_allocations_p2))])
+        equality_matrix = sp.vstack([marginal_rows, simplex_row], format="csr")
+        equality_rhs = np.zeros(self.num_types_p2 + 1)
+        equality_rhs[-1] = 1.0
+
+        num_vars = 1 + self.num_types_p1 + num_dummy_p2 + num_allocations_p2
+        objective = np.zeros(num_vars)
+        objective[0] = 1.0
+        lower_bounds = np.concatenate([np.full(1 + self.num_types_p1, -np.inf), np.zeros(num_dummy_p2 + num_allocations_p2)])
+        return objective, inequality_matrix, np.zeros(inequality_matrix.shape[0]), equality_matrix, equality_rhs, lower_bounds
+
+    def sequence_form(dag: BlottoDagStructure, allocations: List[np.ndarray], allocation_masses: np.ndarray, dummy_masses: np.ndarray):
+        """
+        Returns the sequence form strategy mixing the allocations with the given masses and playing the dummy
+        sequences with the given (marginal) masses.
+        """
+        strategy = np.zeros(dag.num_sequences)
+        strategy[0] = 1.0
+        for soldiers_sent, mass in zip(allocations, allocation_masses):
+            strategy[dag.allocation_seq_ids(soldiers_sent)] += mass
+        strategy[dag.dummy_seq_offsets[0]:] = dummy_masses
+        return DagTreeplex(dag, strategy)
+
+    def solve_lp(self,
+                 backend: str = None,
+                 method: str = None,
+                 verbose: bool = True,
+                 tolerance: float = 1e-9,
+                 max_iterations: int = 10000) -> Tuple[DagTreeplex, DagTreeplex, float]:
+        """
+        Solves the game by column generation over allocations: solve the master LP, add the best response
+        allocation of each player against the master's strategies, and stop once the saddle point gap of
+        the master's strategies is at most tolerance. If instead max_iterations is reached, or neither best
+        response is new while the gap is above tolerance (a numerical stall), a RuntimeWarning is issued and
+        last_report['converged'] is False.
+
+        Args:
+            backend (str): LP backend of the master, see lp_backends.default_backend().
+            method (str): LP method of the master, see lp_backends.solve_sparse_lp().
+            verbose (bool): Print the progress and the final report.
+            tolerance (float): Saddle point gap at which to stop.
+            max_iterations (int): Maximum number of master solves.
+
+        Returns:
+            Tuple[DagTreeplex, DagTreeplex, float]: Sequence form strategies of both players in the full DAGs and
+                the value of the last master LP. The report (see solve_report()) is kept in last_report.
+        """
+        allocations_p1 = [DecomposedLpSolver.even_allocation(self.dag_p1)]
+        allocations_p2 = [DecomposedLpSolver.even_allocation(self.dag_p2)]
+        seen_p1 = {tuple(allocations_p1[0])}
+        seen_p2 = {tuple(allocations_p2[0])}
+        num_types_p1, num_dummy_p2 = self.num_types_p1, self.dummy_payoffs.shape[1]
+
+        for iteration in range(1, max_iterations + 1):
+            master = self.build_master(allocations_p1, allocations_p2)
+            result = solve_sparse_lp(*master, backend=backend, method=method)
+            num_allocations_p1 = len(allocations_p1)
+            strategy_p1 = DecomposedLpSolver.sequence_form(self.dag_p1, allocations_p1,
+                                                           np.maximum(result.inequality_duals[:num_allocations_p1], 0.0),
+                                                           np.maximum(result.inequality_duals[num_allocations_p1:], 0.0))
+            strategy_p2 = DecomposedLpSolver.sequence_form(self.dag_p2, allocations_p2,
+                                                           np.maximum(result.x[1 + num_types_p1 + num_dummy_p2:], 0.0),
+                                                           np.maximum(result.x[1 + num_types_p1: 1 + num_types_p1 + num_dummy_p2], 0.0))
+
+            # Pricing: best responses of both players in the full DAGs.
+            reward_p1, reward_p2 = self.game.compute_reward_vectors(strategy_p1, strategy_p2)
+            br_p1 = strategy_p1.best_response_to_reward_vector(reward_p1).treeplex_data
+            br_p2 = strategy_p2.best_response_to_reward_vector(reward_p2).treeplex_data
+            gap = float(br_p1 @ reward_p1) + float(br_p2 @ reward_p2)
+            if verbose:
+                print(f"Iteration {iteration}: value {result.value * self.payoff_scale:.10f}, gap {gap:.3e}, "
+                      f"allocations {len(allocations_p1)} + {len(allocations_p2)}")
+
+            new_p1 = self.dag_p1.read_allocation(br_p1)
+            new_p2 = self.dag_p2.read_allocation(br_p2)
+            is_new_p1, is_new_p2 = tuple(new_p1) not in seen_p1, tuple(new_p2) not in seen_p2
+            if gap <= tolerance or not (is_new_p1 or is_new_p2):
+                break
+            if is_new_p1:
+                allocations_p1.append(new_p1)
+                seen_p1.add(tuple(new_p1))
+            if is_new_p2:
+                allocations_p2.append(new_p2)
+                seen_p2.add(tuple(new_p2))
+
+        self.last_result = result
+        value = result.value * self.payoff_scale
+        self.last_report = self.solve_report(master, iteration, allocations_p1, allocations_p2, value, gap, tolerance)
+        if not self.last_report["converged"]:
+            reason = "stalled (no new best response)" if iteration < max_iterations else f"reached max_iterations={max_iterations}"
+            warnings.warn(f"Column generation {reason} with saddle point gap {gap:.3e} > tolerance {tolerance:.3e}.",
+                          RuntimeWarning)
+        if verbose:
+            print(", ".join(f"{key}: {val}" for key, val in self.last_report.items()))
+        return strategy_p1, strategy_p2, value
+
+    def solve_report(self, master: Tuple, iterations: int, allocations_p1: List[np.ndarray], allocations_p2: List[np.ndarray],
+                     value: float, gap: float, tolerance: float) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: value (of the last master LP), gap (saddle point gap of the returned strategies),
+                converged (whether the gap is at most tolerance), iterations (master solves), allocations_p1/p2 (columns generated), and the size of the last master
+                LP, master_num_vars and master_nnz.
+        """
+        _, inequality_matrix, _, equality_matrix, _, lower_bounds = master
+        return {
+            "value": value,
+            "gap": gap,
+            "converged": gap <= tolerance,
+            "iterations": iterations,
+            "allocations_p1": len(allocations_p1),
+            "allocations_p2": len(allocations_p2),
+            "master_num_vars": lower_bounds.size,
+            "master_nnz": inequality_matrix.nnz + equality_matrix.nnz,
+        }
@@ -0,0 +1,180 @@
+"""
+LP backends for sparse LPs of the form
+
+    min   objective^T x
+    s.t.  inequality_matrix x >= inequality_rhs
+          equality_matrix x = equality_rhs
+          lower_bounds <= x <= upper_bounds
+
+Backends are imported lazily, so that a backend whose package (or license) is missing is only an error
+if it is actually used:
+    'gurobi': Gurobi through its matrix API (needs a license).
+    'highs':  HiGHS through scipy.optimize.linprog (no license).
+
+The backend is chosen at runtime: an explicit backend argument, else the LP_BACKEND environment variable,
+else Gurobi if it can create a model (i.e., a license is available) and HiGHS otherwise.
+
+A primal-dual start (e.g. from an approximate equilibrium) can be passed to warm start simplex. Gurobi gets
+it as PStart/DStart; HiGHS (through linprog) ignores it.
+"""
+
+from typing import Tuple
+import os
+import numpy as np
+import scipy.sparse as sp
+
+LP_BACKENDS = ('gurobi', 'highs')
+
+# Per backend: method name -> backend setting. linprog cannot select HiGHS' primal simplex, so 'primal_simplex'
+# is only available with Gurobi.
+LP_METHODS = {
+    'gurobi': {None: -1, 'dual_simplex': 1, 'primal_simplex': 0, 'barrier': 2},
+    'highs': {None: 'highs', 'dual_simplex': 'highs-ds', 'barrier': 'highs-ipm'},
+}
+
+_gurobi_available = None
+
+class LpResult(object):
+    def __init__(self, value: float, x: np.ndarray, inequality_duals: np.ndarray, equality_duals: np.ndarray, backend: str,
+                 iterations: int = None):
+        """
+        Args:
+            value (float): Optimal objective value.
+            x (np.ndarray): Optimal primal solution.
+            inequality_duals (np.ndarray): Duals of the >= constraints, nonnegative.
+            equality_duals (np.ndarray): Duals of the equality constraints, i.e., the derivative of the value
+                with respect to equality_rhs.
+            backend (str): Backend which solved the LP.
+            iterations (int): Simplex (or barrier) iterations, if reported by the backend.
+        """
+        self.value = value
+        self.x = x
+        self.inequality_duals = inequality_duals
+        self.equality_duals = equality_duals
+        self.backend = backend
+        self.iterations = iterations
+
+def gurobi_available():
+    """
+    Returns whether gurobipy is installed and licensed, checked once per process.
+    """
+    global _gurobi_available
+    if _gurobi_available is None:
+        try:
+            import gurobipy as gp
+            with gp.Env(params={"OutputFlag": 0}):
+                pass
+            _gurobi_available = True
+        except Exception:
+            _gurobi_available = False
+    return _gurobi_available
+
+def default_backend():
+    backend = os.environ.get("LP_BACKEND")
+    if backend is not None:
+        assert backend in LP_BACKENDS, f"Unknown LP_BACKEND {backend}, expected one of {LP_BACKENDS}."
+        return backend
+    return 'gurobi' if gurobi_available() else 'highs'
+
+def solve_sparse_lp(objective: np.ndarray,
+                    inequality_matrix: sp.spmatrix,
+                    inequality_rhs: np.ndarray,
+                    equality_matrix: sp.spmatrix,
+                    equality_rhs: np.ndarray,
+                    lower_bounds: np.ndarray,
+                    upper_bounds: np.ndarray = None,
+                    backend: str = None,
+                    method: str = None,
+                    verbose: bool = False,
+                    start: Tuple[np.ndarray, np.ndarray, np.ndarray] = None,
+                    feasibility_tol: float = None,
+                    optimality_tol: float = None) -> LpResult:
+    """
+    Solves a sparse LP (see the module docstring) with the given backend.
+
+    Args:
+        backend (str): One of LP_BACKENDS, defaults to default_backend().
+        method (str): None (the backend's default), 'dual_simplex', 'primal_simplex' (Gurobi only) or 'barrier'.
+        verbose (bool): Print the solver log.
+        start (Tuple[np.ndarray, np.ndarray, np.ndarray]): Optional warm start, (x, inequality_duals, equality_duals).
+            Only used by Gurobi.
+        feasibility_tol (float): Primal feasibility tolerance, the backend's default if None.
+        optimality_tol (float): Dual feasibility (optimality) tolerance, the backend's default if None.
+
+    Returns:
+        LpResult: Value, primal solution and duals.
+    """
+    backend = backend if backend is not None else default_backend()
+    assert backend in LP_BACKENDS, f"Unknown LP backend {backend}, expected one of {LP_BACKENDS}."
+    if method not in LP_METHODS[backend]:
+        raise ValueError(f"LP method {method} is not supported by the {backend} backend, expected one of "
+                         f"{list(LP_METHODS[backend])}.")
+    if upper_bounds is None:
+        upper_bounds = np.full(objective.size, np.inf)
+    solve_backend = {'gurobi': _solve_gurobi, 'highs': _solve_highs}[backend]
+    return solve_backend(objective, sp.csr_matrix(inequality_matrix), np.asarray(inequality_rhs, dtype=np.float64),
+                         sp.csr_matrix(equality_matrix), np.asarray(equality_rhs, dtype=np.float64),
+                         lower_bounds, upper_bounds, LP_METHODS[backend][method], verbose, start,
+                         feasibility_tol, optimality_tol)
+
+def _solve_gurobi(objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs,
+                  lower_bounds, upper_bounds, method, verbose, start, feasibility_tol, optimality_tol):
+    import gurobipy as gp
+
+    m = gp.Model("lp")
+    m.Params.OutputFlag = 1 if verbose else 0
+    m.Params.Method = method
+    if feasibility_tol is not None:
+        m.Params.FeasibilityTol = feasibility_tol
+    if optimality_tol is not None:
+        m.Params.OptimalityTol = optimality_tol
+
+    x = m.addMVar(objective.size, lb=lower_bounds, ub=upper_bounds, name="x")
+    inequality_constrs = m.addMConstr(inequality_matrix, x, gp.GRB.GREATER_EQUAL, inequality_rhs) \
+        if inequality_matrix.shape[0] > 0 else None
+    equality_constrs = m.addMConstr(equality_matrix, x, gp.GRB.EQUAL, equality_rhs) \
+        if equality_matrix.shape[0] > 0 else None
+    m.setMObjective(None, objective, 0.0, sense=gp.GRB.MINIMIZE)
+    if start is not None:
+        # Starts are ignored on variables and constraints which are still pending.
+        m.update()
+        x.PStart = start[0]
+        if inequality_constrs is not None:
+            inequality_constrs.DStart = start[1]
+        if equality_constrs is not None:
+            equality_constrs.DStart = start[2]
+    m.optimize()
+    if m.Status != gp.GRB.OPTIMAL:
+        raise RuntimeError(f"Gurobi did not solve the LP to optimality, status {m.Status}.")
+
+    inequality_duals = np.asarray(inequality_constrs.Pi) if inequality_constrs is not None else np.zeros(0)
+    equality_duals = np.asarray(equality_constrs.Pi) if equality_constrs is not None else np.zeros(0)
+    return LpResult(m.ObjVal, np.asarray(x.X), inequality_duals, equality_duals, 'gurobi', int(m.IterCount))
+
+def _solve_highs(objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs,
+                 lower_bounds, upper_bounds, method, verbose, start, feasibility_tol, optimality_tol):
+    # linprog has no warm start, so the start is not used.
+    from scipy.optimize import linprog
+
+    options = {"disp": verbose}
+    if feasibility_tol is not None:
+        options["primal_feasibility_tolerance"] = feasibility_tol
+    if optimality_tol is not None:
+        options["dual_feasibility_tolerance"] = optimality_tol
+
+    # linprog takes <= constraints, so the >= constraints are negated (and so are their duals).
+    has_inequalities = inequality_matrix.shape[0] > 0
+    has_equalities = equality_matrix.shape[0] > 0
+    bounds = np.stack([lower_bounds, upper_bounds], axis=1)
+    result = linprog(objective,
+                     A_ub=-inequality_matrix if has_inequalities else None,
+                     b_ub=-inequality_rhs if has_inequalities else None,
+                     A_eq=equality_matrix if has_equalities else None,
+                     b_eq=equality_rhs if has_equalities else None,
+                     bounds=bounds, method=method, options=options)
+    if result.status != 0:
+        raise RuntimeError(f"HiGHS did not solve the LP to optimality: {result.message}")
+
+    inequality_duals = -result.ineqlin.marginals if has_inequalities else np.zeros(0)
+    equality_duals = result.eqlin.marginals if has_equalities else np.zeros(0)
+    return LpResult(result.fun, result.x, inequality_duals, equality_duals, 'highs', int(result.nit))
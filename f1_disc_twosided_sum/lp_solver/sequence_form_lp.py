@@ -0,0 +1,213 @@
+import numpy as np
+import scipy.sparse as sp
+from online_learning.dag_structure import DagStructure
+from online_learning.dag_treeplex import DagTreeplex
+
+class SequenceFormLp(object):
+    """
+    The sequence-form LP of a two-player zero-sum DAG game, assembled as sparse matrices.
+
+    Player 1 minimizes over infoset values v (one free variable per infoset of player 1) and player 2's
+    sequence form strategy y >= 0, with variables x = [v; y]:
+
+        min   sum_{i child of the empty sequence} v_i
+        s.t.  v_i - sum_{c child infoset of j} v_c - (A y)_j >= 0    for every sequence j of infoset i (player 1)
+              y_0 = 1
+              sum_{a} y_{start(i)+a} - sum_{p parent of i} y_p = 0   for every infoset i of player 2
+
+    i.e., inequality_matrix x >= 0 and equality_matrix x = equality_rhs, with x >= lower_bounds. Rows of the
+    inequality constraints are indexed by the sequences of player 1 (minus the empty sequence), and rows of
+    the equality constraints by the empty sequence followed by the infosets of player 2.
+    """
+    def __init__(self, dag_p1: DagStructure, dag_p2: DagStructure, payoff_matrix: sp.spmatrix):
+        """
+        Args:
+            dag_p1, dag_p2 (DagStructure): DAGs of both players, frozen if needed.
+            payoff_matrix (sp.spmatrix): Payoffs A of player 1, (num_sequences_p1, num_sequences_p2).
+        """
+        self.dag_p1 = dag_p1.freeze()
+        self.dag_p2 = dag_p2.freeze()
+        self.num_infoset_vals = self.dag_p1.num_infosets
+        self.num_sequences_p2 = self.dag_p2.num_sequences
+        self.num_vars = self.num_infoset_vals + self.num_sequences_p2
+        payoff_matrix = sp.csr_matrix(payoff_matrix)
+        assert payoff_matrix.shape == (self.dag_p1.num_sequences, self.dag_p2.num_sequences)
+        self.payoff_matrix = payoff_matrix
+
+        # Infoset values: the infoset owning each sequence minus the infosets following it.
+        owner_matrix = SequenceFormLp.owner_matrix(self.dag_p1)
+        child_matrix = sp.csr_matrix((np.ones(self.dag_p1.seq_child_infoset_ids.size),
+                                      self.dag_p1.seq_child_infoset_ids, self.dag_p1.seq_child_offsets),
+                                     shape=(self.dag_p1.num_sequences, self.dag_p1.num_infosets))
+        self.inequality_matrix = sp.hstack([(owner_matrix - child_matrix)[1:], -payoff_matrix[1:]], format="csr")
+
+        # Sequence form constraints of player 2: the empty sequence, then the mass of every infoset.
+        self.equality_matrix = sp.hstack([sp.csr_matrix((self.dag_p2.num_infosets + 1, self.num_infoset_vals)),
+                                          SequenceFormLp.flow_matrix(self.dag_p2)], format="csr")
+        self.equality_rhs = np.zeros(self.dag_p2.num_infosets + 1)
+        self.equality_rhs[0] = 1.0
+
+        self.objective = np.zeros(self.num_vars)
+        self.objective[self.dag_p1.get_child_infoset_ids(0)] = 1.0
+        self.lower_bounds = np.concatenate([np.full(self.num_infoset_vals, -np.inf), np.zeros(self.num_sequences_p2)])
+
+    def owner_matrix(dag: DagStructure):
+        """
+        Returns the (num_sequences, num_infosets) 0/1 matrix mapping every sequence to the infoset it leaves,
+        with an empty row for the empty sequence.
+        """
+        infoset_ids = np.repeat(np.arange(dag.num_infosets), dag.infoset_num_actions)
+        action_offsets = np.arange(infoset_ids.size) - np.repeat(np.cumsum(dag.infoset_num_actions) - dag.infoset_num_actions,
+                                                                   dag.infoset_num_actions)
+        seq_ids = dag.infoset_start_seq_id[infoset_ids] + action_offsets
+        return sp.csr_matrix((np.ones(seq_ids.size), (seq_ids, infoset_ids)), shape=(dag.num_sequences, dag.num_infosets))
+
+    def flow_matrix(dag: DagStructure):
+        """
+        Returns the sequence form constraint matrix F of a DAG, F z = e_0 for sequence form strategies z: the first row
+        picks the empty sequence, and row 1 + i is the mass leaving infoset i minus the mass of its parent sequences.
+        """
+        root_row = sp.csr_matrix(([1.0], ([0], [0])), shape=(1, dag.num_sequences))
+        parent_matrix = sp.csr_matrix((np.ones(dag.infoset_parent_seq_ids.size), dag.infoset_parent_seq_ids, dag.infoset_parent_offsets),
+                                      shape=(dag.num_infosets, dag.num_sequences))
+        return sp.vstack([root_row, SequenceFormLp.owner_matrix(dag).T - parent_matrix], format="csr")
+
+    def split(self, x: np.ndarray):
+        """
+        Splits a solution x into the infoset values of player 1 and the sequence form strategy of player 2.
+        """
+        return x[:self.num_infoset_vals], x[self.num_infoset_vals:]
+
+    def strategies(self, x: np.ndarray, inequality_duals: np.ndarray):
+        """
+        Reads the equilibrium back from an optimal solution: player 2's sequence form strategy is part of x, and
+        player 1's is given by the duals of the inequality constraints (one per sequence of player 1), which
+        satisfy the sequence form constraints of player 1 by dual feasibility.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sequence form strategies of player 1 and player 2, with round-off
+                negatives clipped to 0.
+        """
+        strategy_p1 = np.concatenate([[1.0], np.maximum(inequality_duals, 0.0)])
+        strategy_p2 = np.maximum(self.split(x)[1], 0.0)
+        return strategy_p1, strategy_p2
+
+    def start_vectors(self, strategy_p1: np.ndarray, strategy_p2: np.ndarray):
+        """
+        Builds a primal and dual start from approximate sequence form strategies, e.g. from regret minimization:
+        the infoset values of player 1 are its best response values against strategy_p2, the inequality duals
+        are strategy_p1, and the equality duals are the best response values of player 2 against strategy_p1
+        (the empty sequence getting the value of the whole game). The start is optimal iff the strategies are
+        an equilibrium.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Start for x, the inequality duals and the equality duals.
+        """
+        infoset_vals_p1, _ = best_response_values(self.dag_p1, self.payoff_matrix @ strategy_p2, maximize=True)
+        infoset_vals_p2, root_val_p2 = best_response_values(self.dag_p2, self.payoff_matrix.T @ strategy_p1, maximize=False)
+        return np.concatenate([infoset_vals_p1, strategy_p2]), \
+               np.array(strategy_p1[1:], dtype=np.float64), \
+               np.concatenate([[root_val_p2], infoset_vals_p2])
+
+def sequence_form_violation(dag: DagStructure, strategy: np.ndarray):
+    """
+    Returns the largest violation of the sequence form constraints (flow and nonnegativity) by a strategy.
+    """
+    residual = SequenceFormLp.flow_matrix(dag) @ strategy
+    residual[0] -= 1.0
+    return max(float(np.abs(residual).max()), float(-strategy.min()), 0.0)
+
+def best_response_values(dag: DagStructure, rewards: np.ndarray, maximize: bool = True):
+    """
+    Returns the value of a best response at every infoset (maximizing or minimizing rewards), and the value
+    of the whole DAG, i.e., at the empty sequence.
+    """
+    rewards = np.array(rewards, dtype=np.float64)
+    infoset_values = np.zeros(dag.num_infosets)
+    reduce = np.maximum.reduceat if maximize else np.minimum.reduceat
+    for level in reversed(dag.get_levels()):
+        values = reduce(rewards[level.seq_ids], level.segment_starts)
+        rewards[level.parent_seq_ids] += level.parent_matrix_t @ values
+        infoset_values[level.infoset_ids] = values
+    return infoset_values, rewards[0]
+
+def level_masses(dag: DagStructure):
+    """
+    Returns the typical sequence form mass of every sequence: the mean, over the sequences of its level, of the
+    uniform strategy's sequence form (1 for the empty sequence). Sequences deep in a wide DAG get small
+    masses, e.g. about 1 / (num_soldiers + 1) for the battlefield sequences of a Blotto DAG.
+    """
+    uniform = DagTreeplex(dag)
+    uniform.fill_with_unif_seq_form()
+    masses = np.ones(dag.num_sequences)
+    for level in dag.get_levels():
+        masses[level.seq_ids] = np.mean(uniform.treeplex_data[level.seq_ids])
+    return masses
+
+class LpScaling(object):
+    """
+    Rescaling of a SequenceFormLp, for instances whose payoffs are tiny (normalized battlefield worths) and whose
+    sequence form masses span many orders of magnitude (deep DAGs). With x = column_scales * x', the scaled LP is
+
+        min   (objective * column_scales / objective_scale)^T x'
+        s.t.  diag(inequality_row_scales) inequality_matrix diag(column_scales) x' >= 0
+              diag(equality_row_scales) equality_matrix diag(column_scales) x' = equality_row_scales * equality_rhs
+
+    where
+        - payoffs are normalized by payoff_scale = max |A|, i.e., infoset values v = payoff_scale * v' and
+          objective_scale = payoff_scale,
+        - player 2's sequences are scaled by their level mass (see level_masses()), so that y' is of order 1, and
+          its flow constraints are divided by the mass of the sequences leaving the infoset,
+        - player 1's inequality rows are scaled by the level mass of their sequence, and its infoset values by the
+          inverse level mass of the infoset's sequences, so that the duals (player 1's sequence form) are of order 1
+          while the infoset value coefficients stay of order 1.
+    """
+    def __init__(self, lp: SequenceFormLp):
+        self.payoff_scale = float(abs(lp.payoff_matrix).max()) if lp.payoff_matrix.nnz > 0 else 1.0
+        if self.payoff_scale == 0.0:
+            self.payoff_scale = 1.0
+        self.objective_scale = self.payoff_scale
+
+        masses_p1 = level_masses(lp.dag_p1)
+        masses_p2 = level_masses(lp.dag_p2)
+        # Mass of the sequences leaving each infoset, one per infoset (all sequences of an infoset share a level).
+        infoset_masses_p1 = masses_p1[lp.dag_p1.infoset_start_seq_id]
+        infoset_masses_p2 = masses_p2[lp.dag_p2.infoset_start_seq_id]
+
+        self.column_scales = np.concatenate([self.payoff_scale / infoset_masses_p1, masses_p2])
+        self.inequality_row_scales = masses_p1[1:] / self.payoff_scale
+        self.equality_row_scales = np.concatenate([[1.0], 1.0 / infoset_masses_p2])
+
+    def scale_problem(self, lp: SequenceFormLp):
+        """
+        Returns:
+            Tuple: objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs and lower_bounds of
+                the scaled LP, in the order of lp_backends.solve_sparse_lp.
+        """
+        column_scales = sp.diags(self.column_scales)
+        inequality_matrix = (sp.diags(self.inequality_row_scales) @ lp.inequality_matrix @ column_scales).tocsr()
+        equality_matrix = (sp.diags(self.equality_row_scales) @ lp.equality_matrix @ column_scales).tocsr()
+        return lp.objective * self.column_scales / self.objective_scale, \
+               inequality_matrix, np.zeros(inequality_matrix.shape[0]), \
+               equality_matrix, lp.equality_rhs * self.equality_row_scales, \
+               lp.lower_bounds / self.column_scales
+
+    def scale_start(self, start):
+        """
+        Maps a start (x, inequality_duals, equality_duals) of the original LP to the scaled LP.
+        """
+        x, inequality_duals, equality_duals = start
+        return x / self.column_scales, \
+               inequality_duals / (self.objective_scale * self.inequality_row_scales), \
+               equality_duals / (self.objective_scale * self.equality_row_scales)
+
+    def unscale(self, value: float, x: np.ndarray, inequality_duals: np.ndarray, equality_duals: np.ndarray):
+        """
+        Maps a solution of the scaled LP back to the original LP.
+
+        Returns:
+            Tuple: value, x, inequality_duals and equality_duals of the original LP.
+        """
+        return value * self.objective_scale, x * self.column_scales, \
+               inequality_duals * self.objective_scale * self.inequality_row_scales, \
+               equality_duals * self.objective_scale * self.equality_row_scales
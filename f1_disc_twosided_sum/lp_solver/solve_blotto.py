@@ -1,138 +1,128 @@
-import cvxpy as cp
+from typing import Dict, Tuple
 import numpy as np
 from game_defs.generalized_blotto import GeneralizedBBBlottoGame
 from online_learning.dag_regret_minimizer import DagGame
-import gurobipy as gp
+from online_learning.dag_treeplex import DagTreeplex
+from lp_solver.sequence_form_lp import LpScaling, SequenceFormLp, sequence_form_violation
+from lp_solver.lp_backends import default_backend, solve_sparse_lp
 
 class LpSolver(object):
     def __init__(self, game: DagGame):
         self.game = game
-
-    def solve_gurobi(self):
-        game = self.game
-        m= gp.Model("blotto")
-
-        dag_p1 = game.dag_structure_pl1
-        dag_p2 = game.dag_structure_pl2
-
-        infoset_vals_var_p1 = m.addVars(dag_p1.num_infosets, name="infoset_vals_p1", lb=-gp.GRB.INFINITY)
-        sequence_form_var_p2 = m.addVars(dag_p2.num_sequences, name="sequence_form_var_p2")
-        # sequence_form_var_p2 = cp.Variable(dag_p2.num_sequences, nonneg=True)
-
-        # Filter leaves based on sequence of p1
-        leaves_for_seq_p1 = [[] for i in range(dag_p1.num_sequences)] 
-        for seq_pair, val in game.leaves.items():
-            seq_p1, seq_p2 = seq_pair
-            leaves_for_seq_p1[seq_p1].append((seq_p2, val))
-
-        # ==============================================================================
-        # STEP 1)
-        # Create dual first, the variables are the potentials for each infoset.
-        # it is assumed that this is for the *min* player, so the dual would be
-        # to *max*. The min player is assumed to be player 1. 
-        # Make sure that the signs of the payoffs are correct!!!
-        constrs = []
-        # Get infoset infoset par->child mapping
-        for infoset_id in range(dag_p1.num_infosets):
-            start_seq_id = dag_p1.infoset_start_seq_id[infoset_id]
-            num_actions = dag_p1.infoset_num_actions[infoset_id]
-            for child_seq_id in range(start_seq_id, start_seq_id + num_actions):
-                children_infosets = dag_p1.seq_id_child_infoset_id[child_seq_id]
-                children_infoset_vals_var = [infoset_vals_var_p1[child_infoset_id] for child_infoset_id in children_infosets]
-
-                # Payoffs for p1 that are from future infosets                
-                future_payoff = gp.quicksum(children_infoset_vals_var)
-
-                # Payoffs for p1 that are from immediate actions, assuming p1 played to be here
-                immediate_payoff = gp.quicksum([sequence_form_var_p2[seq_p2] * payoff for seq_p2, payoff in leaves_for_seq_p1[child_seq_id]])
-
-                m.addConstr(infoset_vals_var_p1[infoset_id] >= future_payoff + immediate_payoff)
-
-        # STEP 2)
-        # sequence form constraints for p2
-        m.addConstr(sequence_form_var_p2[0] == 1.0)
-        for infoset_id in range(dag_p2.num_infosets):
-            start_seq_id = dag_p2.infoset_start_seq_id[infoset_id]
-            num_actions = dag_p2.infoset_num_actions[infoset_id]
-            parent_seq_ids = dag_p2.infoset_parent_seq_id[infoset_id]
-
-            # Get the mass of the parent sequences
-            parent_mass = gp.quicksum([sequence_form_var_p2[seq_id] for seq_id in parent_seq_ids])
-
-            # Get child mass
-            # child_mass = # gp.quicksum(sequence_form_var_p2[start_seq_id: start_seq_id + num_actions])
-            child_mass = gp.quicksum(sequence_form_var_p2[j] for j in range(start_seq_id, start_seq_id + num_actions))
-
-            m.addConstr(child_mass == parent_mass)
-
-        # Objective
-        # m.addConstrs(constrs, '')
-        m.Params.Method = 1 # DUAL SIMPLEX
-        m.setObjective(sum(infoset_vals_var_p1[infoset_id] for infoset_id in dag_p1.seq_id_child_infoset_id[0]), gp.GRB.MINIMIZE)
-        m.optimize()
-
-        #obj = cp.sum([infoset_vals_var_p1[infoset_id] for infoset_id in dag_p1.seq_id_child_infoset_id[0]])
-        #problem = cp.Problem(cp.Minimize(obj), constrs)
-        #problem.solve(solver= cp.GUROBI, verbose=True)
-        #print(problem.value)
-
-
-    def solve(self):
-        game = self.game
-
-        dag_p1 = game.dag_structure_pl1
-        dag_p2 = game.dag_structure_pl2
-
-        infoset_vals_var_p1 = cp.Variable(dag_p1.num_infosets)
-        sequence_form_var_p2 = cp.Variable(dag_p2.num_sequences, nonneg=True)
-
-        # Filter leaves based on sequence of p1
-        leaves_for_seq_p1 = [[] for i in range(dag_p1.num_sequences)] 
-        for seq_pair, val in game.leaves.items():
-            seq_p1, seq_p2 = seq_pair
-            leaves_for_seq_p1[seq_p1].append((seq_p2, val))
-
-        # ==============================================================================
-        # STEP 1)
-        # Create dual first, the variables are the potentials for each infoset.
-        # it is assumed that this is for the *min* player, so the dual would be
-        # to *max*. The min player is assumed to be player 1. 
-        # Make sure that the signs of the payoffs are correct!!!
-        constrs = []
-        # Get infoset infoset par->child mapping
-        for infoset_id in range(dag_p1.num_infosets):
-            start_seq_id = dag_p1.infoset_start_seq_id[infoset_id]
-            num_actions = dag_p1.infoset_num_actions[infoset_id]
-            for child_seq_id in range(start_seq_id, start_seq_id + num_actions):
-                children_infosets = dag_p1.seq_id_child_infoset_id[child_seq_id]
-                children_infoset_vals_var = [infoset_vals_var_p1[child_infoset_id] for child_infoset_id in children_infosets]
-
-                # Payoffs for p1 that are from future infosets                
-                future_payoff = cp.sum(children_infoset_vals_var)
-
-                # Payoffs for p1 that are from immediate actions, assuming p1 played to be here
-                immediate_payoff = cp.sum([sequence_form_var_p2[seq_p2] * payoff for seq_p2, payoff in leaves_for_seq_p1[child_seq_id]])
-
-                constrs.append(infoset_vals_var_p1[infoset_id] >= future_payoff + immediate_payoff)
-
-        # STEP 2)
-        # sequence form constraints for p2
-        constrs.append(sequence_form_var_p2[0] == 1.0)
-        for infoset_id in range(dag_p2.num_infosets):
-            start_seq_id = dag_p2.infoset_start_seq_id[infoset_id]
-            num_actions = dag_p2.infoset_num_actions[infoset_id]
-            parent_seq_ids = dag_p2.infoset_parent_seq_id[infoset_id]
-
-            # Get the mass of the parent sequences
-            parent_mass = cp.sum([sequence_form_var_p2[seq_id] for seq_id in parent_seq_ids])
-
-            # Get child mass
-            child_mass = cp.sum(sequence_form_var_p2[start_seq_id: start_seq_id + num_actions])
-
-            constrs.append(child_mass == parent_mass)
-
-        # Objective
-        obj = cp.sum([infoset_vals_var_p1[infoset_id] for infoset_id in dag_p1.seq_id_child_infoset_id[0]])
-        problem = cp.Problem(cp.Minimize(obj), constrs)
-        problem.solve(solver= cp.GUROBI, verbose=True)
-        print(problem.value)
\ No newline at end of file
+        self.last_result = None
+        self.last_report = None
+
+    def build_lp(self):
+        """
+        Assembles the sequence-form LP of the game from the CSR DAGs and the payoff operator.
+        It is assumed that this is for the *min* player, player 1, whose infoset values are
+        the dual variables; player 2 maximizes over its sequence form strategy.
+
+        Returns:
+            SequenceFormLp: The LP in sparse matrix form.
+        """
+        # Rows of the CSR payoff matrix hold the leaves for each sequence of p1
+        payoff_matrix = self.game.payoff_operator.to_sparse()
+        return SequenceFormLp(self.game.dag_structure_pl1, self.game.dag_structure_pl2, payoff_matrix)
+
+    def solve_lp(self,
+                 backend: str = None,
+                 method: str = 'dual_simplex',
+                 verbose: bool = True,
+                 warm_start: Tuple[DagTreeplex, DagTreeplex] = None,
+                 scaled: bool = False,
+                 feasibility_tol: float = None,
+                 optimality_tol: float = None) -> Tuple[DagTreeplex, DagTreeplex, float]:
+        """
+        Solves the sequence-form LP with one of lp_backends.LP_BACKENDS, chosen at runtime if not given.
+
+        Args:
+            backend (str): LP backend, see lp_backends.default_backend().
+            method (str): LP method, see lp_backends.solve_sparse_lp().
+            verbose (bool): Print the solver log and the solution report.
+            warm_start (Tuple[DagTreeplex, DagTreeplex]): Approximate equilibrium, e.g. from
+                DagRegretMinimizer.solve_dag_game, used as a primal-dual start so that simplex only
+                polishes it to an exact solution (Gurobi only, see lp_backends).
+            scaled (bool): Solve the rescaled LP (see sequence_form_lp.LpScaling), for large games with tiny
+                payoffs and sequence form masses spanning many orders of magnitude.
+            feasibility_tol (float): Primal feasibility tolerance of the backend, in the scaled LP if scaled.
+            optimality_tol (float): Optimality tolerance of the backend, in the scaled LP if scaled.
+
+        Returns:
+            Tuple[DagTreeplex, DagTreeplex, float]: Equilibrium sequence form strategies of both players
+                (player 1's read from the duals) and the value of the game. The solution report (see
+                solution_report()) is kept in last_report.
+        """
+        lp = self.build_lp()
+        start = None
+        if warm_start is not None:
+            start = lp.start_vectors(warm_start[0].treeplex_data.astype(np.float64),
+                                     warm_start[1].treeplex_data.astype(np.float64))
+        if scaled:
+            scaling = LpScaling(lp)
+            objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs, lower_bounds = scaling.scale_problem(lp)
+            start = scaling.scale_start(start) if start is not None else None
+        else:
+            objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs, lower_bounds = \
+                lp.objective, lp.inequality_matrix, np.zeros(lp.inequality_matrix.shape[0]), lp.equality_matrix, lp.equality_rhs, lp.lower_bounds
+        result = solve_sparse_lp(objective, inequality_matrix, inequality_rhs, equality_matrix, equality_rhs, lower_bounds,
+                                 backend=backend, method=method, verbose=verbose, start=start,
+                                 feasibility_tol=feasibility_tol, optimality_tol=optimality_tol)
+        if scaled:
+            result.value, result.x, result.inequality_duals, result.equality_duals = \
+                scaling.unscale(result.value, result.x, result.inequality_duals, result.equality_duals)
+        self.last_result = result
+
+        strategy_p1, strategy_p2 = lp.strategies(result.x, result.inequality_duals)
+        strategy_p1, strategy_p2 = DagTreeplex(lp.dag_p1, strategy_p1), DagTreeplex(lp.dag_p2, strategy_p2)
+        self.last_report = self.solution_report(lp, result.x, strategy_p1, strategy_p2, result.value)
+        if verbose:
+            print(", ".join(f"{key}: {val:.3e}" for key, val in self.last_report.items()))
+        return strategy_p1, strategy_p2, result.value
+
+    def solution_report(self, lp: SequenceFormLp, x: np.ndarray, strategy_p1: DagTreeplex, strategy_p2: DagTreeplex,
+                        lp_value: float) -> Dict[str, float]:
+        """
+        Checks a solution of the (unscaled) LP and the equilibrium read from it, independently of the backend's
+        own tolerances.
+
+        Returns:
+            Dict[str, float]: lp_value, value (the game's value of the returned strategies), gap (their saddle
+                point gap, see DagGame.saddle_point_gap), lp_violation (largest violation of the LP's
+                constraints by x), and sequence_form_violation_p1/p2 (largest violation of the sequence form
+                constraints by the returned strategies).
+        """
+        inequality_slacks = lp.inequality_matrix @ x
+        equality_residuals = lp.equality_matrix @ x - lp.equality_rhs
+        lp_violation = max(float(-inequality_slacks.min(initial=0.0)), float(np.abs(equality_residuals).max(initial=0.0)),
+                           float((lp.lower_bounds - x).max(initial=0.0)))
+        return {
+            "lp_value": float(lp_value),
+            "value": float(self.game.evaluate(strategy_p1, strategy_p2)),
+            "gap": float(self.game.saddle_point_gap(strategy_p1, strategy_p2)),
+            "lp_violation": lp_violation,
+            "sequence_form_violation_p1": sequence_form_violation(lp.dag_p1, strategy_p1.treeplex_data),
+            "sequence_form_violation_p2": sequence_form_violation(lp.dag_p2, strategy_p2.treeplex_data),
+        }
+
+    def solve_gurobi(self, warm_start: Tuple[DagTreeplex, DagTreeplex] = None):
+        return self.solve_lp(backend='gurobi', warm_start=warm_start)
+
+    def solve_highs(self, warm_start: Tuple[DagTreeplex, DagTreeplex] = None):
+        return self.solve_lp(backend='highs', warm_start=warm_start)
+
+    def solve(self, backend: str = None):
+        import cvxpy as cp
+
+        lp = self.build_lp()
+
+        x = cp.Variable(lp.num_vars)
+        constrs = [lp.inequality_matrix @ x >= 0,
+                   lp.equality_matrix @ x == lp.equality_rhs,
+                   x[lp.num_infoset_vals:] >= 0]
+
+        backend = backend if backend is not None else default_backend()
+        problem = cp.Problem(cp.Minimize(lp.objective @ x), constrs)
+        problem.solve(solver=cp.GUROBI if backend == 'gurobi' else cp.HIGHS, verbose=True)
+        print(problem.value)
+        return problem.value
@@ -0,0 +1,147 @@
+from typing import List, Tuple
+from online_learning.dag_structure import DagStructure
+from online_learning.dag_treeplex import DagTreeplex
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+from online_learning import treeplex_kernels
+import numpy as np
+
+class BatchedDagRegretMinimizer(DagRegretMinimizer):
+    def __init__(self, dag_structure: DagStructure,
+                 batch_size: int,
+                 update_rule: str = 'rm',
+                 alpha: float = 1.5,
+                 beta: float = 0.0,
+                 gamma: float = 2.0):
+        """
+        Runs batch_size independent DagRegretMinimizers over the same DAG. Every array carries a leading
+        batch dimension, i.e., regrets, rewards and strategies are (batch_size, num_sequences) arrays,
+        so that the per-infoset Python overhead is paid once for the whole batch. The regret updates are
+        the ones of DagRegretMinimizer, which work on the last axis; only the sequence form recommendation
+        is batch specific.
+
+        Args:
+            dag_structure: An instance of DagStructure representing the directed acyclic graph.
+            batch_size (int): Number of instances.
+            update_rule (str): One of UPDATE_RULES.
+            alpha, beta, gamma (float): DCFR parameters, as in DagRegretMinimizer.
+        """
+        super().__init__(dag_structure, update_rule, alpha, beta, gamma, batch_size=batch_size)
+        self.batch_size = batch_size
+
+    def beh_to_seq(self, beh: np.ndarray):
+        """
+        Converts a batch of behavioral strategies to sequence form, in place.
+        """
+        dag = self.dag_structure
+        if treeplex_kernels.USE_NUMBA:
+            for k in range(beh.shape[0]):
+                treeplex_kernels.beh_to_seq(dag.infoset_num_actions, dag.infoset_start_seq_id,
+                                            dag.infoset_parent_offsets, dag.infoset_parent_seq_ids, beh[k])
+            return beh
+
+        beh[:, 0] = 1.0
+        for level in dag.get_levels():
+            level.beh_to_seq(beh)
+        return beh
+
+    def recommend(self):
+        """
+        Generate a batch of recommendations in *sequence* form.
+
+        Returns:
+            np.ndarray: A (batch_size, num_sequences) array of sequence form strategies.
+        """
+        beh = self.recommend_behavioral()
+        self.last_strategy = self.beh_to_seq(beh.copy())
+        return self.last_strategy
+
+    def saddle_point_gaps(dag_structure_pl1: DagStructure,
+                          dag_structure_pl2: DagStructure,
+                          payoff_operator,
+                          strategy_p1: np.ndarray,
+                          strategy_p2: np.ndarray):
+        """
+        Computes the saddle point gap of every instance of a batch.
+
+        Args:
+            payoff_operator: Batched payoff operator, e.g. BatchedBattlefieldPayoffOperator.
+            strategy_p1, strategy_p2 (np.ndarray): (batch_size, num_sequences) sequence form strategies.
+
+        Returns:
+            np.ndarray: The saddle point gap of each instance.
+        """
+        reward_for_p1 = payoff_operator.reward_vector_p1(strategy_p2)
+        reward_for_p2 = payoff_operator.reward_vector_p2(strategy_p1)
+        treeplex_p1 = DagTreeplex(dag_structure_pl1)
+        treeplex_p2 = DagTreeplex(dag_structure_pl2)
+
+        gaps = np.zeros(strategy_p1.shape[0])
+        for k in range(strategy_p1.shape[0]):
+            br_p1 = treeplex_p1.best_response_to_reward_vector(reward_for_p1[k])
+            br_p2 = treeplex_p2.best_response_to_reward_vector(reward_for_p2[k])
+            # x_k'^T A_k y_k - x_k^T A_k y_k', where -x_k^T A_k y_k' = y_k'^T (-A_k^T x_k).
+            gaps[k] = br_p1.treeplex_data @ reward_for_p1[k] + br_p2.treeplex_data @ reward_for_p2[k]
+        return gaps
+
+    def solve_batched_dag_game(dag_structure_pl1: DagStructure,
+                               dag_structure_pl2: DagStructure,
+                               payoff_operator,
+                               iterations=10000,
+                               update_rule: str = 'rm',
+                               averaging = None,
+                               alpha: float = 1.5,
+                               beta: float = 0.0,
+                               gamma: float = 2.0,
+                               alternating: bool = False) -> Tuple[List[DagTreeplex], List[DagTreeplex], np.ndarray]:
+        """
+        Solves a batch of games sharing the same DAGs, running the same iterations as
+        DagRegretMinimizer.solve_dag_game on every instance at once.
+
+        Args:
+            dag_structure_pl1, dag_structure_pl2 (DagStructure): DAGs shared by all instances.
+            payoff_operator: Batched payoff operator mapping (batch_size, num_sequences) strategies to
+                (batch_size, num_sequences) reward vectors, e.g. BatchedBattlefieldPayoffOperator.
+            iterations, update_rule, averaging, alpha, beta, gamma, alternating: As in solve_dag_game.
+
+        Returns:
+            Tuple[List[DagTreeplex], List[DagTreeplex], np.ndarray]: Average sequence form strategies of both
+                players for every instance, and the saddle point gap of every instance.
+        """
+        averaging_power = DagRegretMinimizer.averaging_power(update_rule, averaging, gamma)
+
+        batch_size = payoff_operator.batch_size
+        player1 = BatchedDagRegretMinimizer(dag_structure_pl1, batch_size, update_rule, alpha, beta, gamma)
+        player2 = BatchedDagRegretMinimizer(dag_structure_pl2, batch_size, update_rule, alpha, beta, gamma)
+
+        cumulative_strategy_p1 = np.zeros((batch_size, dag_structure_pl1.num_sequences))
+        cumulative_strategy_p2 = np.zeros((batch_size, dag_structure_pl2.num_sequences))
+        cumulative_weight = 0.0
+
+        for t in range(1, iterations + 1):
+            if alternating:
+                strategy_p1 = player1.recommend()
+                if t > 1:
+                    player2.observe_rewards(payoff_operator.reward_vector_p2(strategy_p1), inplace_rewards=True)
+                strategy_p2 = player2.recommend()
+                player1.observe_rewards(payoff_operator.reward_vector_p1(strategy_p2), inplace_rewards=True)
+            else:
+                strategy_p1 = player1.recommend()
+                strategy_p2 = player2.recommend()
+                reward_vector_p1 = payoff_operator.reward_vector_p1(strategy_p2)
+                reward_vector_p2 = payoff_operator.reward_vector_p2(strategy_p1)
+                player1.observe_rewards(reward_vector_p1, inplace_rewards=True)
+                player2.observe_rewards(reward_vector_p2, inplace_rewards=True)
+
+            weight = float(t) ** averaging_power
+            cumulative_strategy_p1 += weight * strategy_p1
+            cumulative_strategy_p2 += weight * strategy_p2
+            cumulative_weight += weight
+
+        average_p1 = cumulative_strategy_p1 / cumulative_weight
+        average_p2 = cumulative_strategy_p2 / cumulative_weight
+        gaps = BatchedDagRegretMinimizer.saddle_point_gaps(dag_structure_pl1, dag_structure_pl2, payoff_operator,
+                                                           average_p1, average_p2)
+
+        return [DagTreeplex(dag_structure_pl1, average_p1[k]) for k in range(batch_size)], \
+               [DagTreeplex(dag_structure_pl2, average_p2[k]) for k in range(batch_size)], \
+               gaps
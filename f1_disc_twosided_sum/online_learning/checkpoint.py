@@ -0,0 +1,29 @@
+"""
+Compact binary checkpoints (.npz) for long-running solves.
+
+A checkpoint is a flat dictionary of numpy arrays and scalars. It is written to a temporary file
+next to the target and atomically renamed, so that a job killed while checkpointing (e.g. by
+`timeout`) always leaves the previous checkpoint intact.
+"""
+
+import os
+import numpy as np
+
+def save_checkpoint(path, **state):
+    """
+    Atomically writes the keyword arguments (arrays or scalars) to path.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    """
+    Returns the dictionary stored at path, or None if there is no checkpoint yet.
+    Scalars are returned as 0-d arrays.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
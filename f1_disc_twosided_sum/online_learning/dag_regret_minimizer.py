@@ -1,18 +1,55 @@
 from typing import Dict, Tuple
 from online_learning.dag_structure import DagStructure
-from online_learning.regret_matching import RegretMatching
 from online_learning.dag_treeplex import DagTreeplex
+from online_learning.payoff_operator import SparsePayoffOperator
+from online_learning import treeplex_kernels
+from online_learning.checkpoint import save_checkpoint, load_checkpoint
 import numpy as np 
+import math
+import time
+
+# Regret update rules supported by DagRegretMinimizer.
+#   'rm':   vanilla regret matching.
+#   'rm+':  regret matching+, regrets are truncated at zero after every update.
+#   'prm+': predictive regret matching+, using the last observed rewards as the prediction.
+#   'dcfr': discounted regret matching, positive (resp. negative) regrets are scaled by 
+#           t^alpha / (t^alpha + 1) (resp. t^beta / (t^beta + 1)) after iteration t.
+UPDATE_RULES = ('rm', 'rm+', 'prm+', 'dcfr')
+
+# Iterate t is weighted by t^power in the average strategy.
+AVERAGING_POWERS = {'uniform': 0.0, 'linear': 1.0, 'quadratic': 2.0}
+
+# Averaging used by solve_dag_game if none is specified. DCFR uses t^gamma.
+DEFAULT_AVERAGING = {'rm': 'uniform', 'rm+': 'linear', 'prm+': 'quadratic'}
 
 class DagGame(object):
-    def __init__(self, dag_structure_pl1: DagTreeplex, 
-                 dag_structure_pl2: DagTreeplex,
-                 leaves: Dict[Tuple[int, int], float]):
+    def __init__(self, dag_structure_pl1: DagStructure, 
+                 dag_structure_pl2: DagStructure,
+                 leaves: Dict[Tuple[int, int], float] = None,
+                 payoff_operator = None):
+        """
+        Initializes a two-player zero-sum game played over two DAGs.
+
+        Args:
+            dag_structure_pl1 (DagStructure): DAG of player 1 (the maximizer).
+            dag_structure_pl2 (DagStructure): DAG of player 2.
+            leaves (Dict[Tuple[int, int], float]): Construction-time convenience mapping
+                (seq_id_p1, seq_id_p2) to the payoff of player 1. Converted into a sparse
+                payoff operator and not kept around.
+            payoff_operator: Payoff operator for player 1 (e.g. SparsePayoffOperator). 
+                Exactly one of leaves and payoff_operator must be given.
+        """
         
-        self.dag_structure_pl1 = dag_structure_pl1
-        self.dag_structure_pl2 = dag_structure_pl2
+        self.dag_structure_pl1 = dag_structure_pl1.freeze()
+        self.dag_structure_pl2 = dag_structure_pl2.freeze()
 
-        self.leaves = leaves
+        assert (leaves is None) != (payoff_operator is None), "Specify exactly one of leaves and payoff_operator."
+        if payoff_operator is None:
+            payoff_operator = SparsePayoffOperator.from_leaves(leaves, 
+                                                               self.dag_structure_pl1.num_sequences,
+                                                               self.dag_structure_pl2.num_sequences)
+        assert payoff_operator.shape == (self.dag_structure_pl1.num_sequences, self.dag_structure_pl2.num_sequences)
+        self.payoff_operator = payoff_operator
 
     def saddle_point_gap(self, strategy_p1: DagTreeplex, strategy_p2: DagTreeplex):
         """
@@ -29,10 +66,11 @@ class DagGame(object):
         br_p1 = strategy_p1.best_response_to_reward_vector(reward_for_p1)
         br_p2 = strategy_p2.best_response_to_reward_vector(reward_for_p2)
 
-        val_p1_deviate = self.evaluate(br_p1, strategy_p2)
-        val_p2_deviate = self.evaluate(strategy_p1, br_p2)
+        # x'^T A y = x' . (A y) and x^T A y' = -y' . (-A^T x), so no further mat-vecs are needed.
+        val_p1_deviate = float(br_p1.treeplex_data @ reward_for_p1)
+        val_p2_deviate = -float(br_p2.treeplex_data @ reward_for_p2)
         
-        assert val_p1_deviate - val_p2_deviate >= 1e-6, "Saddle point gap should not be negative"
+        assert val_p1_deviate - val_p2_deviate >= -1e-6, "Saddle point gap should not be negative"
         return val_p1_deviate - val_p2_deviate
 
     def evaluate(self, strategy_p1: DagTreeplex, strategy_p2: DagTreeplex):
@@ -46,10 +84,7 @@ class DagGame(object):
         Returns:
             float: The payoff for player 1.
         """
-        payoff = 0.0
-        for (seq_id1, seq_id2), reward in self.leaves.items():
-            payoff += reward * strategy_p1.treeplex_data[seq_id1] * strategy_p2.treeplex_data[seq_id2]
-        return payoff
+        return self.payoff_operator.evaluate(strategy_p1.treeplex_data, strategy_p2.treeplex_data)
 
     def compute_reward_vectors(self, strategy_p1: DagTreeplex, strategy_p2: DagTreeplex):
         """
@@ -63,158 +98,459 @@ class DagGame(object):
             Tuple[np.ndarray, np.ndarray]: A tuple containing the reward vector for player 1 and the reward vector for player 2.
 
         Notes:
-            - The reward vector for player 1 is computed by summing the rewards at the leaves of the DAG,
-              weighted by the strategy of player 2 for the corresponding sequences.
-            - The reward vector for player 2 is computed similarly, but the rewards are subtracted and
-              weighted by the strategy of player 1 for the corresponding sequences.
-            - This method assumes that the `leaves` attribute of the `DagGame` object contains the reward
-              information as a dictionary mapping sequence pairs to rewards.
+            - The reward vector for player 1 is A y, where A is the payoff matrix of player 1
+              and y the sequence form strategy of player 2.
+            - The reward vector for player 2 is -A^T x, where x is the sequence form strategy of player 1.
         """
         
-        reward_vector_p1 = np.zeros(self.dag_structure_pl1.num_sequences)
-        reward_vector_p2 = np.zeros(self.dag_structure_pl2.num_sequences)
-        for (seq_id1, seq_id2), reward in self.leaves.items():
-            reward_vector_p1[seq_id1] += reward * strategy_p2.treeplex_data[seq_id2]
-            reward_vector_p2[seq_id2] -= reward * strategy_p1.treeplex_data[seq_id1]
+        reward_vector_p1 = self.payoff_operator.reward_vector_p1(strategy_p2.treeplex_data)
+        reward_vector_p2 = self.payoff_operator.reward_vector_p2(strategy_p1.treeplex_data)
 
         return reward_vector_p1, reward_vector_p2
         
 class DagRegretMinimizer:
-    def __init__(self, dag_structure: DagStructure):
+    def __init__(self, dag_structure: DagStructure,
+                 update_rule: str = 'rm',
+                 alpha: float = 1.5,
+                 beta: float = 0.0,
+                 gamma: float = 2.0,
+                 dtype = np.float64,
+                 batch_size: int = None):
         """
         Initializes the DagRegretMinimizer with a given DagStructure.
 
+        Regret matching is run on every infoset (simplex) simultaneously: the regrets of all
+        infosets live in one flat array indexed by sequence id, and the simplex of infoset i
+        is the segment [infoset_start_seq_id[i], infoset_start_seq_id[i] + infoset_num_actions[i]).
+
         Args:
             dag_structure: An instance of DagStructure representing the directed acyclic graph.
+            update_rule (str): One of UPDATE_RULES.
+            alpha, beta, gamma (float): DCFR parameters. gamma is the averaging power used by solve_dag_game.
+            dtype: Floating point type of the regrets and strategies, e.g. np.float32 to halve the memory footprint.
+            batch_size (int): If given, batch_size independent instances are run at once: regrets, rewards and
+                behavioral strategies then carry a leading batch dimension, and every update works on the last axis.
         """
-        self.dag_structure = dag_structure  # Store the immutable DagStructure
-        self.regret_minimizers = []
-
+        assert update_rule in UPDATE_RULES, f"Unknown update rule {update_rule}."
+        self.dag_structure = dag_structure.freeze()  # Store the immutable DagStructure
+        self.update_rule = update_rule
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.dtype = np.dtype(dtype)
+        self.batch_shape = () if batch_size is None else (batch_size,)
+
+        # Number of calls to observe_rewards so far.
+        self.iteration = 0
+
+        num_sequences = self.dag_structure.num_sequences
+        num_infosets = self.dag_structure.num_infosets
+
+        # Regrets for each sequence. Entry 0 (the empty sequence) is unused.
+        self.regrets = np.zeros(self.batch_shape + (num_sequences,), dtype=self.dtype)
+
+        # Rewards (after propagation) observed last, used as the prediction by 'prm+'.
+        self.last_rewards = np.zeros(self.batch_shape + (num_sequences,), dtype=self.dtype)
+
+        # Segment layout of the simplices, offset by one to skip the empty sequence.
+        self.segment_starts = self.dag_structure.infoset_start_seq_id.astype(np.intp) - 1
+        self.uniform_strategy = np.repeat(1.0 / self.dag_structure.infoset_num_actions, 
+                                          self.dag_structure.infoset_num_actions).astype(self.dtype)
+        # Infoset of each of the sequences 1, ..., num_sequences-1.
+        self.seq_infoset_ids = np.repeat(np.arange(num_infosets), self.dag_structure.infoset_num_actions)
+
+        # Scratch buffers reused by every iteration, so that recommend() and observe_rewards() do not allocate
+        # (apart from the temporaries of the level-wise passes when the numba kernels are not used).
+        self.infoset_buffer = np.zeros(self.batch_shape + (num_infosets,), dtype=self.dtype)
+        self.sequence_buffer = np.zeros(self.batch_shape + (num_sequences - 1,), dtype=self.dtype)
+        self.mask_buffer = np.zeros(self.batch_shape + (num_sequences,), dtype=bool)
+        self.behavioral_buffer = np.zeros(self.batch_shape + (num_sequences,), dtype=self.dtype)
+        self.predicted_regrets = self.regrets.copy() if update_rule == 'prm+' else None
+
+        # Last strategy played, in sequence form (DagTreeplex) and behavioral form (flat array).
         self.last_strategy = None
+        self.last_behavioral_strategy = None
+
+    def segment_sum(self, values: np.ndarray, out: np.ndarray = None):
+        """
+        Sums values over sequences 1, ..., num_sequences-1 within each infoset, along the last axis.
+
+        Returns:
+            np.ndarray: One sum per infoset, written into out if given.
+        """
+        if self.dag_structure.num_infosets == 0:
+            return np.zeros(values.shape[:-1] + (0,)) if out is None else out
+        return np.add.reduceat(values, self.segment_starts, axis=-1, out=out)
+
+    def expand_infoset_values(self, infoset_values: np.ndarray):
+        """
+        Repeats one value per infoset over the sequences of the infoset, into the sequence scratch buffer.
+        """
+        return np.take(infoset_values, self.seq_infoset_ids, axis=-1, out=self.sequence_buffer, mode='clip')
+
+    def regrets_to_behavioral(self, regrets: np.ndarray, out: np.ndarray = None):
+        """
+        Normalizes the positive part of the regrets on every simplex, 
+        defaulting to uniform if no regret is positive.
+
+        Returns:
+            np.ndarray: A behavioral strategy, written into out if given.
+        """
+        beh = np.empty(self.regrets.shape, dtype=self.dtype) if out is None else out
+        positive_regrets = np.maximum(regrets[..., 1:], 0.0, out=beh[..., 1:])
+        total_positive_regrets = self.expand_infoset_values(self.segment_sum(positive_regrets, out=self.infoset_buffer))
+        has_positive_regret = np.greater(total_positive_regrets, 0.0, out=self.mask_buffer[..., 1:])
+
+        beh[..., 0] = 1.0
+        np.divide(positive_regrets, total_positive_regrets, out=beh[..., 1:], where=has_positive_regret)
+        no_positive_regret = np.logical_not(has_positive_regret, out=has_positive_regret)
+        np.copyto(beh[..., 1:], self.uniform_strategy, where=no_positive_regret)
+        return beh
 
-        # Create a list of RegretMatching instances or None for each vertex
-        for infoset_id in range(dag_structure.num_infosets):
-            self.regret_minimizers.append(RegretMatching(dag_structure.infoset_num_actions[infoset_id]))
-        
     def observe_rewards(self, orig_rewards, 
                         last_strategy: DagTreeplex = None, 
                         inplace_rewards = False):
         """
         Observes the rewards for the current strategy and updates the regrets.
 
+        Rewards are pushed bottom-up through the DAG, where each infoset contributes the reward
+        of the behavioral strategy recommended last. Regrets of all infosets are then updated at once.
+
         Args:
-            orig_rewards (DagTreeplex): The observed rewards for the current strategy.
-            last_strategy (DagTreeplex): The last strategy played.
+            orig_rewards (np.ndarray): The observed rewards for the current strategy.
+            last_strategy (DagTreeplex): Unused, the behavioral strategy from the last call to recommend() is used.
         """
+        assert self.last_behavioral_strategy is not None, "recommend() must be called before observe_rewards()."
 
         if inplace_rewards:
             rewards = orig_rewards
         else:
             rewards = orig_rewards.copy()
 
-        if last_strategy is None:
-            last_strategy = self.last_strategy
-
-        for infoset_id in reversed(range(self.dag_structure.num_infosets)):
-            num_actions = self.dag_structure.infoset_num_actions[infoset_id]
-            start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
-            parent_seq_ids = self.dag_structure.infoset_parent_seq_id[infoset_id]
-
-            # Extract the rewards for the current infoset
-            observed_rewards = rewards[start_seq_id: start_seq_id + num_actions]
-
-            # Update the regrets for that particular simplex
-            self.regret_minimizers[infoset_id].update_regrets(observed_rewards)
-            
-            # Reward that we would have gotten using the behavioral strategy.
-            # We compute this using the normalized last strategy.
-            """
-            total_child_mass = np.sum(last_strategy.treeplex_data[start_seq_id : start_seq_id + num_actions])
-
-            if total_child_mass == 0.0:
-                # Assume uniform strategy was played.
-                # normalized_reward = sum(rewards[seq_id] for seq_id in range(start_seq_id, start_seq_id + num_actions)) / num_actions
-                normalized_reward = np.inner(rewards[start_seq_id : start_seq_id + num_actions], 
-                                            self.regret_minimizers[infoset_id].last_strategy)
+        beh = self.last_behavioral_strategy
+        start_seq_ids = self.dag_structure.infoset_start_seq_id
+        num_actions = self.dag_structure.infoset_num_actions
+        parent_offsets = self.dag_structure.infoset_parent_offsets
+        parent_seq_ids = self.dag_structure.infoset_parent_seq_ids
+        infoset_values = self.infoset_buffer
+
+        if treeplex_kernels.USE_NUMBA and rewards.dtype in (np.float32, np.float64):
+            if not self.batch_shape:
+                treeplex_kernels.propagate_values(num_actions, start_seq_ids,
+                                                  parent_offsets, parent_seq_ids, beh, rewards, infoset_values)
             else:
-                normalized_reward = np.inner(rewards[start_seq_id : start_seq_id + num_actions], 
-                                            last_strategy.treeplex_data[start_seq_id : start_seq_id + num_actions]) / total_child_mass
-                # normalized_reward = sum(rewards.treeplex_data[seq_id] * last_strategy.treeplex_data[seq_id] for seq_id in range(start_seq_id, start_seq_id + num_actions)) / total_child_mass
-            """
-            normalized_reward = np.inner(rewards[start_seq_id : start_seq_id + num_actions], 
-                                        self.regret_minimizers[infoset_id].last_strategy)
-                
-            # Push rewards upwards to parent sequences.
-            for parent_seq_id in parent_seq_ids:
-                rewards[parent_seq_id] += normalized_reward
-
-    def recommend(self):
+                # One kernel call per instance of the batch.
+                for k in range(self.batch_shape[0]):
+                    treeplex_kernels.propagate_values(num_actions, start_seq_ids,
+                                                      parent_offsets, parent_seq_ids, beh[k], rewards[k], infoset_values[k])
+        else:
+            # One level at a time, from the bottom: the value of each infoset under the behavioral
+            # strategy is computed and pushed upwards to its parent sequences.
+            for level in reversed(self.dag_structure.get_levels()):
+                infoset_values[..., level.infoset_ids] = level.propagate_values(beh, rewards)
+
+        # Update the regrets of every simplex.
+        self.iteration += 1
+        self.regrets[..., 1:] += rewards[..., 1:]
+        self.regrets[..., 1:] -= self.expand_infoset_values(infoset_values)
+
+        if self.update_rule == 'rm+' or self.update_rule == 'prm+':
+            np.maximum(self.regrets, 0.0, out=self.regrets)
+        elif self.update_rule == 'dcfr':
+            t_alpha = self.iteration ** self.alpha
+            t_beta = self.iteration ** self.beta
+            is_positive = np.greater(self.regrets, 0.0, out=self.mask_buffer)
+            np.multiply(self.regrets, t_alpha / (t_alpha + 1), out=self.regrets, where=is_positive)
+            is_not_positive = np.logical_not(is_positive, out=is_positive)
+            np.multiply(self.regrets, t_beta / (t_beta + 1), out=self.regrets, where=is_not_positive)
+
+        if self.update_rule == 'prm+':
+            self.last_rewards[:] = rewards
+
+    def get_state(self, prefix: str = ''):
         """
-        Generate a recommendation in *sequence* form.
+        Returns the state needed to resume regret minimization exactly, as a dictionary of arrays
+        with keys starting with prefix.
+        """
+        state = {prefix + 'iteration': self.iteration,
+                 prefix + 'regrets': self.regrets,
+                 prefix + 'last_rewards': self.last_rewards}
+        if self.last_behavioral_strategy is not None:
+            state[prefix + 'last_behavioral_strategy'] = self.last_behavioral_strategy
+        return state
+
+    def set_state(self, state, prefix: str = ''):
+        """
+        Restores a state returned by get_state().
+        """
+        assert state[prefix + 'regrets'].shape == self.regrets.shape, "State does not match the DAG."
+        self.iteration = int(state[prefix + 'iteration'])
+        self.regrets[:] = state[prefix + 'regrets']
+        self.last_rewards[:] = state[prefix + 'last_rewards']
+        if prefix + 'last_behavioral_strategy' in state:
+            self.behavioral_buffer[:] = state[prefix + 'last_behavioral_strategy']
+            self.last_behavioral_strategy = self.behavioral_buffer
+
+    def warm_start(self, strategy: DagTreeplex, regret_scale: float):
+        """
+        Seeds the regrets so that the first recommendation is (the nearest strategy to) a given one.
+        The strategy may live on a different DAG, it is then mapped through DagStructure.map_sequence_values().
+
+        Args:
+            strategy (DagTreeplex): Sequence form strategy, e.g. an equilibrium of a nearby game.
+            regret_scale (float): Total regret put on each infoset. The larger, the longer the warm start persists.
+        """
+        beh = strategy.to_behavioral()
+        if strategy.dag_structure is not self.dag_structure:
+            beh = self.dag_structure.map_sequence_values(strategy.dag_structure, beh)
+        beh = self.regrets_to_behavioral(beh)
+        self.regrets[..., 0] = 0.0
+        self.regrets[..., 1:] = regret_scale * beh[..., 1:]
+
+    def recommend_behavioral(self):
+        """
+        Runs regret matching (with the prediction of 'prm+') on the current regrets.
 
         Returns:
-            DagTreeplex: A sequence form treeplex strategy.
+            np.ndarray: The behavioral strategy to play next, also stored as last_behavioral_strategy.
+        """
+        beh = self.regrets_to_behavioral(self.regrets, out=self.behavioral_buffer)
+
+        if self.update_rule == 'prm+':
+            # Predict that the last rewards are observed again, and play regret matching
+            # on the regrets we would have after that.
+            predicted_values = self.segment_sum(np.multiply(self.last_rewards[..., 1:], beh[..., 1:], out=self.sequence_buffer),
+                                                out=self.infoset_buffer)
+            predicted_regrets = self.predicted_regrets
+            predicted_regrets[:] = self.regrets
+            predicted_regrets[..., 1:] += self.last_rewards[..., 1:]
+            predicted_regrets[..., 1:] -= self.expand_infoset_values(predicted_values)
+            beh = self.regrets_to_behavioral(predicted_regrets, out=self.behavioral_buffer)
+
+        self.last_behavioral_strategy = beh
+        return beh
+
+    def recommend(self, out: DagTreeplex = None):
         """
-        recommendations = DagTreeplex(self.dag_structure)
-        recommendations.treeplex_data[0] = 1.0
+        Generate a recommendation in *sequence* form.
 
-        for infoset_id in range(self.dag_structure.num_infosets):
-            num_actions = self.dag_structure.infoset_num_actions[infoset_id]
-            start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
-            
-            # Get the current strategy for the infoset
-            strategy = self.regret_minimizers[infoset_id].recommend()
+        Args:
+            out (DagTreeplex): If given, the recommendation is written into it (it must have this
+                minimizer's dtype) instead of a new DagTreeplex, so that the iteration does not allocate.
 
-            # Fill the recommendations for this infoset
-            for seq_id in range(start_seq_id, start_seq_id + num_actions):
-                recommendations.treeplex_data[seq_id] = strategy[seq_id - start_seq_id]
+        Returns:
+            DagTreeplex: A sequence form treeplex strategy.
+        """
+        beh = self.recommend_behavioral()
 
+        if out is None:
+            recommendations = DagTreeplex(self.dag_structure, beh.copy())
+        else:
+            assert out.treeplex_data.dtype == self.dtype, "out must have the dtype of the regrets."
+            recommendations = out
+            recommendations.treeplex_data[:] = beh
         recommendations.convert_beh_to_seq()
 
         self.last_strategy = recommendations
 
         return recommendations
+
+    def averaging_power(update_rule: str, averaging = None, gamma: float = 2.0):
+        """
+        Returns the power p such that iterate t is weighted by t^p in the average strategy.
+
+        Args:
+            update_rule (str): One of UPDATE_RULES.
+            averaging (str or float): As in solve_dag_game, None for the default of update_rule.
+            gamma (float): DCFR averaging power, the default for 'dcfr'.
+        """
+        if averaging is None:
+            averaging = gamma if update_rule == 'dcfr' else DEFAULT_AVERAGING[update_rule]
+        return AVERAGING_POWERS[averaging] if isinstance(averaging, str) else float(averaging)
     
-    def solve_dag_game(dag_game: DagGame, iterations=10000):
+    def solve_dag_game(dag_game: DagGame, 
+                       iterations=10000,
+                       update_rule: str = 'rm',
+                       averaging = None,
+                       alpha: float = 1.5,
+                       beta: float = 0.0,
+                       gamma: float = 2.0,
+                       target_gap: float = None,
+                       gap_check_schedule = 1.5,
+                       callback = None,
+                       alternating: bool = False,
+                       checkpoint_path: str = None,
+                       checkpoint_every: int = 1000,
+                       warm_start = None,
+                       warm_start_weight: float = 0.1,
+                       warm_start_dags: Tuple[DagStructure, DagStructure] = None,
+                       dtype = np.float64,
+                       average_dtype = None):
         """
         Solve the DAG game using regret minimization.
 
         Args:
-            reward_fn (callable): A function that takes a pair of sequences and outputs the reward.
+            dag_game (DagGame): The game to solve.
             iterations (int): Number of iterations for regret minimization.
-        """
+            update_rule (str): Regret update rule, one of UPDATE_RULES.
+            averaging (str or float): 'uniform', 'linear', 'quadratic', or the power p such that iterate t 
+                is weighted by t^p in the average. Defaults to DEFAULT_AVERAGING[update_rule], and to gamma for 'dcfr'.
+            alpha, beta, gamma (float): DCFR parameters.
+            target_gap (float): If given, stop as soon as the saddle point gap of the average strategies
+                is at most target_gap.
+            gap_check_schedule (int or float): When to compute the saddle point gap for target_gap. An int k
+                checks every k iterations, a float r > 1 checks at geometrically spaced iterations 1, 2, 3, 5, 8, ... 
+                (ratio r), so that the gap is computed O(log(iterations)) times.
+            callback (callable): Called after every iteration as 
+                callback(iteration, elapsed_time, avg_strategy_p1, avg_strategy_p2). 
+                Returning True stops the solve.
+            alternating (bool): If True, use alternating updates where player 2 observes rewards against player 1's
+                freshly updated strategy (as in BlottoAlt::solve), instead of simultaneous updates.
+            checkpoint_path (str): If given, the state of the solve is saved there every checkpoint_every iterations 
+                and when the solve ends. If the file already exists, the solve resumes from it exactly.
+            checkpoint_every (int): Number of iterations between checkpoints.
+            warm_start: Either a pair of DagTreeplex (e.g. the solution of a nearby game, possibly with different
+                numbers of battles or soldiers) or a regret state (the dictionary returned by load_checkpoint()) to
+                start from instead of zero regrets. A regret state also restores the regret update counters, so the
+                DCFR discounting continues where the saved solve stopped. Ignored when resuming from checkpoint_path.
+            warm_start_weight (float): For strategy warm starts, the regret put behind them, as a multiple of the 
+                largest reward against the other warm start strategy. Small weights keep the solve free to move
+                away from the warm start, larger ones hold on to it for longer.
+            warm_start_dags (Tuple[DagStructure, DagStructure]): DAGs of a regret state warm start, 
+                if they differ from the game's.
+            dtype: Floating point type of the regrets, iterates and reward vectors. With np.float32 the payoff
+                operator is converted once (it must then provide astype()) and the memory traffic is halved.
+            average_dtype: Floating point type of the cumulative (average) strategies, defaults to dtype.
+                E.g. dtype=np.float32 with average_dtype=np.float64 keeps the long running sums accurate.
 
-        player1 = DagRegretMinimizer(dag_game.dag_structure_pl1)
-        player2 = DagRegretMinimizer(dag_game.dag_structure_pl2)
+        Returns:
+            Tuple[DagTreeplex, DagTreeplex]: Average sequence form strategies of both players.
+        """
+        averaging_power = DagRegretMinimizer.averaging_power(update_rule, averaging, gamma)
+
+        average_dtype = dtype if average_dtype is None else average_dtype
+
+        player1 = DagRegretMinimizer(dag_game.dag_structure_pl1, update_rule, alpha, beta, gamma, dtype)
+        player2 = DagRegretMinimizer(dag_game.dag_structure_pl2, update_rule, alpha, beta, gamma, dtype)
+
+        cumulative_strategy_p1 = np.zeros(dag_game.dag_structure_pl1.num_sequences, dtype=average_dtype)
+        cumulative_strategy_p2 = np.zeros(dag_game.dag_structure_pl2.num_sequences, dtype=average_dtype)
+        cumulative_weight = 0.0
+
+        # Buffers reused by every iteration: with the numba kernels, nothing below allocates per iteration
+        # except for the callback, gap checks and checkpoints.
+        payoff_operator = dag_game.payoff_operator
+        if np.dtype(dtype) != np.float64:
+            payoff_operator = payoff_operator.astype(dtype)
+        strategy_p1 = DagTreeplex(dag_game.dag_structure_pl1, dtype=dtype)
+        strategy_p2 = DagTreeplex(dag_game.dag_structure_pl2, dtype=dtype)
+        reward_vector_p1 = np.zeros(dag_game.dag_structure_pl1.num_sequences, dtype=dtype)
+        reward_vector_p2 = np.zeros(dag_game.dag_structure_pl2.num_sequences, dtype=dtype)
+        weighted_strategy_p1 = np.zeros(dag_game.dag_structure_pl1.num_sequences, dtype=average_dtype)
+        weighted_strategy_p2 = np.zeros(dag_game.dag_structure_pl2.num_sequences, dtype=average_dtype)
+
+        def average_strategies():
+            return DagTreeplex(dag_game.dag_structure_pl1, cumulative_strategy_p1 / cumulative_weight), \
+                   DagTreeplex(dag_game.dag_structure_pl2, cumulative_strategy_p2 / cumulative_weight)
+
+        next_gap_check = 1
+        first_iteration = 1
+        elapsed_before = 0.0
+
+        def save(t):
+            save_checkpoint(checkpoint_path,
+                            update_rule=update_rule, averaging_power=averaging_power, alternating=alternating,
+                            t=t, next_gap_check=next_gap_check, elapsed=time.perf_counter() - start_time,
+                            cumulative_strategy_p1=cumulative_strategy_p1,
+                            cumulative_strategy_p2=cumulative_strategy_p2,
+                            cumulative_weight=cumulative_weight,
+                            **player1.get_state('p1_'), **player2.get_state('p2_'))
+
+        checkpoint = load_checkpoint(checkpoint_path)
+        if warm_start is not None and checkpoint is None:
+            if isinstance(warm_start, dict):
+                source_dags = warm_start_dags or (dag_game.dag_structure_pl1, dag_game.dag_structure_pl2)
+                for player, source_dag, prefix in [(player1, source_dags[0], 'p1_'), (player2, source_dags[1], 'p2_')]:
+                    player.regrets[:] = player.dag_structure.map_sequence_values(source_dag, warm_start[prefix + 'regrets'])
+                    player.last_rewards[:] = player.dag_structure.map_sequence_values(source_dag, warm_start[prefix + 'last_rewards'])
+                    # Continue the DCFR discounting schedule of the saved state instead of restarting it at t=1.
+                    # The behavioral strategy is not needed, recommend() recomputes it before any update.
+                    player.iteration = int(warm_start[prefix + 'iteration'])
+            else:
+                warm_start_p1, warm_start_p2 = warm_start
+                player1.warm_start(warm_start_p1, 1.0)
+                player2.warm_start(warm_start_p2, 1.0)
+                # Scale the seeded regrets relative to the rewards the players are about to observe.
+                # Own names, so that the dtype buffers reward_vector_p1/p2 used by the loop are kept.
+                warm_rewards_p1, warm_rewards_p2 = dag_game.compute_reward_vectors(player1.recommend(), player2.recommend())
+                player1.regrets *= warm_start_weight * np.max(np.abs(warm_rewards_p1))
+                player2.regrets *= warm_start_weight * np.max(np.abs(warm_rewards_p2))
+
+        if checkpoint is not None:
+            assert (str(checkpoint['update_rule']), float(checkpoint['averaging_power']), bool(checkpoint['alternating'])) == \
+                (update_rule, averaging_power, alternating), "Checkpoint was written with different solver settings."
+            player1.set_state(checkpoint, 'p1_')
+            player2.set_state(checkpoint, 'p2_')
+            cumulative_strategy_p1[:] = checkpoint['cumulative_strategy_p1']
+            cumulative_strategy_p2[:] = checkpoint['cumulative_strategy_p2']
+            cumulative_weight = float(checkpoint['cumulative_weight'])
+            next_gap_check = int(checkpoint['next_gap_check'])
+            first_iteration = int(checkpoint['t']) + 1
+            elapsed_before = float(checkpoint['elapsed'])
+
+        start_time = time.perf_counter() - elapsed_before
+        t = first_iteration - 1
+
+        for t in range(first_iteration, iterations + 1):
+            if alternating:
+                # Player 2 updates against player 1's fresh strategy before recommending, and player 1
+                # then updates against that. On the first iteration player 2 has nothing to update yet.
+                player1.recommend(out=strategy_p1)
+                if t > 1:
+                    payoff_operator.reward_vector_p2(strategy_p1.treeplex_data, out=reward_vector_p2)
+                    player2.observe_rewards(reward_vector_p2, inplace_rewards=True)
+                player2.recommend(out=strategy_p2)
+                payoff_operator.reward_vector_p1(strategy_p2.treeplex_data, out=reward_vector_p1)
+                player1.observe_rewards(reward_vector_p1, inplace_rewards=True)
+            else:
+                # Get strategies for both players
+                player1.recommend(out=strategy_p1)
+                player2.recommend(out=strategy_p2)
 
-        cumulative_strategy_p1 = np.zeros(dag_game.dag_structure_pl1.num_sequences)
-        cumulative_strategy_p2 = np.zeros(dag_game.dag_structure_pl2.num_sequences)
+                # Compute payoff vector for each action
+                payoff_operator.reward_vector_p1(strategy_p2.treeplex_data, out=reward_vector_p1)
+                payoff_operator.reward_vector_p2(strategy_p1.treeplex_data, out=reward_vector_p2)
 
-        for _ in range(iterations):
-            # Get strategies for both players
-            strategy_p1 = player1.recommend()
-            strategy_p2 = player2.recommend()
+                # Update regrets for both players
+                player1.observe_rewards(reward_vector_p1, strategy_p1, inplace_rewards=True)
+                player2.observe_rewards(reward_vector_p2, strategy_p2, inplace_rewards=True)
 
             # Update cumulative strategies
-            cumulative_strategy_p1 += strategy_p1.treeplex_data
-            cumulative_strategy_p2 += strategy_p2.treeplex_data
+            weight = float(t) ** averaging_power
+            cumulative_strategy_p1 += np.multiply(strategy_p1.treeplex_data, weight, out=weighted_strategy_p1)
+            cumulative_strategy_p2 += np.multiply(strategy_p2.treeplex_data, weight, out=weighted_strategy_p2)
+            cumulative_weight += weight
 
-            # Compute payoff vector for each action
-            reward_vector_p1 = np.zeros(dag_game.dag_structure_pl1.num_sequences)
-            reward_vector_p2 = np.zeros(dag_game.dag_structure_pl2.num_sequences)
-            for (seq_id1, seq_id2), reward in dag_game.leaves.items():
-                reward_vector_p1[seq_id1] += reward * strategy_p2.treeplex_data[seq_id2]
-                reward_vector_p2[seq_id2] -= reward * strategy_p1.treeplex_data[seq_id1]
+            if callback is not None:
+                if callback(t, time.perf_counter() - start_time, *average_strategies()):
+                    break
 
-            # Update regrets for both players
-            player1.observe_rewards(reward_vector_p1, strategy_p1, inplace_rewards=True)
-            player2.observe_rewards(reward_vector_p2, strategy_p2, inplace_rewards=True)
+            if target_gap is not None and t == next_gap_check:
+                if dag_game.saddle_point_gap(*average_strategies()) <= target_gap:
+                    break
+                if isinstance(gap_check_schedule, int):
+                    next_gap_check = t + gap_check_schedule
+                else:
+                    next_gap_check = max(t + 1, math.ceil(t * gap_check_schedule))
 
-        # Normalize cumulative strategies to get average strategies
-        avg_strategy_p1 = cumulative_strategy_p1 / iterations
-        avg_strategy_p2 = cumulative_strategy_p2 / iterations
+            if checkpoint_path is not None and t % checkpoint_every == 0:
+                save(t)
+
+        if checkpoint_path is not None:
+            save(t)
 
-        return DagTreeplex(dag_game.dag_structure_pl1, avg_strategy_p1), DagTreeplex(dag_game.dag_structure_pl2, avg_strategy_p2)
+        # Normalize cumulative strategies to get average strategies
+        return average_strategies()
 
 def unit_test():
     """
@@ -1,4 +1,6 @@
 from typing import List
+import numpy as np
+import scipy.sparse as sp
 
 
 class DagStructure:
@@ -8,6 +10,15 @@ class DagStructure:
             Parents === Predecesor Edge/Sequence
         
         Crucial to understand that each edge can have multiple children vertices.
+
+        The DAG is built incrementally with add_infoset() and then frozen with freeze(),
+        which packs parent/child relations into CSR-style int32 arrays. Solvers only
+        ever see the frozen representation.
+
+        Freezing also assigns every infoset a topological level: infosets whose parents are all
+        the empty sequence are at level 0, and any other infoset is one level below its deepest
+        parent. Infosets of one level do not depend on each other, so top-down and bottom-up
+        passes can process a whole level at once (see get_levels()).
     """
 
     def __init__(self):
@@ -30,10 +41,32 @@ class DagStructure:
         # Contains one *list* for each sequence, which contains the child infoset id for that sequence.
         self.seq_id_child_infoset_id = [[]] # Starts with empty list for empty sequence.
 
-        # Mappings for infoset names to IDs and vice versa.
-        self.infoset_name_to_id = dict()
-        self.infoset_id_to_name = []
+        # Mappings for infoset names to IDs and vice versa. Subclasses that know their
+        # names implicitly may leave these as None and override _generate_infoset_names().
+        self._infoset_name_to_id = dict()
+        self._infoset_id_to_name = []
+
+        # Set by freeze(). Once frozen, the DAG can no longer be modified.
+        self.frozen = False
+
+        # Per-level operators, built on first use by get_levels().
+        self._levels = None
+
 
+    @property
+    def infoset_id_to_name(self):
+        if self._infoset_id_to_name is None:
+            self._infoset_id_to_name = self._generate_infoset_names()
+        return self._infoset_id_to_name
+
+    @property
+    def infoset_name_to_id(self):
+        if self._infoset_name_to_id is None:
+            self._infoset_name_to_id = {name: infoset_id for infoset_id, name in enumerate(self.infoset_id_to_name)}
+        return self._infoset_name_to_id
+
+    def _generate_infoset_names(self):
+        raise NotImplementedError("Infoset names were not recorded for this DagStructure.")
 
     def add_infoset(self, 
                     parent_seq_ids: List[int], 
@@ -47,6 +80,8 @@ class DagStructure:
             num_actions: int: The number of actions available in the new infoset.
         """
 
+        if self.frozen:
+            raise RuntimeError("Cannot add infosets to a frozen DagStructure.")
         assert num_actions > 0, "Number of actions must be greater than zero."
         if infoset_name in self.infoset_name_to_id:
             raise ValueError(f"Infoset {infoset_name} already exists in the graph.")
@@ -71,13 +106,247 @@ class DagStructure:
         for parent_seq_id in parent_seq_ids:
             self.seq_id_child_infoset_id[parent_seq_id].append(infoset_id)
 
+    def freeze(self):
+        """
+        Converts the DAG into an immutable, array-backed (CSR-style) representation.
+
+        After freezing,
+            infoset_num_actions, infoset_start_seq_id: int32 arrays of size num_infosets.
+            infoset_parent_offsets, infoset_parent_seq_ids: parents of infoset i are
+                infoset_parent_seq_ids[infoset_parent_offsets[i]:infoset_parent_offsets[i+1]].
+            seq_child_offsets, seq_child_infoset_ids: children of sequence j are
+                seq_child_infoset_ids[seq_child_offsets[j]:seq_child_offsets[j+1]].
+            infoset_levels: topological level of each infoset, and num_levels.
+            level_offsets, level_infoset_ids: infosets at level l are
+                level_infoset_ids[level_offsets[l]:level_offsets[l+1]], in increasing id order.
+
+        The list-of-lists representation is dropped. Freezing an already frozen DAG is a no-op.
+
+        Returns:
+            DagStructure: self, to allow chaining.
+        """
+        if self.frozen:
+            return self
+
+        parent_counts = np.fromiter((len(p) for p in self.infoset_parent_seq_id), dtype=np.int64, count=self.num_infosets)
+        parent_offsets = np.zeros(self.num_infosets + 1, dtype=np.int64)
+        np.cumsum(parent_counts, out=parent_offsets[1:])
+        parent_seq_ids = np.fromiter((seq_id for p in self.infoset_parent_seq_id for seq_id in p), 
+                                     dtype=np.int64, count=parent_offsets[-1])
+
+        self._set_frozen_arrays(np.asarray(self.infoset_num_actions),
+                                parent_offsets,
+                                parent_seq_ids)
+        return self
+
+    def _set_frozen_arrays(self, 
+                           infoset_num_actions: np.ndarray, 
+                           infoset_parent_offsets: np.ndarray, 
+                           infoset_parent_seq_ids: np.ndarray):
+        """
+        Installs the CSR arrays and derives the start sequence ids and the child (transposed) CSR arrays.
+        """
+        assert self.num_sequences < np.iinfo(np.int32).max and infoset_parent_seq_ids.size < np.iinfo(np.int32).max, \
+            "DAG is too large for int32 indices."
+
+        infoset_start_seq_id = np.ones(self.num_infosets, dtype=np.int64)
+        np.cumsum(infoset_num_actions[:-1], out=infoset_start_seq_id[1:])
+        infoset_start_seq_id[1:] += 1
+        assert self.num_infosets == 0 or infoset_start_seq_id[-1] + infoset_num_actions[-1] == self.num_sequences
+
+        # Transpose the parent relation: sort (infoset, parent) pairs by parent. The stable sort keeps
+        # children of each sequence in increasing infoset id order, matching add_infoset().
+        child_infoset_ids = np.repeat(np.arange(self.num_infosets, dtype=np.int64), np.diff(infoset_parent_offsets))
+        order = np.argsort(infoset_parent_seq_ids, kind="stable")
+        seq_child_offsets = np.zeros(self.num_sequences + 1, dtype=np.int64)
+        np.cumsum(np.bincount(infoset_parent_seq_ids, minlength=self.num_sequences), out=seq_child_offsets[1:])
+
+        self.infoset_num_actions = _frozen_int32(infoset_num_actions)
+        self.infoset_start_seq_id = _frozen_int32(infoset_start_seq_id)
+        self.infoset_parent_offsets = _frozen_int32(infoset_parent_offsets)
+        self.infoset_parent_seq_ids = _frozen_int32(infoset_parent_seq_ids)
+        self.seq_child_offsets = _frozen_int32(seq_child_offsets)
+        self.seq_child_infoset_ids = _frozen_int32(child_infoset_ids[order])
+
+        infoset_levels = self._compute_levels()
+        self.num_levels = int(infoset_levels.max()) + 1 if self.num_infosets > 0 else 0
+        level_offsets = np.zeros(self.num_levels + 1, dtype=np.int64)
+        np.cumsum(np.bincount(infoset_levels, minlength=self.num_levels), out=level_offsets[1:])
+        self.infoset_levels = _frozen_int32(infoset_levels)
+        self.level_offsets = _frozen_int32(level_offsets)
+        self.level_infoset_ids = _frozen_int32(np.argsort(infoset_levels, kind="stable"))
+
+        self.infoset_parent_seq_id = None
+        self.seq_id_child_infoset_id = None
+        self.frozen = True
+
+    def _compute_levels(self):
+        """
+        Computes the level of every infoset from the CSR arrays by repeated vectorized relaxation,
+        level = 1 + max(level of the infosets owning the parent sequences), one pass per level.
+        """
+        if self.num_infosets == 0:
+            return np.zeros(0, dtype=np.int64)
+        seq_infoset_ids = np.repeat(np.arange(self.num_infosets), self.infoset_num_actions)
+        levels = np.zeros(self.num_infosets, dtype=np.int64)
+        while True:
+            # The empty sequence is at level -1.
+            seq_levels = np.concatenate([[-1], levels[seq_infoset_ids]])
+            new_levels = np.maximum.reduceat(seq_levels[self.infoset_parent_seq_ids], self.infoset_parent_offsets[:-1]) + 1
+            if np.array_equal(new_levels, levels):
+                return levels
+            levels = new_levels
+
+    def get_levels(self):
+        """
+        Returns the DagLevel of every topological level, from the root down. Built on first use.
+        """
+        assert self.frozen, "Levels are only available once the DagStructure is frozen."
+        if self._levels is None:
+            self._levels = [DagLevel(self, self.level_infoset_ids[self.level_offsets[level]: self.level_offsets[level + 1]])
+                            for level in range(self.num_levels)]
+        return self._levels
+
+    def get_parent_seq_ids(self, infoset_id: int):
+        """
+        Returns the parent sequence ids of an infoset.
+        """
+        if not self.frozen:
+            return self.infoset_parent_seq_id[infoset_id]
+        return self.infoset_parent_seq_ids[self.infoset_parent_offsets[infoset_id]: self.infoset_parent_offsets[infoset_id + 1]]
+
+    def get_child_infoset_ids(self, seq_id: int):
+        """
+        Returns the child infoset ids of a sequence.
+        """
+        if not self.frozen:
+            return self.seq_id_child_infoset_id[seq_id]
+        return self.seq_child_infoset_ids[self.seq_child_offsets[seq_id]: self.seq_child_offsets[seq_id + 1]]
+
+    def best_response(self, rewards: np.ndarray):
+        """
+        Structure-specific best response to a reward vector (e.g. the DP of BlottoDagStructure), used by
+        DagTreeplex.best_response_to_reward_vector() in place of the generic traversal when the compiled
+        kernels are not in use.
+
+        Returns:
+            np.ndarray: The pure best response in sequence form, or None if there is no specialized method.
+        """
+        return None
+
+    def match_infoset(self, source_dag: "DagStructure", infoset_name):
+        """
+        Returns the id of the infoset of source_dag corresponding to infoset_name in this DAG, 
+        or None if there is none. Infosets are matched by name; subclasses may match more loosely.
+        """
+        return source_dag.infoset_name_to_id.get(infoset_name)
+
+    def map_sequence_values(self, source_dag: "DagStructure", source_values: np.ndarray, default: float = 0.0):
+        """
+        Transfers per-sequence values (e.g. regrets or a behavioral strategy) from source_dag to this DAG.
+        Every infoset takes the values of its matching infoset in source_dag (see match_infoset()), 
+        action by action; actions and infosets without a match get default.
+
+        Returns:
+            np.ndarray: Values over the sequences of this DAG.
+        """
+        values = np.full(self.num_sequences, default, dtype=np.float64)
+        values[0] = source_values[0]
+        for infoset_id, infoset_name in enumerate(self.infoset_id_to_name):
+            source_infoset_id = self.match_infoset(source_dag, infoset_name)
+            if source_infoset_id is None:
+                continue
+            num_actions = min(self.infoset_num_actions[infoset_id], source_dag.infoset_num_actions[source_infoset_id])
+            start_seq_id = self.infoset_start_seq_id[infoset_id]
+            source_start_seq_id = source_dag.infoset_start_seq_id[source_infoset_id]
+            values[start_seq_id: start_seq_id + num_actions] = source_values[source_start_seq_id: source_start_seq_id + num_actions]
+        return values
+
     def get_infoset_infoset_children(self):
         for infoset_id in range(self.num_infosets):
             infoset_children = []
-            for seq_id in self.infoset_parent_seq_id[infoset_id]:
-                infoset_children.extend(self.seq_id_child_infoset_id[seq_id])
+            for seq_id in self.get_parent_seq_ids(infoset_id):
+                infoset_children.extend(self.get_child_infoset_ids(seq_id))
             yield infoset_children
-    
+
+
+class DagLevel(object):
+    """
+    The infosets of one topological level of a frozen DagStructure, together with their parent relation
+    as a sparse (infosets x parent sequences) 0/1 matrix. Since no infoset of the level is a descendant of
+    another one, the parent sums of the whole level (top-down passes) and the values pushed up to the
+    parents (bottom-up passes) are one sparse mat-vec each.
+
+    All methods work on the last axis, so that batches of vectors (e.g. of BatchedDagRegretMinimizer)
+    are processed with sparse mat-mats.
+    """
+    def __init__(self, dag_structure: DagStructure, infoset_ids: np.ndarray):
+        self.infoset_ids = np.asarray(infoset_ids, dtype=np.intp)
+        self.num_actions = dag_structure.infoset_num_actions[self.infoset_ids]
+        num_infosets = self.infoset_ids.size
+
+        # Sequences of the level, grouped by infoset, and the segment of each infoset within them.
+        self.segment_starts = np.zeros(num_infosets, dtype=np.intp)
+        np.cumsum(self.num_actions[:-1], out=self.segment_starts[1:])
+        self.seq_infoset_index = np.repeat(np.arange(num_infosets), self.num_actions)
+        self.seq_ids = (dag_structure.infoset_start_seq_id[self.infoset_ids][self.seq_infoset_index]
+                        + np.arange(self.seq_infoset_index.size) - self.segment_starts[self.seq_infoset_index])
+
+        # Parent relation restricted to the (distinct) parent sequences of the level.
+        parent_starts = dag_structure.infoset_parent_offsets[self.infoset_ids]
+        parent_counts = dag_structure.infoset_parent_offsets[self.infoset_ids + 1] - parent_starts
+        rows = np.repeat(np.arange(num_infosets), parent_counts)
+        parent_positions = np.repeat(parent_starts, parent_counts) + np.arange(rows.size) \
+            - np.repeat(np.cumsum(parent_counts) - parent_counts, parent_counts)
+        self.parent_seq_ids, columns = np.unique(dag_structure.infoset_parent_seq_ids[parent_positions], return_inverse=True)
+        self.parent_matrix = sp.csr_matrix((np.ones(rows.size), (rows, columns.ravel())),
+                                           shape=(num_infosets, self.parent_seq_ids.size))
+        self.parent_matrix_t = self.parent_matrix.T.tocsr()
+
+    def expand(self, infoset_values: np.ndarray):
+        """
+        Repeats values given per infoset of the level over the sequences of each infoset.
+        """
+        return infoset_values[..., self.seq_infoset_index]
+
+    def parent_sums(self, data: np.ndarray):
+        """
+        Returns the sum of data over the parent sequences of every infoset of the level.
+        """
+        parent_data = data[..., self.parent_seq_ids]
+        if parent_data.ndim == 1:
+            return self.parent_matrix @ parent_data
+        return (self.parent_matrix @ parent_data.T).T
+
+    def beh_to_seq(self, data: np.ndarray):
+        """
+        Top-down step of the behavioral to sequence form conversion: scales the behavioral strategies
+        of the level by the reach of their parents. Levels must be processed in order.
+        """
+        data[..., self.seq_ids] *= self.expand(self.parent_sums(data))
+
+    def propagate_values(self, beh: np.ndarray, rewards: np.ndarray):
+        """
+        Bottom-up step of DagRegretMinimizer.observe_rewards: computes the value of beh at every infoset
+        of the level and adds it to the rewards of the parent sequences (in place). Levels must be
+        processed in reverse order.
+
+        Returns:
+            np.ndarray: The value of every infoset of the level.
+        """
+        values = np.add.reduceat(rewards[..., self.seq_ids] * beh[..., self.seq_ids], self.segment_starts, axis=-1)
+        if values.ndim == 1:
+            rewards[..., self.parent_seq_ids] += self.parent_matrix_t @ values
+        else:
+            rewards[..., self.parent_seq_ids] += (self.parent_matrix_t @ values.T).T
+        return values
+
+def _frozen_int32(arr):
+    arr = np.ascontiguousarray(arr, dtype=np.int32)
+    arr.flags.writeable = False
+    return arr
+
+
 def unit_test():
     dag = DagStructure()
     dag.add_infoset([0], 3, "Infoset1")
@@ -113,6 +382,17 @@ def unit_test():
     assert dag.infoset_start_seq_id == [1, 4, 6, 8]
     assert dag.seq_id_child_infoset_id == [[0], [1, 2], [3], [1, 2], [], [], [], [3], [], []]
 
+    dag.freeze()
+    assert dag.frozen
+    assert dag.infoset_num_actions.tolist() == [3, 2, 2, 2]
+    assert dag.infoset_start_seq_id.tolist() == [1, 4, 6, 8]
+    assert dag.infoset_parent_offsets.tolist() == [0, 1, 3, 5, 7]
+    assert dag.infoset_parent_seq_ids.tolist() == [0, 1, 3, 1, 3, 2, 7]
+    assert [dag.get_child_infoset_ids(seq_id).tolist() for seq_id in range(dag.num_sequences)] == \
+        [[0], [1, 2], [3], [1, 2], [], [], [], [3], [], []]
+    assert dag.infoset_levels.tolist() == [0, 1, 1, 2]
+    assert [level.infoset_ids.tolist() for level in dag.get_levels()] == [[0], [1, 2], [3]]
+
     print("Number of sequences:", dag.num_sequences)
     print("Number of infosets:", dag.num_infosets)
     print("Infoset names to IDs:", dag.infoset_name_to_id)
@@ -1,25 +1,50 @@
 from online_learning.dag_structure import DagStructure
 from online_learning.regret_matching import RegretMatching
+from online_learning import treeplex_kernels
 import numpy as np
 
 class DagTreeplex(object):
-    def __init__(self, dag_structure: DagStructure, init = None):
+    def __init__(self, dag_structure: DagStructure, init = None, dtype = np.float64):
         """
         Initializes the DagTreeplex with a given DagStructure.
 
         Args:
             dag_structure: An instance of DagStructure representing the directed acyclic graph.
+                           It is frozen if it is not already.
+            init (np.ndarray): Initial treeplex data, used as is (not copied).
+            dtype: Floating point type of the treeplex data if init is not given, e.g. np.float32
+                   to halve the memory footprint.
         """
-        self.dag_structure = dag_structure
+        self.dag_structure = dag_structure.freeze()
 
         if init is None:
-            self.treeplex_data = np.zeros(dag_structure.num_sequences, dtype=np.float64)
+            self.treeplex_data = np.zeros(dag_structure.num_sequences, dtype=dtype)
         else:
             assert len(init) == dag_structure.num_sequences, "Initialization array must match the number of sequences."
             self.treeplex_data = init
 
+    def _structure_arrays(self):
+        """
+        Returns the flat structure arrays passed to the compiled kernels in treeplex_kernels.
+        """
+        return (self.dag_structure.infoset_num_actions,
+                self.dag_structure.infoset_start_seq_id,
+                self.dag_structure.infoset_parent_offsets,
+                self.dag_structure.infoset_parent_seq_ids)
+
+    def _use_kernels(self):
+        return treeplex_kernels.USE_NUMBA and self.treeplex_data.dtype in (np.float32, np.float64)
+
     def best_response_to_reward_vector(self, reward_vector: np.ndarray, inplace = False):
         assert reward_vector.size == self.dag_structure.num_sequences, "Reward vector size must match the number of sequences."
+        use_kernels = treeplex_kernels.USE_NUMBA and reward_vector.dtype == np.float64
+
+        # Without the compiled traversal, DAGs with a specialized method (e.g. the knapsack DP of Blotto DAGs)
+        # use it instead. It leaves the reward vector as is.
+        if not use_kernels:
+            specialized = self.dag_structure.best_response(reward_vector)
+            if specialized is not None:
+                return DagTreeplex(self.dag_structure, specialized)
         
         # If inplace is False, create a copy of the reward vector
         if inplace == False:
@@ -29,6 +54,10 @@ class DagTreeplex(object):
         
         ret = np.zeros(self.dag_structure.num_sequences, dtype=np.float64)
 
+        if use_kernels:
+            treeplex_kernels.best_response(*self._structure_arrays(), rewards, ret)
+            return DagTreeplex(self.dag_structure, ret)
+
         for infoset_id in reversed(range(self.dag_structure.num_infosets)):
             num_actions = self.dag_structure.infoset_num_actions[infoset_id]
             start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
@@ -39,8 +68,7 @@ class DagTreeplex(object):
             ret[best_action_seq_id] = 1.0
 
             # Update the rewards for the parent sequences
-            for parent_seq_id in self.dag_structure.infoset_parent_seq_id[infoset_id]:
-                rewards[parent_seq_id] += rewards[best_action_seq_id]
+            rewards[self.dag_structure.get_parent_seq_ids(infoset_id)] += rewards[best_action_seq_id]
 
         ret[0] = 1.0 # Empty sequence defaults to 1
         beh = DagTreeplex(self.dag_structure, ret)
@@ -52,36 +80,34 @@ class DagTreeplex(object):
         Fills the treeplex data structure with a uniform distribution in sequence form.
         """
         
-        self.treeplex_data = np.zeros(self.dag_structure.num_sequences, dtype=np.float64)
+        self.treeplex_data = np.zeros(self.dag_structure.num_sequences, dtype=self.treeplex_data.dtype)
         self.treeplex_data[0] = 1.0
 
-        for infoset_id in range(self.dag_structure.num_infosets):
-            num_actions = self.dag_structure.infoset_num_actions[infoset_id]
-            start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
-            parent_seq_ids = self.dag_structure.infoset_parent_seq_id[infoset_id]
-
-            parent_mass = sum(self.treeplex_data[seq_id] for seq_id in parent_seq_ids)
+        if self._use_kernels():
+            treeplex_kernels.unif_seq_form(*self._structure_arrays(), self.treeplex_data)
+            return
 
-            for seq_id in range(start_seq_id, start_seq_id + num_actions):
-                self.treeplex_data[seq_id] = parent_mass / num_actions
+        self.fill_with_unif_beh_form()
+        self.convert_beh_to_seq()
 
     def fill_with_unif_beh_form(self):
         """
         Fills the treeplex data structure with a uniform distribution in behavior form.
         """
         self.treeplex_data[0] = 1.0
-        for infoset_id in range(self.dag_structure.num_infosets):
-            num_actions = self.dag_structure.infoset_num_actions[infoset_id]
-            start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
-
-            for seq_id in range(start_seq_id, start_seq_id + num_actions):
-                self.treeplex_data[seq_id] = 1.0 / num_actions
+        self.treeplex_data[1:] = np.repeat(1.0 / self.dag_structure.infoset_num_actions, self.dag_structure.infoset_num_actions)
 
     def convert_seq_to_beh(self):
         """
         Converts the treeplex data from sequence form to behavior form.
         """
         assert self.treeplex_data[0] == 1.0
+        if self._use_kernels():
+            treeplex_kernels.seq_to_beh(self.dag_structure.infoset_num_actions,
+                                        self.dag_structure.infoset_start_seq_id,
+                                        self.treeplex_data)
+            return
+
         self.treeplex_data[0] = 1.0
         for infoset_id in range(self.dag_structure.num_infosets):
             num_actions = self.dag_structure.infoset_num_actions[infoset_id]
@@ -101,16 +127,22 @@ class DagTreeplex(object):
         """
         Converts the treeplex data from behavior form to sequence form by top down traversal.
         """
-        self.treeplex_data[0] = 1.0
-        for infoset_id in range(self.dag_structure.num_infosets):
-            num_actions = self.dag_structure.infoset_num_actions[infoset_id]
-            start_seq_id = self.dag_structure.infoset_start_seq_id[infoset_id]
-            parent_seq_ids = self.dag_structure.infoset_parent_seq_id[infoset_id]
+        if self._use_kernels():
+            treeplex_kernels.beh_to_seq(*self._structure_arrays(), self.treeplex_data)
+            return
 
-            parent_mass = sum(self.treeplex_data[seq_id] for seq_id in parent_seq_ids)
+        # One sparse mat-vec per topological level.
+        self.treeplex_data[0] = 1.0
+        for level in self.dag_structure.get_levels():
+            level.beh_to_seq(self.treeplex_data)
 
-            for seq_id in range(start_seq_id, start_seq_id + num_actions):
-                self.treeplex_data[seq_id] = parent_mass * self.treeplex_data[seq_id]
+    def to_behavioral(self):
+        """
+        Returns a behavioral form copy of the treeplex data, which is assumed to be in sequence form.
+        """
+        beh = DagTreeplex(self.dag_structure, self.treeplex_data.astype(np.float64))
+        beh.convert_seq_to_beh()
+        return beh.treeplex_data
 
     def __str__(self):
         """
@@ -0,0 +1,74 @@
+from typing import Dict, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+class SparsePayoffOperator(object):
+    """
+    Payoff matrix A of a two-player zero-sum DAG game, with rows indexed by player 1's sequences
+    and columns by player 2's sequences. Player 1 receives x^T A y.
+
+    A is stored in CSR together with a CSR copy of its transpose, so that both reward vectors
+    are row-major sparse mat-vecs.
+    """
+    def __init__(self, payoff_matrix, dtype = np.float64):
+        """
+        Args:
+            payoff_matrix: Any scipy.sparse matrix (or dense array) of shape (num_sequences_p1, num_sequences_p2).
+            dtype: Floating point type of the stored payoffs.
+        """
+        self.payoff_matrix = sp.csr_matrix(payoff_matrix, dtype=dtype)
+        self.payoff_matrix_t = self.payoff_matrix.T.tocsr()
+        self.shape = self.payoff_matrix.shape
+
+    def from_leaves(leaves: Dict[Tuple[int, int], float],
+                    num_sequences_p1: int,
+                    num_sequences_p2: int):
+        """
+        Builds the operator from a dictionary mapping (seq_id_p1, seq_id_p2) to the payoff of player 1.
+        """
+        seq_ids = np.fromiter((seq_id for seq_pair in leaves.keys() for seq_id in seq_pair),
+                              dtype=np.int64, count=2 * len(leaves)).reshape(-1, 2)
+        payoffs = np.fromiter(leaves.values(), dtype=np.float64, count=len(leaves))
+        payoff_matrix = sp.coo_matrix((payoffs, (seq_ids[:, 0], seq_ids[:, 1])),
+                                      shape=(num_sequences_p1, num_sequences_p2))
+        return SparsePayoffOperator(payoff_matrix)
+
+    def astype(self, dtype):
+        """
+        Returns the operator with payoffs stored as dtype, e.g. np.float32 to run a solve in single precision.
+        """
+        if self.payoff_matrix.dtype == dtype:
+            return self
+        return SparsePayoffOperator(self.payoff_matrix, dtype)
+
+    def reward_vector_p1(self, strategy_p2: np.ndarray, out: np.ndarray = None):
+        """
+        Returns A y, the reward vector of player 1 against player 2's sequence form strategy y.
+        If out is given, the result is written there (scipy still allocates the product).
+        """
+        if out is None:
+            return self.payoff_matrix @ strategy_p2
+        out[:] = self.payoff_matrix @ strategy_p2
+        return out
+
+    def reward_vector_p2(self, strategy_p1: np.ndarray, out: np.ndarray = None):
+        """
+        Returns -A^T x, the reward vector of player 2 against player 1's sequence form strategy x.
+        If out is given, the result is written there (scipy still allocates the product).
+        """
+        if out is None:
+            return -(self.payoff_matrix_t @ strategy_p1)
+        np.negative(self.payoff_matrix_t @ strategy_p1, out=out)
+        return out
+
+    def evaluate(self, strategy_p1: np.ndarray, strategy_p2: np.ndarray):
+        """
+        Returns the bilinear form x^T A y, the payoff of player 1.
+        """
+        return float(strategy_p1 @ (self.payoff_matrix @ strategy_p2))
+
+    def to_sparse(self):
+        """
+        Returns A as a scipy.sparse CSR matrix.
+        """
+        return self.payoff_matrix
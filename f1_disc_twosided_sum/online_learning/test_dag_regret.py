@@ -4,32 +4,55 @@ from online_learning.regret_matching import RegretMatching
 from online_learning.dag_structure import DagStructure
 from online_learning.dag_regret_minimizer import DagRegretMinimizer
 
+def build_dag():
+    dag = DagStructure()
+    dag.add_infoset([0], 3, "Infoset1")
+    dag.add_infoset([1, 3], 2, "Infoset2")
+    dag.add_infoset([1, 3], 2, "Infoset3")
+    dag.add_infoset([2, 7], 2, "Infoset4")
+    return dag.freeze()
+
 class TestDagRegretMinimizer(unittest.TestCase):
     def test_initialization(self):
-        """Test if DagRegretMinimizer initializes correctly."""
-        dag = DagStructure()
-        dag.add_vertex(0, [])
-        dag.add_vertex(1, [0])
-        dag.add_vertex(2, [0, 1])
+        """Test if DagRegretMinimizer initially recommends the uniform strategy."""
+        dag = build_dag()
         drm = DagRegretMinimizer(dag)
 
-        self.assertEqual(drm.dag_structure.get_num_vertices(), 3)
-        self.assertEqual(drm.dag_structure.get_num_edges(), 3)
+        self.assertEqual(drm.regrets.shape, (dag.num_sequences,))
+        strategy = drm.recommend()
+        np.testing.assert_array_almost_equal(drm.last_behavioral_strategy[1:4], np.ones(3) / 3)
+        np.testing.assert_array_almost_equal(strategy.treeplex_data[8:10], np.ones(2) / 3)
 
     def test_update_and_recommend(self):
-        """Test if update and recommend work correctly in DagRegretMinimizer."""
-        dag = DagStructure()
-        dag.add_vertex(0, [])
-        dag.add_vertex(1, [0])
-        dag.add_vertex(2, [0, 1])
-        drm = DagRegretMinimizer(dag, num_actions=3)
+        """Test if the flat regret updates match one RegretMatching instance per infoset."""
+        dag = build_dag()
+        drm = DagRegretMinimizer(dag)
+        simplex_rms = [RegretMatching(n) for n in dag.infoset_num_actions]
+
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            strategy = drm.recommend()
+            beh = np.zeros(dag.num_sequences)
+            for infoset_id, rm in enumerate(simplex_rms):
+                start_seq_id = dag.infoset_start_seq_id[infoset_id]
+                beh[start_seq_id: start_seq_id + rm.n] = rm.recommend()
+            np.testing.assert_array_almost_equal(drm.last_behavioral_strategy[1:], beh[1:])
+
+            rewards = rng.uniform(-1, 1, size=dag.num_sequences)
+            drm.observe_rewards(rewards)
 
-        rewards = {0: np.array([1, 0, 0]), 1: np.array([0, 1, 0]), 2: np.array([0, 0, 1])}
-        last_strategies = {0: np.array([0.5, 0.25, 0.25]), 1: np.array([0.33, 0.33, 0.34]), 2: np.array([0.25, 0.25, 0.5])}
+            # Reference bottom-up propagation.
+            rewards = rewards.copy()
+            for infoset_id in reversed(range(dag.num_infosets)):
+                start_seq_id = dag.infoset_start_seq_id[infoset_id]
+                rm = simplex_rms[infoset_id]
+                observed_rewards = rewards[start_seq_id: start_seq_id + rm.n]
+                rm.update_regrets(observed_rewards)
+                rewards[dag.get_parent_seq_ids(infoset_id)] += np.inner(observed_rewards, rm.last_strategy)
 
-        drm.update_regrets(rewards, last_strategies)
-        for vertex in range(3):
-            self.assertTrue(np.all(drm.regrets[vertex] >= 0))
+            for infoset_id, rm in enumerate(simplex_rms):
+                start_seq_id = dag.infoset_start_seq_id[infoset_id]
+                np.testing.assert_array_almost_equal(drm.regrets[start_seq_id: start_seq_id + rm.n], rm.regrets)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
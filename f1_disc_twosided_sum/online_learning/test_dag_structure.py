@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+from online_learning.dag_structure import DagStructure
+
+class TestDagStructure(unittest.TestCase):
+    def build_dag(self):
+        dag = DagStructure()
+        dag.add_infoset([0], 3, "Infoset1")
+        dag.add_infoset([1, 3], 2, "Infoset2")
+        dag.add_infoset([1, 3], 2, "Infoset3")
+        dag.add_infoset([2, 7], 2, "Infoset4")
+        return dag
+
+    def test_freeze_csr(self):
+        """Test if freeze packs parents and children into matching CSR arrays."""
+        dag = self.build_dag()
+        parents = [list(p) for p in dag.infoset_parent_seq_id]
+        children = [list(c) for c in dag.seq_id_child_infoset_id]
+        dag.freeze()
+
+        self.assertTrue(dag.frozen)
+        self.assertEqual(dag.infoset_num_actions.dtype, np.int32)
+        self.assertEqual(dag.infoset_parent_offsets.dtype, np.int32)
+        self.assertEqual(dag.seq_child_offsets.size, dag.num_sequences + 1)
+        self.assertEqual(dag.infoset_start_seq_id.tolist(), [1, 4, 6, 8])
+        for infoset_id in range(dag.num_infosets):
+            self.assertEqual(dag.get_parent_seq_ids(infoset_id).tolist(), parents[infoset_id])
+        for seq_id in range(dag.num_sequences):
+            self.assertEqual(dag.get_child_infoset_ids(seq_id).tolist(), children[seq_id])
+
+    def test_frozen_is_immutable(self):
+        """Test if a frozen DAG rejects modifications."""
+        dag = self.build_dag().freeze()
+        self.assertIs(dag.freeze(), dag)
+        with self.assertRaises(RuntimeError):
+            dag.add_infoset([0], 2, "Infoset5")
+        with self.assertRaises(ValueError):
+            dag.infoset_parent_seq_ids[0] = 1
+
+    def test_levels(self):
+        """Test if level-wise passes match infoset by infoset traversals."""
+        dag = self.build_dag().freeze()
+        self.assertEqual(dag.infoset_levels.tolist(), [0, 1, 1, 2])
+        self.assertEqual(dag.level_infoset_ids.tolist(), [0, 1, 2, 3])
+        self.assertEqual(dag.level_offsets.tolist(), [0, 1, 3, 4])
+
+        rng = np.random.default_rng(0)
+        beh = rng.uniform(size=(3, dag.num_sequences))
+        rewards = rng.normal(size=(3, dag.num_sequences))
+
+        seq = beh.copy()
+        seq[:, 0] = 1.0
+        for level in dag.get_levels():
+            level.beh_to_seq(seq)
+        propagated = rewards.copy()
+        values = np.zeros((3, dag.num_infosets))
+        for level in reversed(dag.get_levels()):
+            values[:, level.infoset_ids] = level.propagate_values(beh, propagated)
+
+        for k in range(3):
+            ref_seq = beh[k].copy()
+            ref_seq[0] = 1.0
+            for infoset_id in range(dag.num_infosets):
+                start = dag.infoset_start_seq_id[infoset_id]
+                ref_seq[start: start + dag.infoset_num_actions[infoset_id]] *= np.sum(ref_seq[dag.get_parent_seq_ids(infoset_id)])
+            ref_rewards = rewards[k].copy()
+            ref_values = np.zeros(dag.num_infosets)
+            for infoset_id in reversed(range(dag.num_infosets)):
+                start = dag.infoset_start_seq_id[infoset_id]
+                end = start + dag.infoset_num_actions[infoset_id]
+                ref_values[infoset_id] = ref_rewards[start: end] @ beh[k, start: end]
+                ref_rewards[dag.get_parent_seq_ids(infoset_id)] += ref_values[infoset_id]
+
+            np.testing.assert_allclose(seq[k], ref_seq)
+            np.testing.assert_allclose(values[k], ref_values)
+            np.testing.assert_allclose(propagated[k], ref_rewards)
+            # A single vector gives the same result as a batch.
+            single = beh[k].copy()
+            single[0] = 1.0
+            for level in dag.get_levels():
+                level.beh_to_seq(single)
+            np.testing.assert_allclose(single, ref_seq)
+
+if __name__ == '__main__':
+    unittest.main()
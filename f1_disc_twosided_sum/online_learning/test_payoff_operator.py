@@ -0,0 +1,25 @@
+import unittest
+import numpy as np
+from online_learning.payoff_operator import SparsePayoffOperator
+
+class TestSparsePayoffOperator(unittest.TestCase):
+    def test_matches_leaves(self):
+        """Test if the sparse operator agrees with summing over the leaves dictionary."""
+        rng = np.random.default_rng(0)
+        leaves = {(1, 2): 1.0, (1, 4): -0.5, (3, 2): 2.0, (5, 0): 0.25}
+        payoff_operator = SparsePayoffOperator.from_leaves(leaves, 6, 5)
+        x = rng.uniform(size=6)
+        y = rng.uniform(size=5)
+
+        expected_p1 = np.zeros(6)
+        expected_p2 = np.zeros(5)
+        for (seq_id1, seq_id2), reward in leaves.items():
+            expected_p1[seq_id1] += reward * y[seq_id2]
+            expected_p2[seq_id2] -= reward * x[seq_id1]
+
+        np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p1(y), expected_p1)
+        np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p2(x), expected_p2)
+        self.assertAlmostEqual(payoff_operator.evaluate(x, y), x @ expected_p1)
+
+if __name__ == '__main__':
+    unittest.main()
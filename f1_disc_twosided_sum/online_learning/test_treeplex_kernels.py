@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+from online_learning import treeplex_kernels
+from online_learning.dag_structure import DagStructure
+from online_learning.dag_treeplex import DagTreeplex
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+
+def random_dag(num_infosets, rng):
+    """
+    Random DAG where every infoset has up to 3 parent sequences among the existing ones.
+    """
+    dag = DagStructure()
+    for infoset_id in range(num_infosets):
+        num_parents = min(dag.num_sequences, int(rng.integers(1, 4)))
+        parent_seq_ids = rng.choice(dag.num_sequences, size=num_parents, replace=False)
+        dag.add_infoset(sorted(parent_seq_ids.tolist()), int(rng.integers(1, 5)), f"Infoset{infoset_id}")
+    return dag.freeze()
+
+def run_both(func):
+    """
+    Runs func() with the compiled kernels and with the pure-Python code, returning both results.
+    """
+    use_numba = treeplex_kernels.USE_NUMBA
+    try:
+        treeplex_kernels.USE_NUMBA = True
+        compiled = func()
+        treeplex_kernels.USE_NUMBA = False
+        reference = func()
+    finally:
+        treeplex_kernels.USE_NUMBA = use_numba
+    return compiled, reference
+
+@unittest.skipUnless(treeplex_kernels.NUMBA_AVAILABLE, "numba is not installed")
+class TestTreeplexKernels(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.dag = random_dag(30, self.rng)
+
+    def test_conversions(self):
+        """Test if compiled beh<->seq conversions and the uniform strategy match the pure-Python code."""
+        beh = self.rng.uniform(size=self.dag.num_sequences)
+        beh[self.rng.uniform(size=self.dag.num_sequences) < 0.2] = 0.0
+
+        def convert():
+            strategy = DagTreeplex(self.dag, beh.copy())
+            strategy.convert_beh_to_seq()
+            seq = strategy.treeplex_data.copy()
+            strategy.convert_seq_to_beh()
+            unif = DagTreeplex(self.dag)
+            unif.fill_with_unif_seq_form()
+            return seq, strategy.treeplex_data, unif.treeplex_data
+
+        for compiled, reference in zip(*run_both(convert)):
+            np.testing.assert_array_almost_equal(compiled, reference)
+
+    def test_best_response(self):
+        """Test if the compiled best response matches the pure-Python one, including ties."""
+        strategy = DagTreeplex(self.dag)
+        for rewards in [self.rng.uniform(-1, 1, size=self.dag.num_sequences),
+                        self.rng.integers(0, 2, size=self.dag.num_sequences).astype(np.float64)]:
+            compiled, reference = run_both(lambda: strategy.best_response_to_reward_vector(rewards).treeplex_data)
+            np.testing.assert_array_equal(compiled, reference)
+
+    def test_observe_rewards(self):
+        """Test if regret updates with the compiled propagation match the pure-Python one."""
+        rewards = [self.rng.uniform(-1, 1, size=self.dag.num_sequences) for _ in range(10)]
+
+        def run():
+            drm = DagRegretMinimizer(self.dag, update_rule='prm+')
+            for reward in rewards:
+                drm.recommend()
+                drm.observe_rewards(reward)
+            return drm.regrets
+
+        compiled, reference = run_both(run)
+        np.testing.assert_array_almost_equal(compiled, reference)
+
+if __name__ == "__main__":
+    unittest.main()
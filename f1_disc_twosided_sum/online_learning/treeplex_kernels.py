@@ -0,0 +1,104 @@
+"""
+Compiled traversals over the flat (CSR) arrays of a frozen DagStructure.
+
+Every kernel takes the structure arrays explicitly, works in place on preallocated float32 or float64 buffers
+and loops over infosets in topological order (top-down) or reverse topological order (bottom-up).
+If numba is installed the kernels are JIT compiled on first use; otherwise USE_NUMBA is False and
+DagTreeplex / DagRegretMinimizer keep using their pure-Python implementations.
+
+Set USE_NUMBA = False to force the pure-Python code paths (e.g. when debugging).
+"""
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+USE_NUMBA = NUMBA_AVAILABLE
+
+def _jit(func):
+    if NUMBA_AVAILABLE:
+        return numba.njit(cache=True, nogil=True)(func)
+    return func
+
+@_jit
+def beh_to_seq(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, data):
+    """
+    Top-down conversion of a behavioral strategy into sequence form, in place.
+    """
+    data[0] = 1.0
+    for infoset_id in range(num_actions.shape[0]):
+        parent_mass = 0.0
+        for k in range(parent_offsets[infoset_id], parent_offsets[infoset_id + 1]):
+            parent_mass += data[parent_seq_ids[k]]
+        start_seq_id = start_seq_ids[infoset_id]
+        for seq_id in range(start_seq_id, start_seq_id + num_actions[infoset_id]):
+            data[seq_id] *= parent_mass
+
+@_jit
+def seq_to_beh(num_actions, start_seq_ids, data):
+    """
+    Normalizes a sequence form strategy into a behavioral strategy, in place.
+    Infosets reached with zero mass are set to uniform.
+    """
+    data[0] = 1.0
+    for infoset_id in range(num_actions.shape[0]):
+        start_seq_id = start_seq_ids[infoset_id]
+        end_seq_id = start_seq_id + num_actions[infoset_id]
+        total_child_mass = 0.0
+        for seq_id in range(start_seq_id, end_seq_id):
+            total_child_mass += data[seq_id]
+        if total_child_mass == 0:
+            for seq_id in range(start_seq_id, end_seq_id):
+                data[seq_id] = 1.0 / num_actions[infoset_id]
+        else:
+            for seq_id in range(start_seq_id, end_seq_id):
+                data[seq_id] /= total_child_mass
+
+@_jit
+def unif_seq_form(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, data):
+    """
+    Fills data with the uniform strategy in sequence form.
+    """
+    for infoset_id in range(num_actions.shape[0]):
+        start_seq_id = start_seq_ids[infoset_id]
+        for seq_id in range(start_seq_id, start_seq_id + num_actions[infoset_id]):
+            data[seq_id] = 1.0 / num_actions[infoset_id]
+    beh_to_seq(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, data)
+
+@_jit
+def best_response(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, rewards, ret):
+    """
+    Bottom-up best response to rewards (modified in place). The pure best response is
+    written into ret (zero-initialized) in sequence form.
+    """
+    for infoset_id in range(num_actions.shape[0] - 1, -1, -1):
+        # First maximizer, as np.argmax.
+        start_seq_id = start_seq_ids[infoset_id]
+        best_action_seq_id = start_seq_id
+        for seq_id in range(start_seq_id + 1, start_seq_id + num_actions[infoset_id]):
+            if rewards[seq_id] > rewards[best_action_seq_id]:
+                best_action_seq_id = seq_id
+        ret[best_action_seq_id] = 1.0
+
+        for k in range(parent_offsets[infoset_id], parent_offsets[infoset_id + 1]):
+            rewards[parent_seq_ids[k]] += rewards[best_action_seq_id]
+    ret[0] = 1.0
+    beh_to_seq(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, ret)
+
+@_jit
+def propagate_values(num_actions, start_seq_ids, parent_offsets, parent_seq_ids, beh, rewards, infoset_values):
+    """
+    Bottom-up pass of DagRegretMinimizer.observe_rewards: computes the value of beh at each infoset
+    into infoset_values and pushes it to the parent sequences of rewards (modified in place).
+    """
+    for infoset_id in range(num_actions.shape[0] - 1, -1, -1):
+        start_seq_id = start_seq_ids[infoset_id]
+        value = 0.0
+        for seq_id in range(start_seq_id, start_seq_id + num_actions[infoset_id]):
+            value += rewards[seq_id] * beh[seq_id]
+        infoset_values[infoset_id] = value
+        for k in range(parent_offsets[infoset_id], parent_offsets[infoset_id + 1]):
+            rewards[parent_seq_ids[k]] += value
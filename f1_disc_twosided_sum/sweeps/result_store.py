@@ -0,0 +1,96 @@
+"""
+Append-only columnar store for sweep results.
+
+The store is a directory of shards, each an .npz file holding one array per column (strings as
+unicode arrays, metrics as float64), so that a shard can be read without pickling. Every record has
+a unique cell key; if a cell was recorded several times (e.g. retried after a timeout), the last
+record wins.
+"""
+
+from typing import Dict, List
+from pathlib import Path
+import os
+import time
+import numpy as np
+
+class ColumnarResultStore(object):
+    def __init__(self, path):
+        """
+        Args:
+            path: Directory of the store, created if needed.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.num_shards_written = 0
+
+    def shard_paths(self):
+        return sorted(self.path.glob("part-*.npz"))
+
+    def append(self, records: List[Dict]):
+        """
+        Writes records (dictionaries with a 'key' entry) as a new shard. Values are stored as float64
+        if every record has a number (or None) there, and as strings otherwise.
+        """
+        if len(records) == 0:
+            return
+        columns = {}
+        for name in sorted(set().union(*records)):
+            values = [record.get(name) for record in records]
+            if all(value is None or (isinstance(value, (int, float, np.number)) and not isinstance(value, bool)) for value in values):
+                columns[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            else:
+                columns[name] = np.array(["" if value is None else str(value) for value in values])
+
+        shard_path = self.path / f"part-{time.time_ns()}-{os.getpid()}-{self.num_shards_written:05d}.npz"
+        tmp_path = shard_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, shard_path)
+        self.num_shards_written += 1
+
+    def load(self):
+        """
+        Reads the whole store, keeping the last record of every key.
+
+        Returns:
+            Dict[str, np.ndarray]: One array per column. Missing entries are NaN (numbers) or "" (strings).
+        """
+        shards = []
+        for shard_path in self.shard_paths():
+            with np.load(shard_path, allow_pickle=False) as data:
+                shards.append({name: data[name] for name in data.files})
+        if len(shards) == 0:
+            return {}
+
+        columns = {}
+        for name in sorted(set().union(*shards)):
+            parts = []
+            for shard in shards:
+                num_records = len(shard["key"])
+                if name in shard:
+                    parts.append(shard[name])
+                elif all(shard_with_name[name].dtype.kind == "f" for shard_with_name in shards if name in shard_with_name):
+                    parts.append(np.full(num_records, np.nan))
+                else:
+                    parts.append(np.full(num_records, ""))
+            if any(part.dtype.kind != "f" for part in parts):
+                parts = [part.astype(str) for part in parts]
+            columns[name] = np.concatenate(parts)
+
+        # Keep the last record of every key.
+        keys = columns["key"]
+        _, last_from_end = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(keys) - 1 - last_from_end)
+        return {name: column[keep] for name, column in columns.items()}
+
+    def completed_keys(self, statuses=None):
+        """
+        Returns the set of recorded cell keys, restricted to the given statuses if any.
+        """
+        columns = self.load()
+        if len(columns) == 0:
+            return set()
+        keys = columns["key"]
+        if statuses is not None:
+            keys = keys[np.isin(columns["status"], list(statuses))]
+        return set(keys.tolist())
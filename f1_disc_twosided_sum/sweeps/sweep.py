@@ -0,0 +1,245 @@
+"""
+Parameter sweeps over Blotto-family games, run on a pool of worker processes.
+
+A grid spec maps every parameter to a list of alternatives and the sweep runs their cartesian product:
+
+    {
+        "game": ["BlottoWithRaise"],
+        "num_battles": [3, 5],
+        "num_soldiers": [[5, 3], [10, 5]],
+        "battlefield_worth": ["linear", [1.0, 2.0, 3.0]],
+        "solver": ["prm+", "lp"],
+        "iterations": [10000],
+        "seed": [0, 1, 2]
+    }
+
+Recognized parameters are listed in CELL_DEFAULTS; battlefield_worth is "uniform", "linear" (normalized 1..B),
+"random" (drawn with seed) or an explicit list. Each cell runs in its own process with a time limit, and
+results are appended to a ColumnarResultStore. Cells already in the store are skipped, so an interrupted
+sweep is resumed by running it again.
+
+Usage:
+    python -m sweeps.sweep grid.json results/sweep --workers 64 --timeout 10800
+"""
+
+from typing import Dict, List
+import argparse
+import itertools
+import json
+import multiprocessing
+import multiprocessing.connection
+import time
+import traceback
+import numpy as np
+from sweeps.result_store import ColumnarResultStore
+
+# Parameters of a cell and their defaults.
+CELL_DEFAULTS = {
+    'game': 'BlottoGame',                # 'BlottoGame' or 'BlottoWithRaise'
+    'num_battles': 3,
+    'num_soldiers': [5, 3],
+    'battlefield_worth': 'uniform',
+    'soft_victory': True,                # BlottoWithRaise only
+    'raise_multiplier': 2.0,             # BlottoWithRaise only
+    'solver': 'rm+',                     # An update rule of solve_dag_game, 'blotto_alt' (C++), 'lp' (LP_BACKEND, Gurobi or HiGHS)
+                                         # or 'lp_decomposed' (column generation over allocations, see lp_solver/decomposed_lp.py)
+    'iterations': 10000,                 # Master solves for 'lp_decomposed'
+    'alternating': True,                 # solve_dag_game only
+    'target_gap': None,
+    'seed': 0,
+}
+
+def expand_grid(grid_spec: Dict[str, List]):
+    """
+    Returns the list of cells (dictionaries of parameters) of a grid spec.
+    """
+    unknown = set(grid_spec) - set(CELL_DEFAULTS)
+    assert len(unknown) == 0, f"Unknown sweep parameters {sorted(unknown)}."
+    names = sorted(grid_spec)
+    cells = []
+    for values in itertools.product(*(grid_spec[name] for name in names)):
+        cell = dict(CELL_DEFAULTS)
+        cell.update(zip(names, values))
+        cells.append(cell)
+    return cells
+
+def cell_key(cell: Dict):
+    return json.dumps(cell, sort_keys=True)
+
+def battlefield_worth(cell: Dict):
+    num_battles = cell['num_battles']
+    worth = cell['battlefield_worth']
+    if worth == 'uniform':
+        return [1.0] * num_battles
+    if worth == 'linear':
+        return ((np.arange(num_battles) + 1) / (num_battles * (1.0 + num_battles) / 2)).tolist()
+    if worth == 'random':
+        return np.random.default_rng(cell['seed']).uniform(0.0, 1.0, size=num_battles).tolist()
+    assert len(worth) == num_battles, "Explicit battlefield_worth must have one entry per battle."
+    return list(worth)
+
+def build_game(cell: Dict):
+    num_soldiers = tuple(cell['num_soldiers'])
+    if cell['game'] == 'BlottoGame':
+        from game_defs.basic_blotto import BlottoGame
+        return BlottoGame(cell['num_battles'], num_soldiers, battlefield_worth(cell))
+    if cell['game'] == 'BlottoWithRaise':
+        from game_defs.battlefield_games import BlottoWithRaise
+        return BlottoWithRaise(cell['num_battles'], num_soldiers, battlefield_worth(cell),
+                               soft_victory=cell['soft_victory'], raise_multiplier=cell['raise_multiplier'])
+    raise ValueError(f"Unknown game {cell['game']}.")
+
+def run_cell(cell: Dict):
+    """
+    Builds and solves the game of a cell.
+
+    Returns:
+        Dict: Metrics of the solve: value, gap, iterations run (NaN for the LP, master solves for the decomposed LP),
+            build and solve time, and status ('ok', or 'not_converged' if the decomposed LP stopped above its tolerance).
+    """
+    from online_learning.dag_regret_minimizer import DagRegretMinimizer, UPDATE_RULES
+
+    start_time = time.perf_counter()
+    game = build_game(cell)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    status = 'ok'
+    iterations = cell['iterations']
+    if cell['solver'] in UPDATE_RULES:
+        last_iteration = [0]
+        def callback(t, *args):
+            last_iteration[0] = t
+        strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=iterations, update_rule=cell['solver'],
+                                                               alternating=cell['alternating'], target_gap=cell['target_gap'],
+                                                               callback=callback)
+        iterations = last_iteration[0]
+    elif cell['solver'] == 'blotto_alt':
+        from game_defs.fast_blotto import solve_blotto_alt
+        strat_p1, strat_p2 = solve_blotto_alt(game, iterations=iterations,
+                                              target_gap=cell['target_gap'] if cell['target_gap'] is not None else 0.0)
+    elif cell['solver'] == 'lp':
+        from lp_solver.solve_blotto import LpSolver
+        strat_p1, strat_p2, _ = LpSolver(game).solve_lp(verbose=False, scaled=True)
+        iterations = np.nan
+    elif cell['solver'] == 'lp_decomposed':
+        from lp_solver.decomposed_lp import DecomposedLpSolver
+        solver = DecomposedLpSolver(game)
+        strat_p1, strat_p2, _ = solver.solve_lp(verbose=False, max_iterations=iterations)
+        iterations = solver.last_report['iterations']
+        if not solver.last_report['converged']:
+            status = 'not_converged'
+    else:
+        raise ValueError(f"Unknown solver {cell['solver']}.")
+    solve_time = time.perf_counter() - start_time
+
+    return {'value': game.evaluate(strat_p1, strat_p2), 'gap': game.saddle_point_gap(strat_p1, strat_p2),
+            'iterations': iterations, 'build_time': build_time, 'solve_time': solve_time, 'status': status}
+
+def _worker(cell: Dict, conn):
+    try:
+        result = run_cell(cell)
+    except Exception:
+        result = {'status': 'error', 'error': traceback.format_exc(limit=5)}
+    conn.send(result)
+    conn.close()
+
+def make_record(cell: Dict, result: Dict):
+    record = {'key': cell_key(cell)}
+    for name, value in cell.items():
+        is_number = value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+        record[name] = value if is_number else json.dumps(value)
+    record.update(result)
+    return record
+
+def run_sweep(grid_spec: Dict[str, List],
+              store_path,
+              num_workers: int = None,
+              timeout: float = None,
+              flush_every: int = 16,
+              retry_failed: bool = False,
+              verbose: bool = True):
+    """
+    Runs every cell of a grid spec which is not in the store yet.
+
+    Args:
+        grid_spec (Dict[str, List]): Alternatives of every parameter, see expand_grid().
+        store_path: Directory of the ColumnarResultStore.
+        num_workers (int): Number of concurrent processes, defaults to the number of cores.
+        timeout (float): Per-cell wall time limit in seconds. Cells running over are killed and recorded
+            with status 'timeout'.
+        flush_every (int): Number of finished cells buffered before writing a shard.
+        retry_failed (bool): Also rerun cells recorded with status 'error', 'timeout' or 'not_converged'.
+
+    Returns:
+        ColumnarResultStore: The store.
+    """
+    store = ColumnarResultStore(store_path)
+    done = store.completed_keys(statuses=['ok'] if retry_failed else None)
+    pending = [cell for cell in expand_grid(grid_spec) if cell_key(cell) not in done]
+    num_workers = num_workers or multiprocessing.cpu_count()
+    if verbose:
+        print(f"{len(pending)} cells to run, {len(done)} already done.")
+
+    # Fresh interpreters, so workers do not inherit solver or BLAS thread state.
+    context = multiprocessing.get_context("spawn")
+    running = {}  # connection -> (process, cell, deadline)
+    buffer = []
+    try:
+        while len(pending) > 0 or len(running) > 0:
+            while len(pending) > 0 and len(running) < num_workers:
+                cell = pending.pop(0)
+                recv_conn, send_conn = context.Pipe(duplex=False)
+                process = context.Process(target=_worker, args=(cell, send_conn), daemon=True)
+                process.start()
+                send_conn.close()
+                deadline = time.monotonic() + timeout if timeout is not None else None
+                running[recv_conn] = (process, cell, deadline)
+
+            deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if len(deadlines) > 0 else None
+            ready = multiprocessing.connection.wait(list(running), timeout=wait_time)
+
+            for conn in list(running):
+                process, cell, deadline = running[conn]
+                if conn in ready:
+                    try:
+                        result = conn.recv()
+                    except EOFError:
+                        result = {'status': 'error', 'error': f"Worker exited with code {process.exitcode}."}
+                elif deadline is not None and time.monotonic() >= deadline:
+                    process.kill()
+                    result = {'status': 'timeout'}
+                else:
+                    continue
+                process.join()
+                conn.close()
+                del running[conn]
+                buffer.append(make_record(cell, result))
+                if verbose:
+                    print(result['status'], cell_key(cell))
+
+            if len(buffer) >= flush_every:
+                store.append(buffer)
+                buffer = []
+    finally:
+        for process, _, _ in running.values():
+            process.kill()
+        store.append(buffer)
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a parameter sweep over Blotto games.")
+    parser.add_argument("grid_spec", help="JSON file mapping each parameter to a list of alternatives.")
+    parser.add_argument("store_path", help="Directory of the result store.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="Per-cell time limit in seconds.")
+    parser.add_argument("--retry-failed", action="store_true", help="Rerun cells which errored or timed out.")
+    args = parser.parse_args()
+
+    with open(args.grid_spec) as f:
+        grid_spec = json.load(f)
+    run_sweep(grid_spec, args.store_path, num_workers=args.workers, timeout=args.timeout, retry_failed=args.retry_failed)
+
+if __name__ == "__main__":
+    main()
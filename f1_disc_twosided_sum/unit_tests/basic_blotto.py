@@ -79,5 +79,57 @@ class TestBlottoGame(unittest.TestCase):
         print('saddle point gap', saddle_point_gap)
         assert saddle_point_gap < 1e-1, f"Saddle point gap too large: {saddle_point_gap}"
 
+    def test_update_rules(self):
+        print('Testing update rules')
+        num_battles = 5
+        num_soldiers = (5, 10)
+        game = BlottoGame(num_battles, num_soldiers, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        for update_rule in ['rm+', 'prm+', 'dcfr']:
+            strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=2000, update_rule=update_rule)
+            saddle_point_gap = game.saddle_point_gap(strat_p1, strat_p2)
+            print(update_rule, 'saddle point gap', saddle_point_gap)
+            assert saddle_point_gap < 1e-1, f"Saddle point gap too large for {update_rule}: {saddle_point_gap}"
+
+    def test_alternating(self):
+        print('Testing alternating updates')
+        num_battles = 5
+        num_soldiers = (5, 10)
+        game = BlottoGame(num_battles, num_soldiers, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        for update_rule in ['rm', 'rm+', 'prm+', 'dcfr']:
+            strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=1000, update_rule=update_rule, alternating=True)
+            game_value = game.evaluate(strat_p1, strat_p2)
+            saddle_point_gap = game.saddle_point_gap(strat_p1, strat_p2)
+            print(update_rule, 'game value', game_value, 'saddle point gap', saddle_point_gap)
+            assert game_value < 0.0, f"Game value should be negative, {game_value}"
+            assert saddle_point_gap < 1e-1, f"Saddle point gap too large for {update_rule}: {saddle_point_gap}"
+
+        strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=1000, update_rule='rm+', alternating=False)
+        simultaneous_gap = game.saddle_point_gap(strat_p1, strat_p2)
+        strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=1000, update_rule='rm+', alternating=True)
+        alternating_gap = game.saddle_point_gap(strat_p1, strat_p2)
+        assert alternating_gap < simultaneous_gap, f"Alternation should converge faster, {alternating_gap} vs {simultaneous_gap}"
+
+    def test_target_gap(self):
+        print('Testing early stopping')
+        num_battles = 5
+        num_soldiers = (5, 10)
+        game = BlottoGame(num_battles, num_soldiers, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        iterations_run = []
+        callback = lambda iteration, elapsed_time, avg_p1, avg_p2: iterations_run.append(iteration)
+        strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=50000, update_rule='prm+', 
+                                                               target_gap=5e-2, callback=callback)
+        saddle_point_gap = game.saddle_point_gap(strat_p1, strat_p2)
+        print('iterations', iterations_run[-1], 'saddle point gap', saddle_point_gap)
+        assert iterations_run[-1] < 50000, "Solve should have stopped early"
+        assert saddle_point_gap <= 5e-2, f"Saddle point gap too large: {saddle_point_gap}"
+
+        # Callbacks can stop the solve as well.
+        iterations_run.clear()
+        DagRegretMinimizer.solve_dag_game(game, iterations=1000, callback=lambda iteration, *args: iterations_run.append(iteration) or iteration == 10)
+        assert iterations_run[-1] == 10
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+from game_defs.basic_blotto import BlottoGame
+from game_defs.battlefield_games import BlottoWithRaise
+from game_defs.battlefield_payoff import BatchedBattlefieldPayoffOperator
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+from online_learning.batched_regret_minimizer import BatchedDagRegretMinimizer
+from online_learning import treeplex_kernels
+import unittest
+import numpy as np
+
+class TestBatchedSolver(unittest.TestCase):
+    def check_against_single(self, games, **kwargs):
+        payoff_operator = BatchedBattlefieldPayoffOperator.from_games(games)
+        strats_p1, strats_p2, gaps = BatchedDagRegretMinimizer.solve_batched_dag_game(games[0].dag_structure_pl1,
+                                                                                      games[0].dag_structure_pl2,
+                                                                                      payoff_operator,
+                                                                                      **kwargs)
+        for k, game in enumerate(games):
+            strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, **kwargs)
+            np.testing.assert_array_almost_equal(strats_p1[k].treeplex_data, strat_p1.treeplex_data)
+            np.testing.assert_array_almost_equal(strats_p2[k].treeplex_data, strat_p2.treeplex_data)
+            self.assertAlmostEqual(gaps[k], game.saddle_point_gap(strat_p1, strat_p2))
+
+    def test_blotto_worths(self):
+        """Test if a batch of Blotto games with different worths matches solving each game on its own."""
+        rng = np.random.default_rng(0)
+        games = [BlottoGame(3, (4, 3), rng.uniform(0.5, 2.0, size=3).tolist()) for _ in range(4)]
+        for update_rule in ['rm', 'prm+', 'dcfr']:
+            self.check_against_single(games, iterations=50, update_rule=update_rule)
+        self.check_against_single(games, iterations=50, update_rule='rm+', alternating=True)
+
+    def test_blotto_with_raise_pure_python(self):
+        """Test the batched solver without the compiled kernels."""
+        games = [BlottoWithRaise(2, (3, 2), [1.0, worth], soft_victory=True) for worth in [0.5, 1.0, 2.0]]
+        use_numba = treeplex_kernels.USE_NUMBA
+        try:
+            treeplex_kernels.USE_NUMBA = False
+            self.check_against_single(games, iterations=30, update_rule='prm+', alternating=True)
+        finally:
+            treeplex_kernels.USE_NUMBA = use_numba
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+from game_defs.basic_blotto import BlottoGame
+from game_defs.battlefield_games import BlottoWithRaise
+from game_defs.battlefield_payoff import BattlefieldPayoffOperator, KroneckerBlock, dense_block
+from game_defs.generalized_blotto import BayesianBattlefieldGame, GeneralizedBBBlottoGame
+from online_learning.payoff_operator import SparsePayoffOperator
+import unittest
+import numpy as np
+
+class TestBattlefieldPayoffOperator(unittest.TestCase):
+    def check_against_sparse(self, game):
+        rng = np.random.default_rng(0)
+        payoff_operator = game.payoff_operator
+        sparse_operator = SparsePayoffOperator(payoff_operator.to_sparse())
+        x = rng.uniform(size=payoff_operator.shape[0])
+        y = rng.uniform(size=payoff_operator.shape[1])
+
+        np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p1(y), sparse_operator.reward_vector_p1(y))
+        np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p2(x), sparse_operator.reward_vector_p2(x))
+        self.assertAlmostEqual(payoff_operator.evaluate(x, y), sparse_operator.evaluate(x, y))
+
+    def test_blotto(self):
+        """Test if the block operator of BlottoGame agrees with its sparse matrix."""
+        self.check_against_sparse(BlottoGame(4, (5, 3), [1.0, 2.0, 3.0, 4.0]))
+
+    def test_blotto_with_raise(self):
+        """Test if the block operator of BlottoWithRaise agrees with its sparse matrix."""
+        self.check_against_sparse(BlottoWithRaise(3, (4, 6), [1.0, 2.0, 3.0], soft_victory=True))
+
+    def test_bayesian_payoff_tensor(self):
+        """Test if padded payoff tensors with varying action counts give the blocks of the per-type payoff matrices."""
+        rng = np.random.default_rng(1)
+        num_actions_p1, num_actions_p2 = [1, 3, 2], [2, 1]
+        payoff_matrices = [[rng.normal(size=(a1, a2)) for a2 in num_actions_p2] for a1 in num_actions_p1]
+        payoff_tensor = np.full((3, 2, 3, 2), np.nan)
+        for i, a1 in enumerate(num_actions_p1):
+            for j, a2 in enumerate(num_actions_p2):
+                payoff_tensor[i, j, :a1, :a2] = payoff_matrices[i][j]
+
+        from_matrices = BayesianBattlefieldGame(2, 1, num_actions_p1, num_actions_p2, payoff_matrices)
+        from_tensor = BayesianBattlefieldGame(2, 1, num_actions_p1, num_actions_p2, payoff_tensor=payoff_tensor)
+        np.testing.assert_array_equal(from_matrices.to_block(), np.block(payoff_matrices))
+        np.testing.assert_array_equal(from_tensor.to_block(), np.block(payoff_matrices))
+        dense_payoff_matrices = from_tensor.dense_payoff_matrices()
+        for i in range(3):
+            for j in range(2):
+                np.testing.assert_array_equal(dense_payoff_matrices[i][j], payoff_matrices[i][j])
+
+        game = GeneralizedBBBlottoGame(2, (2, 1), [from_tensor, from_matrices])
+        self.assertEqual(game.dag_structure_pl1.dummy_num_actions.tolist(), [num_actions_p1] * 2)
+        self.check_against_sparse(game)
+
+    def test_factored_payoffs(self):
+        """Test if Kronecker-factored payoffs give the same blocks and reward vectors as the dense payoff tensor."""
+        rng = np.random.default_rng(2)
+        payoff_factors = [(rng.normal(size=(4, 3)), rng.normal(size=(2, 3))) for _ in range(2)]
+        factored = BayesianBattlefieldGame(3, 2, [2] * 4, [3] * 3, payoff_factors=payoff_factors)
+        dense = BayesianBattlefieldGame(3, 2, [2] * 4, [3] * 3, payoff_tensor=factored.dense_payoff_tensor())
+        self.assertIsNone(factored.payoff_tensor)
+        block = factored.payoff_block()
+        self.assertIsInstance(block, KroneckerBlock)
+        self.assertEqual(block.shape, dense.to_block().shape)
+        np.testing.assert_array_almost_equal(block.to_dense(), dense.to_block())
+
+        x = rng.normal(size=block.shape[0])
+        y = rng.normal(size=block.shape[1])
+        np.testing.assert_array_almost_equal(block.dot(y), dense.to_block() @ y)
+        np.testing.assert_array_almost_equal(block.dot_transpose(x), dense.to_block().T @ x)
+
+        game = GeneralizedBBBlottoGame(2, (3, 2), [factored, dense])
+        self.check_against_sparse(game)
+
+    def test_blotto_with_raise_storage(self):
+        """Test if BlottoWithRaise stores factored payoffs, a quarter of the dense blocks."""
+        game = BlottoWithRaise(3, (8, 6), [1.0, 2.0, 3.0], soft_victory=False)
+        for block in game.payoff_operator.battlefield_blocks:
+            self.assertIsInstance(block, KroneckerBlock)
+            self.assertEqual(4 * block.type_payoffs[0].nbytes, dense_block(block).nbytes)
+        self.check_against_sparse(game)
+
+    def test_shared_blocks(self):
+        """Test if battlefields with proportional payoffs share one block and give the same rewards as separate blocks."""
+        rng = np.random.default_rng(3)
+        worth = rng.uniform(0.5, 2.0, size=6)
+        for game in [BlottoGame(6, (5, 4), worth.tolist()), BlottoWithRaise(6, (5, 4), worth.tolist(), soft_victory=True)]:
+            payoff_operator = game.payoff_operator
+            self.assertEqual(len(payoff_operator.block_runs), 1)
+            self.assertTrue(all(block is payoff_operator.battlefield_blocks[0] for block in payoff_operator.battlefield_blocks))
+            np.testing.assert_allclose(payoff_operator.battlefield_scales, worth / worth[0], rtol=1e-12)
+
+            separate_operator = BattlefieldPayoffOperator(game.dag_structure_pl1, game.dag_structure_pl2, payoff_operator.dense_blocks())
+            self.assertEqual(payoff_operator.nbytes, payoff_operator.battlefield_blocks[0].nbytes)
+            x = rng.uniform(size=payoff_operator.shape[0])
+            y = rng.uniform(size=payoff_operator.shape[1])
+            np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p1(y), separate_operator.reward_vector_p1(y))
+            np.testing.assert_array_almost_equal(payoff_operator.reward_vector_p2(x), separate_operator.reward_vector_p2(x))
+            self.check_against_sparse(game)
+
+            single_operator = payoff_operator.astype(np.float32)
+            self.assertEqual(len(single_operator.block_runs), 1)
+
+        # Battlefields 0 and 2 share a block but are not consecutive, so they are multiplied separately.
+        battlefield_games = [BlottoWithRaise.generate_battlefield_game(3, 2, worth, True, 2.0) for worth in [1.0, 1.0, -3.0]]
+        battlefield_games[1] = BlottoWithRaise.generate_battlefield_game(3, 2, 1.0, False, 2.0)
+        game = GeneralizedBBBlottoGame(3, (3, 2), battlefield_games)
+        payoff_operator = game.payoff_operator
+        self.assertIs(payoff_operator.battlefield_blocks[0], payoff_operator.battlefield_blocks[2])
+        self.assertIsNot(payoff_operator.battlefield_blocks[0], payoff_operator.battlefield_blocks[1])
+        self.assertEqual(len(payoff_operator.block_runs), 3)
+        self.assertEqual(payoff_operator.battlefield_scales.tolist(), [1.0, 1.0, -3.0])
+        self.check_against_sparse(game)
+        np.testing.assert_array_almost_equal(payoff_operator.dense_blocks()[2], battlefield_games[2].to_block())
+
+    def test_sparse_entries(self):
+        """Test if the sparse matrix puts battlefield payoffs on the dummy sequences."""
+        game = BlottoGame(2, (2, 1), [1.0, 3.0])
+        payoff_matrix = game.payoff_operator.to_sparse()
+        dag_p1, dag_p2 = game.dag_structure_pl1, game.dag_structure_pl2
+        for soldiers_p1 in range(3):
+            for soldiers_p2 in range(2):
+                payoff = payoff_matrix[dag_p1.dummy_start_seq_id[1, soldiers_p1], dag_p2.dummy_start_seq_id[1, soldiers_p2]]
+                self.assertEqual(payoff, 3.0 * np.sign(soldiers_p1 - soldiers_p2))
+
+if __name__ == "__main__":
+    unittest.main()
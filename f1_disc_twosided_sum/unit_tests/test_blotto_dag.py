@@ -0,0 +1,90 @@
+from online_learning.dag_structure import DagStructure
+from online_learning.dag_treeplex import DagTreeplex
+from game_defs.blotto_dag import BlottoDagStructure
+import unittest
+import numpy as np
+
+def reference_blotto_dag(num_battles, num_soldiers, dummy_num_actions):
+    """
+    Incremental (add_infoset based) construction of the Blotto DAG.
+    """
+    dag = DagStructure()
+    dag.add_infoset([0], num_soldiers+1, (0, num_soldiers))
+    for battle_id in range(1, num_battles):
+        for num_soldiers_left in range(num_soldiers+1):
+            par_seq_ids = []
+            for prev_num_soldiers in range(num_soldiers_left, num_soldiers+1):
+                par_infoset_name = (battle_id-1, prev_num_soldiers)
+                if par_infoset_name in dag.infoset_name_to_id:
+                    par_infoset_id = dag.infoset_name_to_id[par_infoset_name]
+                    par_seq_ids.append(dag.infoset_start_seq_id[par_infoset_id] + prev_num_soldiers - num_soldiers_left)
+            dag.add_infoset(par_seq_ids, num_soldiers_left+1, (battle_id, num_soldiers_left))
+
+    for battle_id in range(num_battles):
+        for num_soldiers_used in range(num_soldiers+1):
+            par_seq_ids = []
+            for initial_infoset in range(num_soldiers_used, num_soldiers+1):
+                par_infoset_name = (battle_id, initial_infoset)
+                if par_infoset_name in dag.infoset_name_to_id:
+                    infoset_id = dag.infoset_name_to_id[par_infoset_name]
+                    par_seq_ids.append(dag.infoset_start_seq_id[infoset_id] + num_soldiers_used)
+            dag.add_infoset(par_seq_ids, int(dummy_num_actions[battle_id][num_soldiers_used]), ('d', battle_id, num_soldiers_used))
+    return dag.freeze()
+
+class TestBlottoDag(unittest.TestCase):
+    def assert_same_dag(self, dag, ref):
+        self.assertEqual(dag.num_infosets, ref.num_infosets)
+        self.assertEqual(dag.num_sequences, ref.num_sequences)
+        np.testing.assert_array_equal(dag.infoset_num_actions, ref.infoset_num_actions)
+        np.testing.assert_array_equal(dag.infoset_start_seq_id, ref.infoset_start_seq_id)
+        np.testing.assert_array_equal(dag.infoset_parent_offsets, ref.infoset_parent_offsets)
+        np.testing.assert_array_equal(dag.infoset_parent_seq_ids, ref.infoset_parent_seq_ids)
+        np.testing.assert_array_equal(dag.seq_child_offsets, ref.seq_child_offsets)
+        np.testing.assert_array_equal(dag.seq_child_infoset_ids, ref.seq_child_infoset_ids)
+        np.testing.assert_array_equal(dag.infoset_levels, ref.infoset_levels)
+        self.assertEqual(dag.infoset_id_to_name, ref.infoset_id_to_name)
+
+    def test_matches_incremental_construction(self):
+        """Test if the vectorized builder reproduces the add_infoset based DAG."""
+        rng = np.random.default_rng(0)
+        for num_battles, num_soldiers in [(1, 0), (1, 3), (2, 4), (3, 5), (5, 3)]:
+            dummy_num_actions = rng.integers(1, 4, size=(num_battles, num_soldiers + 1))
+            dag = BlottoDagStructure(num_battles, num_soldiers, dummy_num_actions)
+            ref = reference_blotto_dag(num_battles, num_soldiers, dummy_num_actions)
+            self.assert_same_dag(dag, ref)
+
+    def test_dummy_lookup(self):
+        """Test if the dummy infoset tables agree with the lazily generated names."""
+        dag = BlottoDagStructure(4, 6)
+        for battle_id in range(4):
+            for soldiers_used in range(7):
+                infoset_id = dag.infoset_name_to_id[('d', battle_id, soldiers_used)]
+                self.assertEqual(dag.dummy_infoset_id[battle_id, soldiers_used], infoset_id)
+                self.assertEqual(dag.dummy_start_seq_id[battle_id, soldiers_used], dag.infoset_start_seq_id[infoset_id])
+
+    def test_battlefield_levels(self):
+        """Test if the topological levels are the battlefield layers, with the dummy infosets of battlefield b at level b+1."""
+        dag = BlottoDagStructure(4, 3)
+        self.assertEqual(dag.num_levels, 5)
+        for infoset_id, name in enumerate(dag.infoset_id_to_name):
+            expected_level = name[1] + 1 if name[0] == 'd' else name[0]
+            self.assertEqual(dag.infoset_levels[infoset_id], expected_level)
+
+    def test_best_response_dp(self):
+        """Test if the knapsack DP best response is the one of the generic traversal, ties included."""
+        rng = np.random.default_rng(1)
+        for num_battles, num_soldiers in [(1, 0), (1, 3), (2, 4), (3, 5), (5, 3)]:
+            dummy_num_actions = rng.integers(1, 4, size=(num_battles, num_soldiers + 1))
+            dag = BlottoDagStructure(num_battles, num_soldiers, dummy_num_actions)
+            ref = reference_blotto_dag(num_battles, num_soldiers, dummy_num_actions)
+            for trial in range(10):
+                rewards = rng.normal(size=dag.num_sequences)
+                if trial % 2 == 1:
+                    rewards = np.round(rewards)
+                original_rewards = rewards.copy()
+                np.testing.assert_array_equal(dag.best_response(rewards),
+                                              DagTreeplex(ref).best_response_to_reward_vector(rewards).treeplex_data)
+                np.testing.assert_array_equal(rewards, original_rewards)
+
+if __name__ == "__main__":
+    unittest.main()
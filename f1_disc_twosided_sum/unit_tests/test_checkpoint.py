@@ -0,0 +1,33 @@
+from game_defs.basic_blotto import BlottoGame
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+import unittest
+import tempfile
+import os
+import numpy as np
+
+class TestCheckpoint(unittest.TestCase):
+    def test_exact_resume(self):
+        """Test if a solve interrupted after a checkpoint and resumed matches an uninterrupted solve."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+
+        for update_rule, alternating in [('prm+', True), ('dcfr', False)]:
+            ref_p1, ref_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=100, update_rule=update_rule, alternating=alternating)
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                checkpoint_path = os.path.join(tmp_dir, 'solve.npz')
+
+                # Simulate preemption right after iteration 60.
+                DagRegretMinimizer.solve_dag_game(game, iterations=100, update_rule=update_rule, alternating=alternating,
+                                                  checkpoint_path=checkpoint_path, checkpoint_every=20,
+                                                  callback=lambda t, *args: t == 60)
+                strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=100, update_rule=update_rule, alternating=alternating,
+                                                                       checkpoint_path=checkpoint_path, checkpoint_every=20)
+
+                np.testing.assert_array_equal(strat_p1.treeplex_data, ref_p1.treeplex_data)
+                np.testing.assert_array_equal(strat_p2.treeplex_data, ref_p2.treeplex_data)
+
+                with self.assertRaises(AssertionError):
+                    DagRegretMinimizer.solve_dag_game(game, iterations=100, update_rule='rm', checkpoint_path=checkpoint_path)
+
+if __name__ == "__main__":
+    unittest.main()
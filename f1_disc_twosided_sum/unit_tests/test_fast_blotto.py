@@ -0,0 +1,39 @@
+from game_defs.battlefield_games import BlottoWithRaise
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+from game_defs.fast_blotto import solve_blotto_alt
+import unittest
+import importlib.util
+import numpy as np
+
+HAS_BLOTTO_FAST = importlib.util.find_spec("game_defs.blotto_fast") is not None
+
+@unittest.skipUnless(HAS_BLOTTO_FAST, "blotto_fast extension is not built (make python in fast/)")
+class TestFastBlotto(unittest.TestCase):
+    def test_matches_python_solver(self):
+        """Test if the C++ solution, read over the Python DAGs, is an equilibrium with the Python game value."""
+        game = BlottoWithRaise(3, (5, 3), [1.0, 2.0, 3.0], soft_victory=True, raise_multiplier=2.0)
+
+        for regret_minimizer in ['rm+', 'prm+']:
+            strat_p1, strat_p2 = solve_blotto_alt(game, iterations=10000, regret_minimizer=regret_minimizer, target_gap=1e-3)
+            self.assertLess(game.saddle_point_gap(strat_p1, strat_p2), 2e-3)
+
+        ref_p1, ref_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=3000, update_rule='prm+', alternating=True)
+        self.assertAlmostEqual(game.evaluate(strat_p1, strat_p2), game.evaluate(ref_p1, ref_p2), places=2)
+
+    def test_invalid_arguments(self):
+        """Test if invalid regret minimizers and malformed payoff matrices raise, before or while battlefields are built."""
+        from game_defs import blotto_fast
+
+        game = BlottoWithRaise(3, (5, 3), [1.0, 2.0, 3.0])
+        payoff_matrices = [bbg.dense_payoff_matrices() for bbg in game.battlefield_bayesian_games]
+        with self.assertRaises(ValueError):
+            blotto_fast.solve(5, 3, payoff_matrices, "cfr", 10)
+        for regret_minimizer in ['rm', 'rm+', 'prm', 'prm+']:
+            with self.assertRaises(ValueError):
+                blotto_fast.solve(5, 3, payoff_matrices[:2] + [payoff_matrices[2][:-1]], regret_minimizer, 10)
+            with self.assertRaises(ValueError):
+                blotto_fast.solve(5, 3, payoff_matrices[:2] + [[[np.zeros(2)] * 4] * 6], regret_minimizer, 10)
+        self.assertEqual(len(blotto_fast.solve(5, 3, payoff_matrices, "prm+", 10, 0.0)), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from game_defs.basic_blotto import BlottoGame
+from game_defs.battlefield_games import BlottoWithRaise
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+from online_learning.dag_treeplex import DagTreeplex
+from online_learning import treeplex_kernels
+import unittest
+from unittest import mock
+import tracemalloc
+import numpy as np
+
+class TestFloat32Solve(unittest.TestCase):
+    def test_float32_matches_float64(self):
+        """Test if single precision solves reach the same value and gap as double precision ones."""
+        game = BlottoWithRaise(3, (6, 4), [1.0, 2.0, 3.0], soft_victory=True)
+        for update_rule in ['rm+', 'prm+', 'dcfr']:
+            reference = DagRegretMinimizer.solve_dag_game(game, iterations=500, update_rule=update_rule, alternating=True)
+            for average_dtype in [None, np.float64]:
+                strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=500, update_rule=update_rule, alternating=True,
+                                                                       dtype=np.float32, average_dtype=average_dtype)
+                self.assertEqual(strat_p1.treeplex_data.dtype, np.float32 if average_dtype is None else np.float64)
+                self.assertAlmostEqual(game.evaluate(strat_p1, strat_p2), game.evaluate(*reference), places=4)
+                self.assertLess(abs(game.saddle_point_gap(strat_p1, strat_p2) - game.saddle_point_gap(*reference)), 1e-4)
+
+    def test_float32_warm_start(self):
+        """Test if a warm started single precision solve keeps feeding single precision rewards to the minimizers."""
+        game = BlottoGame(4, (8, 6))
+        warm_start = DagRegretMinimizer.solve_dag_game(game, iterations=50, update_rule='rm+')
+        observe_rewards = DagRegretMinimizer.observe_rewards
+        reward_dtypes = set()
+
+        def record_dtype(self, rewards, *args, **kwargs):
+            reward_dtypes.add(rewards.dtype)
+            return observe_rewards(self, rewards, *args, **kwargs)
+
+        with mock.patch.object(DagRegretMinimizer, 'observe_rewards', record_dtype):
+            strat_p1, _ = DagRegretMinimizer.solve_dag_game(game, iterations=20, update_rule='rm+', dtype=np.float32,
+                                                             warm_start=warm_start)
+        self.assertEqual(reward_dtypes, {np.dtype(np.float32)})
+        self.assertEqual(strat_p1.treeplex_data.dtype, np.float32)
+
+    @unittest.skipUnless(treeplex_kernels.USE_NUMBA, "The level-wise passes used without numba allocate temporaries.")
+    def test_iteration_does_not_allocate(self):
+        """Test if an iteration with preallocated buffers allocates less than one sequence vector."""
+        game = BlottoGame(5, (40, 40))
+        payoff_operator = game.payoff_operator.astype(np.float32)
+        for update_rule in ['rm', 'prm+', 'dcfr']:
+            player1 = DagRegretMinimizer(game.dag_structure_pl1, update_rule, dtype=np.float32)
+            player2 = DagRegretMinimizer(game.dag_structure_pl2, update_rule, dtype=np.float32)
+            strategy_p1 = DagTreeplex(game.dag_structure_pl1, dtype=np.float32)
+            strategy_p2 = DagTreeplex(game.dag_structure_pl2, dtype=np.float32)
+            reward_vector_p1 = np.zeros(game.dag_structure_pl1.num_sequences, dtype=np.float32)
+            reward_vector_p2 = np.zeros(game.dag_structure_pl2.num_sequences, dtype=np.float32)
+
+            def iteration():
+                player1.recommend(out=strategy_p1)
+                player2.recommend(out=strategy_p2)
+                payoff_operator.reward_vector_p1(strategy_p2.treeplex_data, out=reward_vector_p1)
+                payoff_operator.reward_vector_p2(strategy_p1.treeplex_data, out=reward_vector_p2)
+                player1.observe_rewards(reward_vector_p1, inplace_rewards=True)
+                player2.observe_rewards(reward_vector_p2, inplace_rewards=True)
+
+            iteration()  # Compiles the kernels, if any.
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                for _ in range(3):
+                    iteration()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak - baseline, reward_vector_p1.nbytes // 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,158 @@ import unittest
 import numpy as np
 from online_learning.dag_regret_minimizer import DagRegretMinimizer
 from lp_solver.solve_blotto import LpSolver
+from lp_solver.lp_backends import gurobi_available, solve_sparse_lp
+from lp_solver.sequence_form_lp import LpScaling
+from lp_solver.decomposed_lp import DecomposedLpSolver
+from game_defs.basic_blotto import BlottoGame
+
+class TestLpSolver(unittest.TestCase):
+    def test_value_matches_regret_minimization(self):
+        """Test if the LP value lies within the saddle point gap of a regret minimization solve."""
+        for game in [BlottoWithRaise(3, (5, 3), [1/6, 2/6, 3/6], soft_victory=True), BlottoGame(3, (6, 4), [1.0, 2.0, 3.0])]:
+            strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=2000, update_rule='prm+', alternating=True)
+            value, gap = game.evaluate(strat_p1, strat_p2), game.saddle_point_gap(strat_p1, strat_p2)
+            lp_p1, lp_p2, lp_value = LpSolver(game).solve_lp()
+            self.assertLessEqual(abs(lp_value - value), gap + 1e-9)
+            self.assertAlmostEqual(LpSolver(game).solve(), lp_value, places=6)
+
+    def test_backends_agree(self):
+        """Test if HiGHS and Gurobi give the same value and duals on the sparse sequence-form LP."""
+        game = BlottoWithRaise(3, (5, 3), [1/6, 2/6, 3/6], soft_victory=True)
+        lp = LpSolver(game).build_lp()
+        inequality_rhs = np.zeros(lp.inequality_matrix.shape[0])
+        highs = solve_sparse_lp(lp.objective, lp.inequality_matrix, inequality_rhs, lp.equality_matrix, lp.equality_rhs,
+                                lp.lower_bounds, backend='highs')
+        self.assertEqual(highs.backend, 'highs')
+        self.assertAlmostEqual(LpSolver(game).solve_highs()[2], highs.value)
+        self.assertTrue(np.all(highs.inequality_duals >= -1e-9))
+        # linprog cannot run HiGHS' primal simplex, which is an error rather than a silent switch to dual simplex.
+        with self.assertRaises(ValueError):
+            solve_sparse_lp(lp.objective, lp.inequality_matrix, inequality_rhs, lp.equality_matrix, lp.equality_rhs,
+                            lp.lower_bounds, backend='highs', method='primal_simplex')
+        # Strong duality: the value is the dual objective equality_rhs^T equality_duals.
+        self.assertAlmostEqual(highs.equality_duals @ lp.equality_rhs, highs.value)
+        if gurobi_available():
+            gurobi = solve_sparse_lp(lp.objective, lp.inequality_matrix, inequality_rhs, lp.equality_matrix, lp.equality_rhs,
+                                     lp.lower_bounds, backend='gurobi')
+            self.assertAlmostEqual(gurobi.value, highs.value)
+
+    def test_equilibrium_and_warm_start(self):
+        """Test if the LP returns an exact equilibrium, and if a regret minimization warm start saves simplex iterations."""
+        game = BlottoWithRaise(4, (10, 8), [0.1, 0.2, 0.3, 0.4], soft_victory=True)
+        approximate = DagRegretMinimizer.solve_dag_game(game, iterations=2000, update_rule='prm+', alternating=True)
+        backends = ['highs', 'gurobi'] if gurobi_available() else ['highs']
+        for backend in backends:
+            cold_solver, warm_solver = LpSolver(game), LpSolver(game)
+            strat_p1, strat_p2, value = cold_solver.solve_lp(backend=backend, verbose=False)
+            self.assertAlmostEqual(game.evaluate(strat_p1, strat_p2), value)
+            self.assertLess(game.saddle_point_gap(strat_p1, strat_p2), 1e-9)
+
+            warm_p1, warm_p2, warm_value = warm_solver.solve_lp(backend=backend, verbose=False, warm_start=approximate)
+            self.assertAlmostEqual(warm_value, value)
+            self.assertLess(game.saddle_point_gap(warm_p1, warm_p2), 1e-9)
+            if backend == 'gurobi':
+                self.assertLess(warm_solver.last_result.iterations, cold_solver.last_result.iterations)
+
+    def test_scaled_lp(self):
+        """Test if the scaled LP gives the same equilibrium as the original one, with and without a warm start."""
+        game = BlottoWithRaise(4, (10, 8), [0.1, 0.2, 0.3, 0.4], soft_victory=True)
+        approximate = DagRegretMinimizer.solve_dag_game(game, iterations=500, update_rule='prm+', alternating=True)
+        backends = ['highs', 'gurobi'] if gurobi_available() else ['highs']
+        for backend in backends:
+            _, _, value = LpSolver(game).solve_lp(backend=backend, verbose=False)
+            for warm_start in [None, approximate]:
+                solver = LpSolver(game)
+                strat_p1, strat_p2, scaled_value = solver.solve_lp(backend=backend, verbose=False, warm_start=warm_start, scaled=True,
+                                                                   feasibility_tol=1e-9, optimality_tol=1e-9)
+                self.assertAlmostEqual(scaled_value, value)
+                report = solver.last_report
+                self.assertEqual(set(report), {"lp_value", "value", "gap", "lp_violation",
+                                               "sequence_form_violation_p1", "sequence_form_violation_p2"})
+                self.assertAlmostEqual(report["value"], value)
+                self.assertLess(report["gap"], 1e-9)
+                self.assertLess(report["lp_violation"], 1e-9)
+                self.assertLess(report["sequence_form_violation_p1"], 1e-9)
+                self.assertLess(report["sequence_form_violation_p2"], 1e-9)
+
+    def test_scaling_round_trip(self):
+        """Test if unscaling a scaled start gives back the original start."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+        lp = LpSolver(game).build_lp()
+        strat_p1, strat_p2, value = LpSolver(game).solve_lp(backend='highs', verbose=False)
+        start = lp.start_vectors(strat_p1.treeplex_data, strat_p2.treeplex_data)
+        scaling = LpScaling(lp)
+        scaled_start = scaling.scale_start(start)
+        objective, inequality_matrix, _, equality_matrix, equality_rhs, _ = scaling.scale_problem(lp)
+        self.assertAlmostEqual(objective @ scaled_start[0], value / scaling.objective_scale)
+        np.testing.assert_array_almost_equal(equality_matrix @ scaled_start[0], equality_rhs)
+        _, x, inequality_duals, equality_duals = scaling.unscale(value / scaling.objective_scale, *scaled_start)
+        for original, round_trip in zip(start, (x, inequality_duals, equality_duals)):
+            np.testing.assert_array_almost_equal(original, round_trip)
+
+    def test_decomposed_lp(self):
+        """Test if column generation over allocations reaches the value and an exact equilibrium of the full LP."""
+        games = [BlottoWithRaise(4, (10, 8), [0.1, 0.2, 0.3, 0.4], soft_victory=True),
+                 BlottoWithRaise(3, (5, 3), [1/6, 2/6, 3/6], soft_victory=False),
+                 BlottoGame(3, (6, 4), [1.0, 2.0, 3.0])]
+        for game in games:
+            _, _, value = LpSolver(game).solve_lp(backend='highs', verbose=False)
+            solver = DecomposedLpSolver(game)
+            strat_p1, strat_p2, decomposed_value = solver.solve_lp(backend='highs', verbose=False)
+            self.assertAlmostEqual(decomposed_value, value)
+            self.assertAlmostEqual(game.evaluate(strat_p1, strat_p2), value)
+            self.assertLess(game.saddle_point_gap(strat_p1, strat_p2), 1e-9)
+            self.assertAlmostEqual(solver.last_report["gap"], game.saddle_point_gap(strat_p1, strat_p2))
+            self.assertTrue(solver.last_report["converged"])
+            self.assertLess(solver.last_report["master_num_vars"], LpSolver(game).build_lp().num_vars)
+
+    def test_decomposed_lp_not_converged(self):
+        """Test if column generation warns and reports it did not converge when it runs out of iterations."""
+        game = BlottoWithRaise(4, (10, 8), [0.1, 0.2, 0.3, 0.4], soft_victory=True)
+        solver = DecomposedLpSolver(game)
+        with self.assertWarns(RuntimeWarning):
+            solver.solve_lp(backend='highs', verbose=False, max_iterations=2)
+        self.assertFalse(solver.last_report["converged"])
+        self.assertGreater(solver.last_report["gap"], 1e-9)
+        solver.solve_lp(backend='highs', verbose=False)
+        self.assertTrue(solver.last_report["converged"])
+
+    def test_allocations(self):
+        """Test if allocations map to and from the sequences of the Blotto DAG."""
+        game = BlottoGame(4, (7, 5))
+        dag = game.dag_structure_pl1
+        for soldiers_sent in [np.array([2, 0, 3, 1]), np.array([0, 0, 0, 7]), DecomposedLpSolver.even_allocation(dag)]:
+            strategy = np.zeros(dag.num_sequences)
+            strategy[dag.allocation_seq_ids(soldiers_sent)] = 1.0
+            np.testing.assert_array_equal(dag.read_allocation(strategy), soldiers_sent)
+        # A pure best response is a path of the allocation DAG.
+        rewards = np.random.default_rng(0).normal(size=dag.num_sequences)
+        best_response = dag.best_response(rewards)
+        main_seq_ids = np.flatnonzero(best_response[1: dag.dummy_seq_offsets[0]]) + 1
+        np.testing.assert_array_equal(main_seq_ids, dag.allocation_seq_ids(dag.read_allocation(best_response)))
+
+    def test_start_vectors(self):
+        """Test if the start built from an equilibrium is primal and dual optimal."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+        lp = LpSolver(game).build_lp()
+        strat_p1, strat_p2, value = LpSolver(game).solve_lp(backend='highs', verbose=False)
+        x, inequality_duals, equality_duals = lp.start_vectors(strat_p1.treeplex_data, strat_p2.treeplex_data)
+        self.assertTrue(np.all(lp.inequality_matrix @ x >= -1e-9))
+        np.testing.assert_array_almost_equal(lp.equality_matrix @ x, lp.equality_rhs)
+        self.assertAlmostEqual(lp.objective @ x, value)
+        self.assertAlmostEqual(equality_duals @ lp.equality_rhs, value)
+        reduced_costs = lp.objective - lp.inequality_matrix.T @ inequality_duals - lp.equality_matrix.T @ equality_duals
+        np.testing.assert_array_almost_equal(reduced_costs[:lp.num_infoset_vals], 0.0)
+        self.assertTrue(np.all(reduced_costs[lp.num_infoset_vals:] >= -1e-9))
+
+    def test_sparse_constraints(self):
+        """Test if an equilibrium strategy of player 2 satisfies the sparse sequence form constraints."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+        lp = LpSolver(game).build_lp()
+        strat_p1, strat_p2 = DagRegretMinimizer.solve_dag_game(game, iterations=100)
+        x = np.concatenate([np.zeros(lp.num_infoset_vals), strat_p2.treeplex_data])
+        np.testing.assert_array_almost_equal(lp.equality_matrix @ x, lp.equality_rhs)
+        self.assertEqual(lp.inequality_matrix.shape, (game.dag_structure_pl1.num_sequences - 1, lp.num_vars))
 
 def unit_test():
     
@@ -34,7 +186,7 @@ def unit_test():
     # game = BlottoWithRaise(num_battlefields, (200, 100), battlefield_worth, soft_victory=True, raise_multiplier=2.0)
 
     lp_solver = LpSolver(game)
-    lp_solver.solve_gurobi()
+    lp_solver.solve_lp(scaled=True)
 
 
 if __name__ == '__main__':
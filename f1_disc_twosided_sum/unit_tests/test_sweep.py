@@ -0,0 +1,57 @@
+from sweeps.sweep import expand_grid, run_sweep, run_cell, cell_key
+from sweeps.result_store import ColumnarResultStore
+import unittest
+import tempfile
+import warnings
+import numpy as np
+
+class TestSweep(unittest.TestCase):
+    def test_expand_grid(self):
+        """Test if the grid is the cartesian product of the alternatives, on top of the defaults."""
+        cells = expand_grid({'num_battles': [2, 3], 'solver': ['rm+', 'prm+', 'dcfr']})
+        self.assertEqual(len(cells), 6)
+        self.assertEqual(len(set(cell_key(cell) for cell in cells)), 6)
+        self.assertTrue(all(cell['game'] == 'BlottoGame' for cell in cells))
+
+    def test_store(self):
+        """Test if the store keeps the last record of every key and fills missing columns."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ColumnarResultStore(tmp_dir)
+            store.append([{'key': 'a', 'status': 'timeout'}, {'key': 'b', 'status': 'ok', 'value': 1.5}])
+            store.append([{'key': 'a', 'status': 'ok', 'value': 2.5}])
+            columns = store.load()
+            self.assertEqual(columns['key'].tolist(), ['b', 'a'])
+            np.testing.assert_array_equal(columns['value'], [1.5, 2.5])
+            self.assertEqual(store.completed_keys(), {'a', 'b'})
+
+    def test_run_and_resume(self):
+        """Test if a sweep records every cell, kills cells over the time limit and skips finished cells on rerun."""
+        grid_spec = {'num_battles': [2], 'num_soldiers': [[3, 2]], 'solver': ['rm+', 'prm+'], 'iterations': [50], 'seed': [0, 1]}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = run_sweep(grid_spec, tmp_dir, num_workers=2, verbose=False)
+            columns = store.load()
+            self.assertEqual(sorted(columns['status'].tolist()), ['ok'] * 4)
+            self.assertTrue(np.all(columns['gap'] < 0.5))
+
+            num_shards = len(store.shard_paths())
+            run_sweep(grid_spec, tmp_dir, num_workers=2, verbose=False)
+            self.assertEqual(len(store.shard_paths()), num_shards)
+
+            slow_grid_spec = {'num_battles': [5], 'num_soldiers': [[20, 20]], 'iterations': [10 ** 8]}
+            columns = run_sweep(slow_grid_spec, tmp_dir, num_workers=1, timeout=5.0, verbose=False).load()
+            self.assertIn('timeout', columns['status'].tolist())
+
+    def test_decomposed_lp_status(self):
+        """Test if decomposed LP cells stopped above the tolerance are recorded as not converged."""
+        cell = expand_grid({'game': ['BlottoWithRaise'], 'num_battles': [4], 'num_soldiers': [[10, 8]],
+                            'battlefield_worth': ['linear'], 'solver': ['lp_decomposed'], 'iterations': [1]})[0]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            self.assertEqual(run_cell(cell)['status'], 'not_converged')
+        cell['iterations'] = 10000
+        result = run_cell(cell)
+        self.assertEqual(result['status'], 'ok')
+        self.assertLess(result['gap'], 1e-9)
+
+if __name__ == "__main__":
+    unittest.main()
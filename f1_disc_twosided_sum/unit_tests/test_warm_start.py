@@ -0,0 +1,87 @@
+from game_defs.basic_blotto import BlottoGame
+from game_defs.battlefield_games import BlottoWithRaise
+from online_learning.dag_regret_minimizer import DagRegretMinimizer
+from online_learning.checkpoint import load_checkpoint
+import unittest
+from unittest import mock
+import tempfile
+import os
+import numpy as np
+
+def iterations_to_gap(game, target_gap, **kwargs):
+    last_iteration = [0]
+    def callback(t, *args):
+        last_iteration[0] = t
+    DagRegretMinimizer.solve_dag_game(game, iterations=5000, target_gap=target_gap, gap_check_schedule=10,
+                                      callback=callback, **kwargs)
+    return last_iteration[0]
+
+class TestWarmStart(unittest.TestCase):
+    def test_map_across_soldiers(self):
+        """Test if strategies are transferred by (battle_id, soldiers_left) names between different soldier counts."""
+        small = BlottoGame(3, (4, 3)).dag_structure_pl1
+        large = BlottoGame(3, (6, 3)).dag_structure_pl1
+        values = np.arange(small.num_sequences, dtype=np.float64)
+        mapped = large.map_sequence_values(small, values, default=-1.0)
+
+        for battle_id, soldiers_left in [(1, 2), (2, 4)]:
+            infoset_id = large.infoset_name_to_id[(battle_id, soldiers_left)]
+            source_infoset_id = small.infoset_name_to_id[(battle_id, soldiers_left)]
+            start = large.infoset_start_seq_id[infoset_id]
+            source_start = small.infoset_start_seq_id[source_infoset_id]
+            np.testing.assert_array_equal(mapped[start: start + soldiers_left + 1], values[source_start: source_start + soldiers_left + 1])
+
+        # (0, 6) falls back to (0, 4), sending 5 or 6 soldiers has no counterpart.
+        start = large.infoset_start_seq_id[large.infoset_name_to_id[(0, 6)]]
+        np.testing.assert_array_equal(mapped[start: start + 7], [1, 2, 3, 4, 5, -1, -1])
+
+    def test_nearby_worths(self):
+        """Test if warm starting from a nearby game converges faster than starting from scratch."""
+        game = BlottoWithRaise(3, (6, 4), [1.0, 2.0, 3.0], soft_victory=True)
+        nearby_game = BlottoWithRaise(3, (6, 4), [1.0, 2.2, 3.0], soft_victory=True)
+        warm_start = DagRegretMinimizer.solve_dag_game(game, iterations=2000, update_rule='rm+', alternating=True)
+
+        cold = iterations_to_gap(nearby_game, 2e-3, update_rule='rm+', alternating=True)
+        warm = iterations_to_gap(nearby_game, 2e-3, update_rule='rm+', alternating=True, warm_start=warm_start)
+        self.assertLess(warm, cold)
+
+        # Different number of soldiers for player 1.
+        larger_game = BlottoWithRaise(3, (7, 4), [1.0, 2.0, 3.0], soft_victory=True)
+        cold = iterations_to_gap(larger_game, 2e-3, update_rule='rm+', alternating=True)
+        warm = iterations_to_gap(larger_game, 2e-3, update_rule='rm+', alternating=True, warm_start=warm_start)
+        self.assertLess(warm, cold)
+
+    def test_regret_state(self):
+        """Test if a saved regret state can seed a solve of the same game."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, 'solve.npz')
+            DagRegretMinimizer.solve_dag_game(game, iterations=500, update_rule='rm+', checkpoint_path=checkpoint_path)
+            state = load_checkpoint(checkpoint_path)
+
+        cold = iterations_to_gap(game, 1e-2, update_rule='rm+')
+        warm = iterations_to_gap(game, 1e-2, update_rule='rm+', warm_start=state)
+        self.assertLessEqual(warm, cold)
+
+    def test_regret_state_continues_dcfr(self):
+        """Test if a regret state warm start continues the DCFR discounting instead of restarting it at t=1."""
+        game = BlottoGame(3, (4, 3), [1.0, 2.0, 3.0])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, 'solve.npz')
+            DagRegretMinimizer.solve_dag_game(game, iterations=300, update_rule='dcfr', checkpoint_path=checkpoint_path)
+            state = load_checkpoint(checkpoint_path)
+
+        observe_rewards = DagRegretMinimizer.observe_rewards
+        first_iterations = []
+
+        def record_iteration(self, *args, **kwargs):
+            if len(first_iterations) < 2:
+                first_iterations.append(self.iteration)
+            return observe_rewards(self, *args, **kwargs)
+
+        with mock.patch.object(DagRegretMinimizer, 'observe_rewards', record_iteration):
+            DagRegretMinimizer.solve_dag_game(game, iterations=5, update_rule='dcfr', warm_start=state)
+        self.assertEqual(first_iterations, [300, 300])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+"""
+Compact binary checkpoints (.npz) for the projected subgradient ascent loops.
+
+Checkpoints are written to a temporary file and atomically renamed, so that a run killed by
+`timeout $CUTOFF` while checkpointing keeps the previous checkpoint. The state of a numpy
+Generator, if given, is stored alongside and restored on load.
+"""
+
+import os
+import json
+import numpy as np
+
+def save_checkpoint(path, rng=None, **state):
+    """
+    Atomically writes the keyword arguments (arrays or scalars), and the state of rng, to path.
+    """
+    if rng is not None:
+        state["rng_state"] = json.dumps(rng.bit_generator.state)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path, rng=None):
+    """
+    Returns the dictionary stored at path (None if there is no checkpoint) and restores rng.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        state = {key: data[key] for key in data.files}
+    if rng is not None and "rng_state" in state:
+        rng.bit_generator.state = json.loads(str(state["rng_state"]))
+    return state
@@ -1,10 +1,10 @@
-import gurobipy as gp
 from pathlib import Path
 import sys
 import time
 import numpy as np
 
 from subgrad_ascent_algo import compute_nash_subgradient, project_onto_simplex
+from checkpoint import save_checkpoint, load_checkpoint
 from tqdm import tqdm
 import pandas as pd
 
@@ -17,15 +17,26 @@ def projected_gradient_ascent(
     U0_list, U1_list, x0, N, 
     eta0, max_iters,
     eps,
-    window=10
+    window=10,
+    checkpoint_path=None,
+    checkpoint_every=100,
+    rng=None
 ):
 
     k = len(U0_list)
     x = np.array(x0, dtype=float)
     history, times = [], []
-    start = time.time()
+    first_iter = 0
 
-    for t in tqdm(range(max_iters)):
+    # resume from the last checkpoint, if any
+    state = load_checkpoint(checkpoint_path, rng)
+    if state is not None:
+        x = state["x"]
+        history, times = state["history"].tolist(), state["times"].tolist()
+        first_iter = int(state["iteration"])
+    start = time.time() - (times[-1] if times else 0.0)
+
+    for t in tqdm(range(first_iter, max_iters)):
         # compute v_i and gradient for each battlefield
         v_vals, grads = [], []
         for i in range(k):
@@ -52,11 +63,18 @@ def projected_gradient_ascent(
         g = np.zeros(k);  g[i_star] = grads[i_star]
         x = project_onto_simplex(x + eta_t * g, N)
 
+        if checkpoint_path is not None and (t + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_path, rng, iteration=t + 1, x=x, history=history, times=times)
+
     return x, history, times
 
 
-def grad_ascent_runs(subgame_size, seed, output_dir: Path):
+def grad_ascent_runs(subgame_size, seed, output_dir: Path, checkpoint_dir: Path = None):
     output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = None
+    if checkpoint_dir is not None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = checkpoint_dir / f"linear_ascent_size{subgame_size}_seed{seed}.npz"
 
     # Generate random payoff matrices
     rng = np.random.default_rng(seed)
@@ -77,7 +95,9 @@ def grad_ascent_runs(subgame_size, seed, output_dir: Path):
         eta0=ETA0_DEFAULT,
         max_iters=MAX_ITERS_DEFAULT,
         window=10,
-        eps=EPS_DEFAULT
+        eps=EPS_DEFAULT,
+        checkpoint_path=checkpoint_path,
+        rng=rng
     )
 
     # Save per‐iteration history
@@ -93,6 +113,10 @@ def grad_ascent_runs(subgame_size, seed, output_dir: Path):
     df_xopt = pd.DataFrame([x_opt], columns=[f"x_{i}" for i in range(len(x_opt))])
     xopt_fn = output_dir / f"x_opt_size{subgame_size}_seed{seed}.csv"
     df_xopt.to_csv(xopt_fn, index=False)
+
+    # the run is complete, its checkpoint is no longer needed
+    if checkpoint_path is not None:
+        checkpoint_path.unlink(missing_ok=True)
     
 
 if __name__== "__main__":
@@ -101,7 +125,9 @@ if __name__== "__main__":
         subgame_size = int(sys.argv[1])
         seed= int(sys.argv[2])
         output_dir = Path(sys.argv[3]).resolve()
-        grad_ascent_runs(subgame_size, seed,  output_dir)
+        # optional: directory for checkpoints, a preempted run resumes from there
+        checkpoint_dir = Path(sys.argv[4]).resolve() if len(sys.argv) > 4 else None
+        grad_ascent_runs(subgame_size, seed,  output_dir, checkpoint_dir)
     except KeyboardInterrupt:
         sys.exit(130)
     # output_dir = Path("results/grad_ascent_exp_dim")
@@ -0,0 +1,79 @@
+"""
+Zero-sum matrix game LPs with a pluggable backend.
+
+The backend is chosen at runtime and imported lazily: the backend argument, else the LP_BACKEND
+environment variable, else Gurobi if it is installed and licensed and HiGHS (through scipy.optimize.linprog,
+no license needed) otherwise.
+"""
+
+import os
+import numpy as np
+import scipy.sparse as sp
+
+LP_BACKENDS = ('gurobi', 'highs')
+
+_gurobi_available = None
+
+def gurobi_available():
+    global _gurobi_available
+    if _gurobi_available is None:
+        try:
+            import gurobipy as gp
+            with gp.Env(params={"OutputFlag": 0}):
+                pass
+            _gurobi_available = True
+        except Exception:
+            _gurobi_available = False
+    return _gurobi_available
+
+def default_backend():
+    backend = os.environ.get("LP_BACKEND")
+    if backend is not None:
+        assert backend in LP_BACKENDS, f"Unknown LP_BACKEND {backend}, expected one of {LP_BACKENDS}."
+        return backend
+    return 'gurobi' if gurobi_available() else 'highs'
+
+# Solve max_p min_j (p^T U)_j over the simplex, i.e., max v s.t. U^T p >= v, sum(p) = 1, p >= 0
+def solve_matrix_game(U, backend=None):
+    """
+    Returns the value v, the maximizing (row) player's strategy p, and the minimizing (column) player's
+    strategy q, read from the duals of the best response constraints.
+    """
+    backend = backend if backend is not None else default_backend()
+    assert backend in LP_BACKENDS, f"Unknown LP backend {backend}, expected one of {LP_BACKENDS}."
+    m, n = U.shape
+
+    if backend == 'gurobi':
+        import gurobipy as gp
+
+        model = gp.Model()
+        model.setParam("OutputFlag", 0)
+        p = model.addMVar(m, lb=0, ub=1)
+        v = model.addVar(name="v", lb=-float("inf"))
+
+        # br constraints, U^T p - v >= 0
+        br_constrs = model.addConstr(U.T @ p - v >= 0, name="br")
+        model.addConstr(p.sum() == 1)
+        model.setObjective(v, gp.GRB.MAXIMIZE)
+        model.optimize()
+        if model.Status != gp.GRB.OPTIMAL:
+            raise RuntimeError(f"Gurobi did not solve the matrix game: status {model.Status}")
+        v_opt, p_opt, duals = v.X, p.X, br_constrs.Pi
+    else:
+        from scipy.optimize import linprog
+
+        # Variables [p; v]: min -v s.t. v - U^T p <= 0, sum(p) = 1.
+        objective = np.zeros(m + 1)
+        objective[m] = -1.0
+        br_matrix = sp.hstack([-sp.csr_matrix(U.T), np.ones((n, 1))])
+        simplex_matrix = np.append(np.ones(m), 0.0)[None, :]
+        bounds = [(0.0, 1.0)] * m + [(None, None)]
+        result = linprog(objective, A_ub=br_matrix, b_ub=np.zeros(n), A_eq=simplex_matrix, b_eq=[1.0],
+                         bounds=bounds, method="highs")
+        if result.status != 0:
+            raise RuntimeError(f"HiGHS did not solve the matrix game: {result.message}")
+        v_opt, p_opt, duals = result.x[m], result.x[:m], result.ineqlin.marginals
+
+    dq_dx = np.abs(np.asarray(duals))
+    q_opt = dq_dx / np.sum(dq_dx)  # Normalize to sum to 1
+    return v_opt, np.asarray(p_opt), q_opt
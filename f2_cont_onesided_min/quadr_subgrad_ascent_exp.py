@@ -1,8 +1,9 @@
-import gurobipy as gp
 from pathlib import Path
 import sys
 import numpy as np
 from subgrad_ascent_algo import project_onto_simplex
+from checkpoint import save_checkpoint, load_checkpoint
+from lp_backend import solve_matrix_game
 from tqdm import tqdm
 import pandas as pd
 
@@ -17,30 +18,8 @@ def compute_nash_subgradient_quadratic(U0, U1, U2, x):
     # build the payoff matrix at x
     Ux = U0 + x * U1 + (x**2) * U2
 
-    model = gp.Model()
-    model.setParam("OutputFlag", 0)
-
-    # variables
-    p = model.addVars(m, lb=0, ub=1)
-    v = model.addVar(lb=-gp.GRB.INFINITY, name="v")
-
-    # BR constraints
-    for j in range(n):
-        model.addConstr(
-            gp.quicksum(Ux[i, j] * p[i] for i in range(m)) >= v,
-            name=f"br_{j}"
-        )
-    model.addConstr(gp.quicksum(p[i] for i in range(m)) == 1)
-
-    model.setObjective(v, gp.GRB.MAXIMIZE)
-    model.optimize()
-
-    v_opt = v.X
-
-    # recover q* from duals
-    duals = np.array([abs(model.getConstrByName(f"br_{j}").Pi) for j in range(n)])
-    q_opt = duals / duals.sum()
-    p_opt = np.array([p[i].X for i in range(m)])
+    # v(x), p* and q* (from duals), with the LP backend chosen at runtime
+    v_opt, p_opt, q_opt = solve_matrix_game(Ux)
 
     # subgradient: derivative of x*Ux*q wrt x
     term1 = p_opt @ U1 @ q_opt
@@ -50,14 +29,23 @@ def compute_nash_subgradient_quadratic(U0, U1, U2, x):
     return v_opt, dv_dx
 
     
-def projected_gradient_ascent_quadratic(U0_list, U1_list, U2_list, x0, N, eta0, max_iters, eps, window=10):
+def projected_gradient_ascent_quadratic(U0_list, U1_list, U2_list, x0, N, eta0, max_iters, eps, window=10,
+                                        checkpoint_path=None, checkpoint_every=100, rng=None):
     k = len(U0_list)
     x = np.array(x0, dtype=float)
     history, times = [], []
     import time
-    start = time.time()
+    first_iter = 0
+
+    # resume from the last checkpoint, if any
+    state = load_checkpoint(checkpoint_path, rng)
+    if state is not None:
+        x = state["x"]
+        history, times = state["history"].tolist(), state["times"].tolist()
+        first_iter = int(state["iteration"])
+    start = time.time() - (times[-1] if times else 0.0)
 
-    for t in tqdm(range(max_iters)):
+    for t in tqdm(range(first_iter, max_iters)):
         v_vals, grads = [], []
         for i in range(k):
             v_i, dv_i = compute_nash_subgradient_quadratic(
@@ -84,11 +72,18 @@ def projected_gradient_ascent_quadratic(U0_list, U1_list, U2_list, x0, N, eta0,
         g[i_star] = grads[i_star]
         x = project_onto_simplex(x + eta_t * g, N)
 
+        if checkpoint_path is not None and (t + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_path, rng, iteration=t + 1, x=x, history=history, times=times)
+
     return x, history, times
 
 
-def grad_ascent_quadr(subgame_size, seed, output_dir: Path):
+def grad_ascent_quadr(subgame_size, seed, output_dir: Path, checkpoint_dir: Path = None):
     output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = None
+    if checkpoint_dir is not None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = checkpoint_dir / f"quadr_ascent_size{subgame_size}_seed{seed}.npz"
 
     # Generate random payoff matrices
     rng = np.random.default_rng(seed)
@@ -113,7 +108,9 @@ def grad_ascent_quadr(subgame_size, seed, output_dir: Path):
         eta0=ETA0_DEFAULT,
         max_iters=MAX_ITERS_DEFAULT,
         window=10,
-        eps=EPS_DEFAULT
+        eps=EPS_DEFAULT,
+        checkpoint_path=checkpoint_path,
+        rng=rng
     )
 
     # Save per‐iteration history
@@ -130,6 +127,10 @@ def grad_ascent_quadr(subgame_size, seed, output_dir: Path):
     xopt_fn = output_dir / f"x_opt_size{subgame_size}_seed{seed}.csv"
     df_xopt.to_csv(xopt_fn, index=False)
 
+    # the run is complete, its checkpoint is no longer needed
+    if checkpoint_path is not None:
+        checkpoint_path.unlink(missing_ok=True)
+
     
 
 if __name__== "__main__":
@@ -138,7 +139,9 @@ if __name__== "__main__":
         subgame_size = int(sys.argv[1])
         seed= int(sys.argv[2])
         output_dir = Path(sys.argv[3]).resolve()
-        grad_ascent_quadr(subgame_size, seed,  output_dir)
+        # optional: directory for checkpoints, a preempted run resumes from there
+        checkpoint_dir = Path(sys.argv[4]).resolve() if len(sys.argv) > 4 else None
+        grad_ascent_quadr(subgame_size, seed,  output_dir, checkpoint_dir)
     except KeyboardInterrupt:
         sys.exit(130)
     
\ No newline at end of file
@@ -1,5 +1,6 @@
 LOG_FILE="grad_ascent.log"
 OUTPUT_DIR="results"
+CHECKPOINT_DIR="checkpoints"
 CUTOFF=10800
 
 rm -r $LOG_FILE
@@ -8,9 +9,9 @@ for subgame_size in 20 30 40
 do
     for seed in {1..10}
     do
-    /usr/bin/time timeout $CUTOFF python3 quadr_subgrad_ascent_exp.py $subgame_size $seed $OUTPUT_DIR >> $LOG_FILE
+    /usr/bin/time timeout $CUTOFF python3 quadr_subgrad_ascent_exp.py $subgame_size $seed $OUTPUT_DIR $CHECKPOINT_DIR >> $LOG_FILE
 
-    /usr/bin/time timeout $CUTOFF python3 linear_subgrad_ascent_exp.py $subgame_size $seed $OUTPUT_DIR >> $LOG_FILE
+    /usr/bin/time timeout $CUTOFF python3 linear_subgrad_ascent_exp.py $subgame_size $seed $OUTPUT_DIR $CHECKPOINT_DIR >> $LOG_FILE
 
     done
     
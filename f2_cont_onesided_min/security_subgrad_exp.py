@@ -1,9 +1,11 @@
-import gurobipy as gp
+import sys
 from pathlib import Path
 import time
 import csv
 import numpy as np
 from subgrad_ascent_algo import project_onto_simplex
+from checkpoint import save_checkpoint, load_checkpoint
+from lp_backend import solve_matrix_game
 from tqdm import tqdm
 import pandas as pd
 import pickle
@@ -18,28 +20,8 @@ def compute_nash_subgradient(U0, C, x):
     # game matrix
     Ux = U0 + np.log(x+1) * C
     
-    model = gp.Model()
-    model.setParam("OutputFlag", 0)
-    
-    p = model.addVars(m, lb=0, ub=1)
-    v = model.addVar(name="v", lb=-float("inf"))
-    
-    # br constraints
-    for j in range(n):
-        model.addConstr(gp.quicksum(Ux[i, j] * p[i] for i in range(m)) >= v, name=f"br_{j}")
-    
-    model.addConstr(gp.quicksum(p[i] for i in range(m)) == 1)
-    
-    model.setObjective(v, gp.GRB.MAXIMIZE)
-    
-    model.optimize()
-    
-    v_opt = v.X
-    
-    # compute subgradient dv/dx = p^T U1 q 
-    dq_dx = np.array([abs(model.getConstrByName(f"br_{j}").Pi) for j in range(n)])
-    q_opt = dq_dx / np.sum(dq_dx)  
-    p_opt = np.array([p[i].X for i in range(m)])
+    # v(x), p* and q* (from duals), with the LP backend chosen at runtime
+    v_opt, p_opt, q_opt = solve_matrix_game(Ux)
     
     # nash subgradient
     dv_dx = (1/(x+1)) * p_opt @ C @ q_opt
@@ -50,15 +32,26 @@ def compute_nash_subgradient(U0, C, x):
 
 def projected_gradient_ascent(
     U0_list, C_list, x0, N, 
-    eta0, max_iters
+    eta0, max_iters,
+    checkpoint_path=None,
+    checkpoint_every=100,
+    rng=None
 ):
 
     k = len(U0_list)
     x = np.array(x0, dtype=float)
     history, times = [], []
-    start = time.time()
+    first_iter = 0
+
+    # resume from the last checkpoint, if any
+    state = load_checkpoint(checkpoint_path, rng)
+    if state is not None:
+        x = state["x"]
+        history, times = state["history"].tolist(), state["times"].tolist()
+        first_iter = int(state["iteration"])
+    start = time.time() - (times[-1] if times else 0.0)
 
-    for t in tqdm(range(max_iters)):
+    for t in tqdm(range(first_iter, max_iters)):
         # compute v_i and gradient for each battlefield
         v_vals, grads = [], []
         for i in range(k):
@@ -77,11 +70,14 @@ def projected_gradient_ascent(
         g = np.zeros(k);  g[i_star] = grads[i_star]
         x = project_onto_simplex(x + eta_t * g, N)
 
+        if checkpoint_path is not None and (t + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_path, rng, iteration=t + 1, x=x, history=history, times=times)
+
     return x, history, times
 
 
 
-def grad_ascent_runs_security(pickle_paths, output_dir: Path):
+def grad_ascent_runs_security(pickle_paths, output_dir: Path, checkpoint_dir: Path = None):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     k = 3
@@ -101,11 +97,21 @@ def grad_ascent_runs_security(pickle_paths, output_dir: Path):
 
     x_init = np.ones(k) * (N / k)
 
+    # the checkpoint name holds the run parameters, so a run never resumes from another run's checkpoint
+    checkpoint_path = None
+    if checkpoint_dir is not None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        subgames = "-".join(Path(pkl).stem for pkl in pickle_paths)
+        seeds_str = "-".join(str(seed) for seed in seeds[:len(pickle_paths)])
+        checkpoint_path = checkpoint_dir / (f"security_ascent_{subgames}_seeds{seeds_str}_N{N}"
+                                            f"_eta{ETA0_DEFAULT}_iters{MAX_ITERS_DEFAULT}.npz")
+
     # Run the ascent with diminishing step‐size, max_iters
     x_opt, history, times = projected_gradient_ascent(
         U0_list, C_list, x_init, N,
         eta0=ETA0_DEFAULT,
-        max_iters=MAX_ITERS_DEFAULT
+        max_iters=MAX_ITERS_DEFAULT,
+        checkpoint_path=checkpoint_path
     )
 
     # Save per‐iteration history
@@ -122,6 +128,10 @@ def grad_ascent_runs_security(pickle_paths, output_dir: Path):
     xopt_fn = output_dir / "x_opt_size.csv"
     df_xopt.to_csv(xopt_fn, index=False)
 
+    # the run is complete, its checkpoint is no longer needed
+    if checkpoint_path is not None:
+        checkpoint_path.unlink(missing_ok=True)
+
 
 
 
@@ -132,4 +142,6 @@ if __name__== "__main__":
         "data_security_subgames/small_isg_2.pkl",
         "data_security_subgames/small_isg_3.pkl"
     ]
-    grad_ascent_runs_security(pickle_paths, output_dir)
\ No newline at end of file
+    # optional: directory for checkpoints, a preempted run resumes from there
+    checkpoint_dir = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else None
+    grad_ascent_runs_security(pickle_paths, output_dir, checkpoint_dir)
\ No newline at end of file
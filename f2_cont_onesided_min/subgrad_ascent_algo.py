@@ -1,8 +1,9 @@
-import gurobipy as gp
 import time
 import numpy as np
 import time
 import matplotlib.pyplot as plt
+from checkpoint import save_checkpoint, load_checkpoint
+from lp_backend import solve_matrix_game
 
 
 # Solve the zero‐sum subgame and compute v(x) plus its subgradient
@@ -13,28 +14,8 @@ def compute_nash_subgradient(U0, U1, x):
     # game matrix
     Ux = U0 + x * U1 
     
-    model = gp.Model()
-    model.setParam("OutputFlag", 0)
-    
-    p = model.addVars(m, lb=0, ub=1)
-    v = model.addVar(name="v", lb=-float("inf"))
-    
-    # br constraints
-    for j in range(n):
-        model.addConstr(gp.quicksum(Ux[i, j] * p[i] for i in range(m)) >= v, name=f"br_{j}")
-    
-    model.addConstr(gp.quicksum(p[i] for i in range(m)) == 1)
-    
-    model.setObjective(v, gp.GRB.MAXIMIZE)
-    
-    model.optimize()
-    
-    v_opt = v.X
-    
-    # compute subgradient dv/dx = p^T U1 q (from duals)
-    dq_dx = np.array([abs(model.getConstrByName(f"br_{j}").Pi) for j in range(n)])
-    q_opt = dq_dx / np.sum(dq_dx)  # Normalize to sum to 1
-    p_opt = np.array([p[i].X for i in range(m)])
+    # v(x), p* and q* (from duals), with the LP backend chosen at runtime
+    v_opt, p_opt, q_opt = solve_matrix_game(Ux)
     
     # nash subgradient
     dv_dx = p_opt @ U1 @ q_opt
@@ -51,13 +32,22 @@ def project_onto_simplex(v, z):
     return np.maximum(v - theta, 0)
 
 
-def projected_gradient_ascent(U0_list, U1_list, x0, N, step_size, max_iters):
+def projected_gradient_ascent(U0_list, U1_list, x0, N, step_size, max_iters,
+                              checkpoint_path=None, checkpoint_every=100, rng=None):
     k = len(U0_list) # number of battlefields
     x = np.array(x0, dtype=float)
     history, times = [], []
-    start = time.time()
+    first_iter = 0
 
-    for t in range(max_iters):
+    # resume from the last checkpoint, if any
+    state = load_checkpoint(checkpoint_path, rng)
+    if state is not None:
+        x = state["x"]
+        history, times = state["history"].tolist(), state["times"].tolist()
+        first_iter = int(state["iteration"])
+    start = time.time() - (times[-1] if times else 0.0)
+
+    for t in range(first_iter, max_iters):
         # compute v_i and subgradient for each battlefield
         v_vals = []
         grads  = []
@@ -78,6 +68,9 @@ def projected_gradient_ascent(U0_list, U1_list, x0, N, step_size, max_iters):
         # gradient‐ascent + projection
         x = project_onto_simplex(x + step_size * g, N)
 
+        if checkpoint_path is not None and (t + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_path, rng, iteration=t + 1, x=x, history=history, times=times)
+
     return x, history, times
 
 
@@ -0,0 +1,31 @@
+from security_subgrad_exp import projected_gradient_ascent
+import unittest
+import tempfile
+import os
+import numpy as np
+
+class TestCheckpoint(unittest.TestCase):
+    def test_exact_resume(self):
+        """Test if an ascent stopped after a checkpoint and resumed matches an uninterrupted ascent."""
+        rng = np.random.default_rng(0)
+        U0_list = [rng.uniform(-1, 1, size=(4, 3)) for _ in range(3)]
+        C_list = [rng.uniform(0, 1, size=(4, 3)) for _ in range(3)]
+        x_init = np.ones(3) * (10 / 3)
+
+        ref_x, ref_history, _ = projected_gradient_ascent(U0_list, C_list, x_init, 10, eta0=0.5, max_iters=100)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, 'ascent.npz')
+
+            # Simulate preemption right after the checkpoint of iteration 60.
+            projected_gradient_ascent(U0_list, C_list, x_init, 10, eta0=0.5, max_iters=60,
+                                      checkpoint_path=checkpoint_path, checkpoint_every=20)
+            x, history, times = projected_gradient_ascent(U0_list, C_list, x_init, 10, eta0=0.5, max_iters=100,
+                                                          checkpoint_path=checkpoint_path, checkpoint_every=20)
+
+        np.testing.assert_array_equal(x, ref_x)
+        np.testing.assert_array_equal(history, ref_history)
+        self.assertEqual(len(times), 100)
+
+if __name__ == "__main__":
+    unittest.main()